@@ -2,16 +2,128 @@
 AI Runtime Engine - The ENTIRE Application Logic
 This IS the complete application. No other business logic exists anywhere.
 """
-import yaml
+import hashlib
 import json
 import os
+import re
+import asyncio
+import time
 from datetime import datetime
 from typing import Dict, Any, List, Optional
+import metrics
+import startup
+import tracing
+from logs import configure_logging, get_logger
 from storage import JSONStorage
-from dotenv import load_dotenv
+from validation import ProductValidator
+from intent_classifier import IntentClassifier
+from prompt_builder import IntentPromptBuilder, estimate_tokens
+from cache import CacheServer, create_cache, worker_count
+from columnar import aggregate_groups
+from json_patch import make_patch
+from records import dump_json
+from executors import EngineExecutors
+from change_feed import format_sse
+from bulk_io import MEDIA_TYPES, detect_format, export_chunks, iter_product_rows
+from rate_limit import RateLimited, RateLimiter, retry_after_header
+from replay import RecordingProvider, ReplayProvider
+from json_extract import extract_json_object, extract_from_stream, make_intent_validator, make_batch_validator
+from policy_loader import (PolicyView, changed_paths, files_signature, load_policies, note_policy_read,
+                           policy_hashes, record_policy_reads)
+
+def _load_dotenv():
+    """Load the nearest .env file - python-dotenv is only imported when there is one"""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return
+        directory = parent
 
 # Load environment variables
-load_dotenv()
+_load_dotenv()
+
+log = get_logger("engine")
+
+# Labeled request examples - shown to the AI in the intent prompt and used to
+# train the local intent classifier
+INTENT_EXAMPLES = [
+    ("GET", "/api/products", {"action": "get_products"}),
+    ("POST", "/api/products", {"action": "add_product"}),
+    ("DELETE", "/api/products/p4", {"action": "delete_product", "product_id": "p4"}),
+    ("GET", "/api/user-context/admin", {"action": "get_user_context", "role": "admin"}),
+    ("GET", "/api/categories", {"action": "get_categories"}),
+    ("GET", "/api/menu-items", {"action": "get_menu_items"}),
+    ("GET", "/api/health", {"action": "get_health"}),
+    ("GET", "/api/demo-info", {"action": "get_demo_info"}),
+    ("GET", "/api/products/low-stock", {"action": "get_low_stock"}),
+]
+
+# Permission each action requires - also the action vocabulary offered to the AI
+ACTION_PERMISSIONS = {
+    "get_products": "view",
+    "add_product": "add",
+    "delete_product": "delete",
+    "get_user_context": "view",
+    "get_health": "view",
+    "get_demo_info": "view",
+    "get_categories": "view",
+    "get_menu_items": "view",
+    "get_low_stock": "view"
+}
+
+POLICIES_DIR = "../POLICIES"
+
+# Policy paths behind state the engine derives from them - handlers using that state depend on these
+PRODUCT_RULES_PATH = "business_rules.product_management"  # product validator, stock tiers
+PERFORMANCE_PATH = "system_config.performance"            # UI versioning (ui_deltas)
+
+# Read-only actions whose responses depend only on role, policies and stored data
+CACHEABLE_ACTIONS = {"get_products", "get_categories", "get_menu_items", "get_user_context", "get_health", "get_demo_info"}
+
+# Actions that read the parsed catalog - a changed products.json is re-read off the event loop first
+CATALOG_ACTIONS = {"get_products", "get_categories", "get_user_context", "get_health", "get_low_stock"}
+
+# Routes the engine serves itself - resolved without asking the AI for an intent
+RESERVED_ROUTES = {
+    ("POST", "api/batch"): "batch",
+    ("POST", "api/products/bulk"): "bulk_import_products",
+    ("GET", "api/products/export"): "export_products",
+    ("GET", "api/events"): "subscribe_events",
+    ("GET", "metrics"): "metrics",
+    ("GET", "debug/traces"): "debug_traces",
+}
+
+# Permission each reserved (non-AI) action requires
+RESERVED_ACTION_PERMISSIONS = {
+    "bulk_import_products": "add",
+    "export_products": "view",
+    "subscribe_events": "view",
+    "debug_traces": "debug"
+}
+
+# Optional response sections when ui_behavior.response_sections declares none for an action
+DEFAULT_RESPONSE_SECTIONS = {
+    "get_products": {"ui_instructions": {"requires": [], "default": ["ui"]}}
+}
+
+# Upper bound on sub-requests per batch (all intents share one AI response)
+MAX_BATCH_SIZE = 8
+
+# Bulk import: rows validated per batch, and how many invalid rows are reported back
+BULK_VALIDATION_BATCH = 1000
+MAX_REPORTED_ROW_ERRORS = 100
+
+# Change feed (Server-Sent Events): seconds between keep-alive comments on an idle
+# stream, and between checks for writes made by other worker processes
+EVENT_HEARTBEAT_SECONDS = 15.0
+EVENT_VERSION_POLL_SECONDS = 2.0
+EVENT_RETRY_MS = 3000
 
 class AIRuntimeEngine:
     """
@@ -20,11 +132,32 @@ class AIRuntimeEngine:
     AI makes ALL decisions about how to handle ANY request.
     """
     
-    def __init__(self):
-        self.storage = JSONStorage()
-        self.policies = self._load_policies()
-        self.ai_provider = self._setup_ai_provider()
-        print("🧠 AI Runtime Engine initialized - ZERO hardcoded business logic!")
+    def __init__(self, storage: Optional[JSONStorage] = None, ai_provider=None):
+        # storage / ai_provider are injectable (benchmarks, offline runs); by default
+        # the catalog in ../DATA and the provider named by AI_PROVIDER
+        self.storage = storage if storage is not None else JSONStorage()
+        # action -> policy paths its handler has read (recorded on response cache misses)
+        self.policy_graph: Dict[str, set] = {}
+        self._set_policies(self._load_policies())
+        configure_logging(self.policies.get("system_config", {}))
+        startup.mark("engine: policies")
+        self.product_validator = ProductValidator(self.policies.get("business_rules", {}))
+        self.prompt_builder = self._build_prompt_builder()
+        self.intent_actions = list(ACTION_PERMISSIONS) + ["unknown"]
+        self.intent_validator = make_intent_validator(self.intent_actions)
+        self.token_usage = {"calls": 0, "tokens_in": 0, "tokens_out": 0}
+        startup.mark("engine: validators + prompts")
+        self.cache_server = CacheServer() if worker_count() > 1 else None
+        self.intent_cache, self.response_cache = self._setup_caches()
+        self.ui_bases = self._setup_ui_bases()
+        self.rate_limiter = self._setup_rate_limiter()
+        self._configure_storage()
+        self.executors = self._setup_executors()
+        self.tracing_config, self.slow_traces = self._setup_tracing()
+        startup.mark("engine: caches + storage")
+        self.ai_provider = ai_provider if ai_provider is not None else self._setup_ai_provider()
+        startup.mark("engine: ai provider")
+        log.info("🧠 AI Runtime Engine initialized - ZERO hardcoded business logic!")
     
     def _deep_merge_policies(self, base_policies: Dict, new_policies: Dict) -> Dict:
         """Deep merge two policy dictionaries, combining access_policies and other nested structures"""
@@ -67,39 +200,21 @@ class AIRuntimeEngine:
     
     def _load_policies(self) -> Dict:
         """Load ALL business rules from POLICIES directory"""
-        policies = {}
-        policies_dir = "../POLICIES"
-        
-        # Dynamically discover all YAML policy files
-        policy_files = []
-        if os.path.exists(policies_dir):
-            for filename in os.listdir(policies_dir):
-                if filename.endswith('.yaml') and filename != 'README.md':
-                    policy_files.append(filename)
-            policy_files.sort()  # Sort for consistent loading order
-        
         try:
-            for policy_file in policy_files:
-                file_path = os.path.join(policies_dir, policy_file)
-                if os.path.exists(file_path):
-                    with open(file_path, 'r') as f:
-                        file_policies = yaml.safe_load(f)
-                        if file_policies:
-                            # Deep merge policies to avoid overwriting
-                            policies = self._deep_merge_policies(policies, file_policies)
-                            print(f"✅ Loaded policies from {policy_file}")
-                else:
-                    print(f"⚠️ Policy file {policy_file} not found, skipping")
+            # Every YAML policy file, deep merged in name order - from the precompiled
+            # cache when no file changed since it was written
+            policies, policy_files, cached = load_policies(POLICIES_DIR, self._deep_merge_policies)
             
             if not policies:
                 raise FileNotFoundError("No policy files found")
                 
-            print(f"🎯 Successfully loaded {len(policy_files)} policy files from POLICIES directory: {', '.join(policy_files)}")
+            log.info("🎯 Successfully loaded %d policy files from POLICIES directory%s: %s", len(policy_files),
+                     " (precompiled cache)" if cached else "", ", ".join(policy_files))
             return policies
             
         except Exception as e:
-            print(f"⚠️ Error loading policies: {e}")
-            print("🔄 Using minimal default policies")
+            log.warning("⚠️ Error loading policies: %s", e)
+            log.warning("🔄 Using minimal default policies")
             return {
                 "access_policies": {
                     "admin": {"permissions": ["view", "add", "delete"], "ui_elements": ["product_table", "add_button", "delete_buttons"]},
@@ -108,6 +223,232 @@ class AIRuntimeEngine:
                 }
             }
     
+    def _set_policies(self, policies: Dict):
+        """Serve policies through a read-recording view, versioned by per-path content hashes"""
+        self.policies = PolicyView(policies)
+        self.policy_hashes = policy_hashes(policies)
+        self._policy_signature = files_signature(POLICIES_DIR)
+        performance = policies.get("system_config", {}).get("performance", {})
+        self._policy_reload_interval = float(performance.get("policy_reload_interval", 2.0))
+        self._next_policy_check = time.monotonic() + self._policy_reload_interval
+    
+    def _check_policy_files(self):
+        """Reload policies if a policy file changed (looked at once per policy_reload_interval)"""
+        if self._policy_reload_interval <= 0 or time.monotonic() < self._next_policy_check:
+            return
+        self._next_policy_check = time.monotonic() + self._policy_reload_interval
+        if files_signature(POLICIES_DIR) != self._policy_signature:
+            self.reload_policies()
+    
+    def reload_policies(self) -> set:
+        """
+        Re-read the policy files and recompile what is derived from them.
+        Cached responses are not flushed: each is checked against the hashes of the policy
+        paths it was built from, so only (action, role) entries that read a changed path
+        are rebuilt. Cache and tracing settings still apply at startup only; rate limits
+        are rebuilt (with fresh buckets) when security settings change.
+        Returns the changed policy paths.
+        """
+        try:
+            policies, _, _ = load_policies(POLICIES_DIR, self._deep_merge_policies)
+        except Exception as e:
+            policies = None
+            log.warning("⚠️ Policy reload failed, keeping the current policies: %s", e)
+        if not policies:
+            self._policy_signature = files_signature(POLICIES_DIR)
+            return set()
+        
+        previous_hashes, previous_prefix = self.policy_hashes, self.prompt_builder.prefix
+        self._set_policies(policies)
+        changed = changed_paths(previous_hashes, self.policy_hashes)
+        if not changed:
+            return changed
+        
+        configure_logging(self.policies.get("system_config", {}))
+        self.product_validator = ProductValidator(self.policies.get("business_rules", {}))
+        self.prompt_builder = self._build_prompt_builder()
+        if self.prompt_builder.prefix != previous_prefix and self.intent_cache is not None:
+            self.intent_cache.clear()
+        self._configure_storage()
+        if "system_config.security" in changed:
+            self.rate_limiter = self._setup_rate_limiter()
+        if PERFORMANCE_PATH in changed:
+            self._replace_executors()
+            self.ui_bases = self._setup_ui_bases()
+        
+        affected = sorted(action for action, paths in self.policy_graph.items() if paths & changed)
+        innermost = sorted(path for path in changed if not any(other.startswith(path + ".") for other in changed))
+        log.info("♻️ Policies reloaded: %s changed; cached responses rebuilt for: %s",
+                 ", ".join(innermost), ", ".join(affected) or "none")
+        return changed
+    
+    def _configure_storage(self):
+        """Apply policy-driven write batching to the storage group-commit writer"""
+        performance = self.policies.get("system_config", {}).get("performance", {})
+        self.storage.group_commit.configure(
+            window_ms=float(performance.get("write_batch_window_ms", 2)),
+            max_batch=int(performance.get("write_batch_max", 512))
+        )
+        product_rules = self.policies.get("business_rules", {}).get("product_management", {})
+        self.storage.configure_stock_tiers(product_rules.get("stock_thresholds", {}))
+        aggregation_rules = self.policies.get("categories_feature", {}).get("aggregation_rules", {})
+        self.storage.change_feed.group_by_field = aggregation_rules.get("group_by_field", "category")
+    
+    def _setup_caches(self):
+        """Intent and response caches - shared across workers when a cache server runs"""
+        performance = self.policies.get("system_config", {}).get("performance", {})
+        ttl = float(performance.get("cache_ttl", 300))
+        
+        intent_cache = create_cache("intents", self.cache_server, ttl) if performance.get("intent_cache", True) else None
+        response_cache = create_cache("responses", self.cache_server, ttl) if performance.get("response_cache", True) else None
+        
+        mode = "shared across workers" if self.cache_server else "in-process"
+        log.info("🗄️ Caches ready (%s): intents=%s, responses=%s, ttl=%ss", mode,
+                 "on" if intent_cache else "off", "on" if response_cache else "off", ttl)
+        return intent_cache, response_cache
+    
+    def _setup_ui_bases(self):
+        """Earlier ui_instructions per role and version - the bases UI deltas are computed against"""
+        performance = self.policies.get("system_config", {}).get("performance", {})
+        if not performance.get("ui_deltas", True):
+            return None
+        return create_cache("ui_bases", self.cache_server, float(performance.get("cache_ttl", 300)),
+                            int(performance.get("ui_delta_bases", 256)))
+    
+    def _setup_rate_limiter(self) -> RateLimiter:
+        """Token buckets from system_config.security.rate_limiting - shared across workers if asked to"""
+        config = self.policies.get("system_config", {}).get("security", {}).get("rate_limiting", False)
+        shared = isinstance(config, dict) and config.get("shared") and self.cache_server is not None
+        if shared:
+            limiter = RateLimiter(config, self.cache_server.store("rate_limits"), self.cache_server.lock())
+        else:
+            limiter = RateLimiter(config)
+        log.info("🚦 Rate limiting %s%s", "on" if limiter.enabled else "off", " (shared across workers)" if shared else "")
+        return limiter
+    
+    def _setup_executors(self) -> EngineExecutors:
+        """I/O and CPU pools sized by system_config.performance"""
+        executors = EngineExecutors(self.policies.get("system_config", {}).get("performance", {}))
+        log.info("⚙️ Executors: %d I/O threads, %d %s CPU worker(s), offload from %d rows",
+                 executors.io_threads, executors.cpu_workers, executors.cpu_executor, executors.offload_threshold)
+        return executors
+    
+    def _replace_executors(self):
+        """New pools for changed settings; work already queued on the old ones still completes"""
+        previous, self.executors = self.executors, self._setup_executors()
+        monitoring = previous.monitoring
+        previous.shutdown()
+        if monitoring:
+            self.executors.start_loop_monitor()
+    
+    async def _load_catalog(self):
+        """Bring the parsed catalog up to date - re-reading a changed products.json runs on the I/O pool"""
+        if not self.storage.is_current():
+            await self.executors.run_io(self.storage.refresh)
+    
+    async def _get_stats(self) -> Dict:
+        """Storage stats; for a large catalog they are computed (and users.json read) on the I/O pool"""
+        note_policy_read(PRODUCT_RULES_PATH)  # low-stock counts follow the stock tiers
+        await self._load_catalog()
+        if self.executors.should_offload(self.storage.get_columns().count):
+            return await self.executors.run_io(self.storage.get_stats)
+        return self.storage.get_stats()
+    
+    @property
+    def product_validator(self) -> ProductValidator:
+        """Validator compiled from business_rules.product_management (a policy read of that path)"""
+        note_policy_read(PRODUCT_RULES_PATH)
+        return self._product_validator
+    
+    @product_validator.setter
+    def product_validator(self, validator: ProductValidator):
+        self._product_validator = validator
+    
+    @property
+    def stock_tiers(self):
+        """Stock tiers configured from business_rules.product_management (a policy read of that path)"""
+        note_policy_read(PRODUCT_RULES_PATH)
+        return self.storage.stock_tiers
+    
+    def _setup_tracing(self):
+        """Request tracing settings (system_config.tracing) and the slowest-traces buffer"""
+        config = {"enabled": True, "server_timing": True, "slow_traces": 50}
+        config.update(self.policies.get("system_config", {}).get("tracing", {}) or {})
+        return config, tracing.SlowTraceBuffer(int(config["slow_traces"]) if config["enabled"] else 0)
+    
+    def _build_prompt_builder(self) -> IntentPromptBuilder:
+        """Precompile the static intent prompt prefix from the loaded policies"""
+        actions = [
+            action for action in ACTION_PERMISSIONS
+            if action != "get_categories" or "categories_feature" in self.policies
+        ] + ["unknown"]
+        examples = [example for example in INTENT_EXAMPLES if example[2]["action"] in actions]
+        
+        performance = self.policies.get("system_config", {}).get("performance", {})
+        budget = int(performance.get("prompt_data_token_budget", 48))
+        
+        builder = IntentPromptBuilder(actions, examples, data_token_budget=budget)
+        log.info("🧾 Intent prompt prefix compiled (~%d tokens, data budget %d tokens)", builder.prefix_tokens, budget)
+        return builder
+    
+    def _call_provider(self, prompt: str, purpose: str) -> str:
+        """Send a prompt to the AI provider and account for its token usage"""
+        try:
+            with metrics.stage("provider"):
+                ai_response = self.ai_provider.generate_response(prompt)
+        except Exception:
+            self._record_provider_error(purpose)
+            raise
+        self._record_usage(prompt, ai_response, purpose)
+        return ai_response
+    
+    def _record_provider_error(self, purpose: str):
+        metrics.PROVIDER_ERRORS.inc(provider=type(self.ai_provider).__name__, purpose=purpose, **metrics.current_labels())
+    
+    def _call_provider_json(self, prompt: str, purpose: str, validate) -> Dict:
+        """
+        Get a schema-valid JSON object from the AI provider.
+        Streams when the provider supports it and stops generating once the object closes;
+        otherwise extracts the first valid object from the full text (prose, fences, echoes).
+        """
+        if hasattr(self.ai_provider, "stream_response"):
+            try:
+                with metrics.stage("provider"):
+                    result, ai_response = extract_from_stream(self.ai_provider.stream_response(prompt), validate)
+            except ValueError:
+                raise  # unusable output, not a failed provider call
+            except Exception:
+                self._record_provider_error(purpose)
+                raise
+            self._record_usage(prompt, ai_response, purpose)
+            log.debug("Raw AI response", purpose=purpose, streamed=True, response=ai_response)
+            return result
+        
+        ai_response = self._call_provider(prompt, purpose)
+        log.debug("Raw AI response", purpose=purpose, response=ai_response)
+        try:
+            return extract_json_object(ai_response, validate, prompt)
+        except ValueError as e:
+            raise ValueError(f"{e}. AI Response: {ai_response}")
+    
+    def _record_usage(self, prompt: str, ai_response: str, purpose: str):
+        """Account tokens in/out for one provider call"""
+        # Providers that report usage expose it as last_usage; otherwise estimate
+        usage = getattr(self.ai_provider, "last_usage", None) or {
+            "tokens_in": estimate_tokens(prompt),
+            "tokens_out": estimate_tokens(ai_response),
+            "estimated": True
+        }
+        self.token_usage["calls"] += 1
+        self.token_usage["tokens_in"] += usage["tokens_in"]
+        self.token_usage["tokens_out"] += usage["tokens_out"]
+        labels = {"provider": type(self.ai_provider).__name__, **metrics.current_labels()}
+        metrics.PROVIDER_CALLS.inc(purpose=purpose, **labels)
+        metrics.PROVIDER_TOKENS.inc(usage["tokens_in"], direction="in", **labels)
+        metrics.PROVIDER_TOKENS.inc(usage["tokens_out"], direction="out", **labels)
+        details = {key: usage[key] for key in ("estimated", "cached_tokens") if usage.get(key)}
+        log.info("🔢 AI call (%s): %d tokens in, %d tokens out", purpose, usage["tokens_in"], usage["tokens_out"], **details)
+    
     def _setup_ai_provider(self):
         """Setup AI provider based on environment - NO FALLBACKS ALLOWED"""
         provider = os.getenv('AI_PROVIDER')
@@ -115,11 +456,46 @@ class AIRuntimeEngine:
         if not provider:
             raise RuntimeError("CRITICAL: AI_PROVIDER not configured. Pure AI Runtime Engine requires a working AI provider.")
         
-        if provider == 'huggingface':
+        return self._create_provider(provider)
+    
+    def _create_provider(self, provider: str):
+        """Instantiate a named AI provider"""
+        if provider == 'local':
+            # In-process classifier; escalates low-confidence intents to a remote provider
+            fallback_name = os.getenv('LOCAL_INTENT_FALLBACK')
+            if fallback_name == 'local':
+                raise RuntimeError("CRITICAL: LOCAL_INTENT_FALLBACK cannot be 'local'.")
+            fallback = self._create_provider(fallback_name) if fallback_name else None
+            threshold = float(os.getenv('LOCAL_INTENT_THRESHOLD', '0.75'))
+            log_path = os.getenv('LOCAL_INTENT_LOG', '../DATA/intent_log.jsonl')
+            log.info("🧩 Initializing local intent classifier (threshold: %s, fallback: %s)", threshold, fallback_name or "none")
+            return LocalIntentProvider(IntentClassifier(INTENT_EXAMPLES, log_path), fallback, threshold)
+        elif provider == 'record':
+            # Real provider whose prompt -> response pairs are saved for offline replay
+            inner = os.getenv('RECORD_PROVIDER')
+            if not inner or inner in ('record', 'replay'):
+                raise RuntimeError("CRITICAL: RECORD_PROVIDER must name the real provider to record (e.g. openai).")
+            return RecordingProvider(self._create_provider(inner), os.getenv('RECORD_PATH', '../DATA/recordings/provider.jsonl.gz'))
+        elif provider == 'replay':
+            # Recorded responses served offline; REPLAY_LATENCY is none, fixed or recorded
+            fallback_name = os.getenv('REPLAY_FALLBACK')
+            if fallback_name in ('record', 'replay'):
+                raise RuntimeError("CRITICAL: REPLAY_FALLBACK cannot be 'record' or 'replay'.")
+            seed = os.getenv('REPLAY_SEED')
+            return ReplayProvider(
+                os.getenv('REPLAY_PATH', '../DATA/recordings/provider.jsonl.gz'),
+                latency_model=os.getenv('REPLAY_LATENCY', 'recorded'),
+                latency_ms=float(os.getenv('REPLAY_LATENCY_MS', '0')),
+                jitter_ms=float(os.getenv('REPLAY_JITTER_MS', '0')),
+                scale=float(os.getenv('REPLAY_LATENCY_SCALE', '1')),
+                seed=int(seed) if seed else None,
+                fallback=self._create_provider(fallback_name) if fallback_name else None
+            )
+        elif provider == 'huggingface':
             api_key = os.getenv('HF_API_KEY')
             if not api_key:
                 raise RuntimeError("CRITICAL: HF_API_KEY required for HuggingFace provider. Pure AI Runtime Engine cannot work without AI.")
-            print(f"🚀 Initializing HuggingFace AI with real intelligence!")
+            log.info("🚀 Initializing HuggingFace AI with real intelligence!")
             return HuggingFaceProvider(api_key)
         elif provider == 'ollama':
             ollama_url = os.getenv('OLLAMA_URL', 'http://localhost:11434')
@@ -131,31 +507,79 @@ class AIRuntimeEngine:
             return OpenAIProvider(api_key)
         elif provider == 'mock':
             # Mock is only allowed if explicitly requested for development
-            print("⚠️ WARNING: Using Mock AI Provider. This is not a true Pure AI Runtime Engine.")
+            log.warning("⚠️ WARNING: Using Mock AI Provider. This is not a true Pure AI Runtime Engine.")
             return MockAIProvider()
         else:
             raise RuntimeError(f"CRITICAL: Unknown AI provider '{provider}'. Pure AI Runtime Engine requires a valid AI provider.")
     
-    async def handle_request(self, path: str, method: str, user_role: str, data: Dict, headers: Dict) -> Dict:
+    async def handle_request(self, path: str, method: str, user_role: str, data: Dict, headers: Dict,
+                             request_intent: Optional[Dict] = None) -> Dict:
         """
         AI makes ALL decisions about how to handle ANY request.
         No hardcoded business logic anywhere.
         """
         
-        print(f"🤖 AI Engine processing: {method} {path} for role '{user_role}'")
-        print(f"DEBUG: Received headers: {headers}")
+        log.info("🤖 AI Engine processing: %s %s for role '%s'", method, path, user_role)
+        log.debug("Received headers", headers=headers)
+        self._check_policy_files()
+        
+        # Batch sub-requests run as separate tasks - each gets its own metric labels
+        if request_intent is not None or metrics.current_labels()["action"] == "none":
+            self.begin_metrics(user_role)
+        
+        # Engine-level routes (batching) never reach the AI intent analysis
+        reserved_action = RESERVED_ROUTES.get((method, path.strip("/")))
+        if reserved_action == "batch" and request_intent is None:
+            metrics.set_action("batch")
+            sub_requests = data if isinstance(data, list) else data.get("requests", [])
+            return await self.handle_batch(sub_requests, user_role, headers)
+        if reserved_action is not None:
+            # Streaming routes - served by handle_bulk_import / handle_export / handle_events
+            return {
+                "error": "Validation Failed",
+                "message": f"{method} /{path.strip('/')} is a streaming route and must be called directly",
+                "user_role": user_role,
+                "timestamp": self._get_timestamp()
+            }
         
         # Check if this is a UI request (frontend wants UI instructions)
         is_ui_request = headers.get('x-ui-request', '').lower() == 'true'
         if is_ui_request:
-            print("🎨 UI Request detected - will include UI generation instructions")
+            log.debug("🎨 UI Request detected - will include UI generation instructions")
         
-        # AI determines what this request is asking for
-        request_intent = self._analyze_request_intent(path, method, data)
-        print(f"🎯 AI determined intent: {request_intent['action']}")
+        # AI determines what this request is asking for (unless already resolved by a batch)
+        intent_start = None
+        if request_intent is None:
+            intent_start = time.perf_counter()
+            try:
+                request_intent = self._analyze_request_intent(path, method, data, user_role)
+            except RateLimited as e:
+                return self._rate_limited_response(user_role, e.scope, e.retry_after)
+        log.info("🎯 AI determined intent: %s", request_intent["action"])
+        metrics.set_action(request_intent["action"])
+        if intent_start is not None:
+            # Recorded once the action is set, so the intent stage carries the resolved action
+            metrics.observe_stage("intent", intent_start)
+        labels = metrics.current_labels()
+        metrics.IN_FLIGHT.inc(**labels)
+        try:
+            response = await self._handle_intent(request_intent, path, method, user_role, data, is_ui_request)
+        finally:
+            metrics.IN_FLIGHT.dec(**labels)
+        
+        # A client that still holds an earlier version of this view's UI gets only the changes
+        base_version = headers.get('x-ui-version')
+        if base_version and "ui_version" in response:
+            response = self._ui_delta(response, user_role, base_version)
+        return response
+    
+    async def _handle_intent(self, request_intent: Dict, path: str, method: str, user_role: str,
+                             data: Dict, is_ui_request: bool) -> Dict:
+        """Permission check, response cache and handler for a resolved intent"""
         
         # AI checks if user can perform this action
-        permission_check = self._check_permissions(user_role, request_intent)
+        with metrics.stage("permission"):
+            permission_check = self._check_permissions(user_role, request_intent)
         
         if not permission_check["allowed"]:
             return {
@@ -166,9 +590,94 @@ class AIRuntimeEngine:
                 "timestamp": self._get_timestamp()
             }
         
+        wait = self.rate_limiter.admit_action(request_intent["action"], user_role)
+        if wait:
+            return self._rate_limited_response(user_role, request_intent["action"], wait)
+        
+        # Read-only responses are served from cache while the stored data and the
+        # policy paths the response was built from are unchanged
+        action = request_intent["action"]
+        cache_key = self._response_cache_key(action, user_role, is_ui_request, data)
+        if cache_key:
+            version = self.storage.get_version()
+            cached = self.response_cache.get(cache_key)
+            hit = (cached is not None and cached["version"] == version
+                   and all(self.policy_hashes.get(path) == digest for path, digest in cached["policies"].items()))
+            metrics.record_cache_lookup("responses", hit)
+            if hit:
+                log.debug("⚡ Response cache hit: %s", cache_key)
+                return {**cached["response"], "timestamp": self._get_timestamp()}
+        
+        with record_policy_reads(cache_key is not None) as policy_paths:
+            with metrics.stage("handler"):
+                response = await self._dispatch_intent(request_intent, path, method, user_role, data, is_ui_request)
+            response = self._version_ui(response, user_role)
+        
+        if cache_key and "error" not in response:
+            self.policy_graph.setdefault(action, set()).update(policy_paths)
+            self.response_cache.set(cache_key, {
+                "version": version,
+                "response": response,
+                "policies": {path: self.policy_hashes.get(path) for path in policy_paths}
+            })
+        return response
+    
+    def _version_ui(self, response: Dict, user_role: str) -> Dict:
+        """Tag ui_instructions with a content version and keep them as a base for later deltas"""
+        ui_instructions = response.get("ui_instructions")
+        if not isinstance(ui_instructions, dict):
+            return response
+        note_policy_read(PERFORMANCE_PATH)  # whether the response carries a ui_version
+        if self.ui_bases is None:
+            return response
+        encoded = dump_json(ui_instructions)
+        version = hashlib.sha256(encoded).hexdigest()[:16]
+        if self.ui_bases.get(f"{user_role}|{version}") is None:
+            self.ui_bases.set(f"{user_role}|{version}", encoded)
+        response["ui_version"] = version
+        return response
+    
+    def _ui_delta(self, response: Dict, user_role: str, base_version: str) -> Dict:
+        """
+        Replace ui_instructions with a JSON Patch (ui_patch) against the client's base version.
+        The full tree is kept when the base is unknown (expired, other role) or the patch is no smaller.
+        """
+        version = response["ui_version"]
+        base = self.ui_bases.get(f"{user_role}|{base_version}")
+        if base is None:
+            metrics.UI_RESPONSES.inc(encoding="full")
+            return response
+        with metrics.stage("ui_delta"):
+            if base_version == version:
+                patch = []
+            else:
+                current = self.ui_bases.get(f"{user_role}|{version}") or dump_json(response["ui_instructions"])
+                patch = make_patch(json.loads(base), json.loads(current))
+                if len(dump_json(patch)) >= len(current):
+                    metrics.UI_RESPONSES.inc(encoding="full")
+                    return response
+        metrics.UI_RESPONSES.inc(encoding="delta" if patch else "unchanged")
+        delta = {key: value for key, value in response.items() if key != "ui_instructions"}
+        delta.update({"ui_patch": patch, "ui_base_version": base_version})
+        return delta
+    
+    def _response_cache_key(self, action: str, user_role: str, is_ui_request: bool, data: Dict) -> Optional[str]:
+        """Cache key for cacheable (read-only) actions, None for everything else"""
+        if self.response_cache is None or action not in CACHEABLE_ACTIONS:
+            return None
+        sections = ",".join(self._response_sections(action, user_role, data, is_ui_request))
+        return f"{action}|{user_role}|{'ui' if is_ui_request else 'api'}|{sections}"
+    
+    async def _dispatch_intent(self, request_intent: Dict, path: str, method: str, user_role: str,
+                               data: Dict, is_ui_request: bool) -> Dict:
+        """Route a resolved intent to its handler"""
+        if request_intent["action"] in CATALOG_ACTIONS:
+            await self._load_catalog()
+        
         # AI processes the request and generates response
         if request_intent["action"] == "get_products":
-            return await self._handle_get_products(user_role, is_ui_request)
+            sections = self._response_sections("get_products", user_role, data, is_ui_request)
+            return await self._handle_get_products(user_role, is_ui_request, sections)
         elif request_intent["action"] == "add_product":
             return await self._handle_add_product(user_role, data, is_ui_request)
         elif request_intent["action"] == "delete_product":
@@ -197,54 +706,470 @@ class AIRuntimeEngine:
         elif request_intent["action"] == "get_demo_info":
             return await self._handle_demo_info()
         elif request_intent["action"] == "get_categories":
-            print(f"DEBUG: handle_request is about to call _handle_get_categories for action: {request_intent['action']}")
             return await self._handle_get_categories(user_role, is_ui_request)
         elif request_intent["action"] == "get_menu_items":
             return await self._handle_get_menu_items(user_role)
+        elif request_intent["action"] == "get_low_stock":
+            return await self._handle_get_low_stock(user_role, data)
         else:
             return await self._handle_unknown_request(path, method, user_role, data)
     
-    def _analyze_request_intent(self, path: str, method: str, data: Dict) -> Dict:
-        """AI determines what the user is trying to do - NO HARDCODED LOGIC"""
+    async def handle_batch(self, sub_requests: List[Dict], user_role: str, headers: Dict) -> Dict:
+        """
+        AI resolves the intents of several requests in ONE call,
+        then handles them concurrently and multiplexes the responses.
+        """
         
-        # Create AI prompt for request analysis
-        prompt = f"""
-        Analyze this HTTP request and determine the user's intent.
+        if not isinstance(sub_requests, list) or not sub_requests:
+            return {
+                "error": "Validation Failed",
+                "message": "Batch requests must be a non-empty 'requests' array",
+                "user_role": user_role,
+                "timestamp": self._get_timestamp()
+            }
+        if len(sub_requests) > MAX_BATCH_SIZE:
+            return {
+                "error": "Validation Failed",
+                "message": f"Batch contains {len(sub_requests)} requests, maximum is {MAX_BATCH_SIZE}",
+                "user_role": user_role,
+                "timestamp": self._get_timestamp()
+            }
         
-        Path: {path}
-        Method: {method}
-        Data: {data}
+        # Normalize sub-requests; they inherit the batch's headers (and therefore its role)
+        normalized = []
+        for index, sub_request in enumerate(sub_requests):
+            if not isinstance(sub_request, dict):
+                sub_request = {}
+            sub_headers = dict(headers)
+            sub_headers.update({key.lower(): str(value) for key, value in (sub_request.get("headers") or {}).items()})
+            sub_headers["x-user-role"] = user_role
+            normalized.append({
+                "id": sub_request.get("id", str(index)),
+                "path": str(sub_request.get("path", "")).lstrip("/"),
+                "method": str(sub_request.get("method", "GET")).upper(),
+                "data": sub_request.get("data") or {},
+                "headers": sub_headers
+            })
         
-        Available actions: get_products, add_product, delete_product, get_user_context, get_health, get_demo_info, get_categories, get_menu_items, unknown
+        if any(RESERVED_ROUTES.get((item["method"], item["path"].strip("/"))) for item in normalized):
+            return {
+                "error": "Validation Failed",
+                "message": "Batches cannot contain engine routes (nested batches, bulk import/export)",
+                "user_role": user_role,
+                "timestamp": self._get_timestamp()
+            }
         
-        Return ONLY a JSON object with the action and any required parameters. Do NOT include any other text or explanation.
+        # ONE AI call resolves every intent in the batch
+        try:
+            with metrics.stage("intent"):
+                intents = self._analyze_request_intents(
+                    [(item["path"], item["method"], item["data"]) for item in normalized], user_role
+                )
+        except RateLimited as e:
+            return self._rate_limited_response(user_role, e.scope, e.retry_after)
+        
+        async def run(item: Dict, intent: Dict) -> Dict:
+            try:
+                body = await self.handle_request(
+                    path=item["path"],
+                    method=item["method"],
+                    user_role=user_role,
+                    data=item["data"],
+                    headers=item["headers"],
+                    request_intent=intent
+                )
+            except Exception as e:
+                body = await self.handle_error(str(e), user_role, item["path"])
+            return {"id": item["id"], "status": self.status_code_for(body), "body": body}
         
-        Examples:
-        - For GET /api/products: {{"action": "get_products"}}
-        - For POST /api/products: {{"action": "add_product"}}
-        - For DELETE /api/products/p4: {{"action": "delete_product", "product_id": "p4"}}
-        - For GET /api/user-context/admin: {{"action": "get_user_context", "role": "admin"}}
-        - For GET /api/categories: {{"action": "get_categories"}}
-        - For GET /api/menu-items: {{"action": "get_menu_items"}}
+        responses = await asyncio.gather(*(run(item, intent) for item, intent in zip(normalized, intents)))
+        
+        return {
+            "responses": list(responses),
+            "count": len(responses),
+            "user_role": user_role,
+            "generated_by": "AI Runtime Engine - Batched Intent Resolution",
+            "timestamp": self._get_timestamp()
+        }
+    
+    def begin_metrics(self, user_role: str):
+        """Label this request's metrics with its role (unknown roles share one label value)"""
+        known = user_role in self.policies.get("access_policies", {})
+        metrics.begin_request(user_role if known else "other")
+    
+    def render_metrics(self) -> str:
+        """Prometheus text exposition of the engine's metrics"""
+        for cache in (self.intent_cache, self.response_cache):
+            if cache is not None:
+                metrics.CACHE_HIT_RATIO.set(cache.stats()["hit_ratio"], cache=cache.name)
+        return metrics.render()
+    
+    def start_trace(self, request_id: Optional[str], method: str, path: str, user_role: str) -> Optional[tracing.Trace]:
+        """Trace this request (spans come from every timed stage); request_id is the caller's X-Request-ID"""
+        if not self.tracing_config["enabled"]:
+            return None
+        return tracing.start_trace(tracing.request_id_from(request_id), method, path, user_role)
+    
+    def finish_trace(self, trace: tracing.Trace, status: int) -> Dict[str, str]:
+        """Close a request's trace; returns the response headers that report it"""
+        trace.finish(status)
+        trace.action = metrics.current_labels()["action"]
+        self.slow_traces.add(trace)
+        headers = {"X-Request-ID": trace.request_id}
+        if self.tracing_config["server_timing"]:
+            headers["Server-Timing"] = trace.server_timing()
+        return headers
+    
+    def handle_debug_traces(self, user_role: str, params: Dict) -> Dict:
+        """The slowest recent requests with their span breakdown (?limit=N)"""
+        
+        permission_check = self._check_permissions(user_role, {"action": "debug_traces"})
+        if not permission_check["allowed"]:
+            return {
+                "error": "Access Denied",
+                "message": permission_check["message"],
+                "user_role": user_role,
+                "requested_action": "debug_traces",
+                "timestamp": self._get_timestamp()
+            }
         
-        IMPORTANT: For delete operations, use "product_id" field name, not "entity".
+        try:
+            limit = max(0, int(params.get("limit", 0)))
+        except ValueError:
+            limit = 0
+        traces = self.slow_traces.slowest(limit or None)
+        return {
+            "traces": [trace.to_dict() for trace in traces],
+            "count": len(traces),
+            "capacity": self.slow_traces.size,
+            "timestamp": self._get_timestamp()
+        }
+    
+    def admit_request(self, user_role: str, peer: Optional[str], forwarded_for: Optional[str] = None,
+                      action: Optional[str] = None) -> Optional[Dict]:
+        """Spend this request's rate-limit tokens; returns a 429 response if a budget is exhausted"""
+        client_ip = self.rate_limiter.client_ip(peer, forwarded_for)
+        wait = self.rate_limiter.admit_request(user_role, client_ip)
+        scope = "request"
+        if not wait and action is not None:
+            wait, scope = self.rate_limiter.admit_action(action, user_role), action
+        return self._rate_limited_response(user_role, scope, wait) if wait else None
+    
+    def _rate_limited_response(self, user_role: str, scope: str, retry_after: float) -> Dict:
+        log.warning("🚦 Rate limited: %s budget of role '%s' exhausted", scope, user_role, retry_after=round(retry_after, 2))
+        return {
+            "error": "Rate Limited",
+            "message": f"Too many {scope} requests for role '{user_role}' - retry in {retry_after_header(retry_after)}s",
+            "user_role": user_role,
+            "retry_after": retry_after_header(retry_after),
+            "timestamp": self._get_timestamp()
+        }
+    
+    def reserved_action(self, path: str, method: str) -> Optional[str]:
+        """Engine-level action served for this route without AI intent analysis, if any"""
+        return RESERVED_ROUTES.get((method, path.strip("/")))
+    
+    def status_code_for(self, response: Dict) -> int:
+        """AI determines the HTTP status code from the response it generated"""
+        if "error" not in response:
+            return 200
+        error = response.get("error", "")
+        if "Access Denied" in error:
+            return 403
+        elif "Rate Limited" in error:
+            return 429
+        elif "Not Found" in error:
+            return 404
+        elif "Validation" in error:
+            return 400
+        return 500
+    
+    async def handle_bulk_import(self, user_role: str, chunks, content_type: str, params: Dict) -> Dict:
+        """
+        Bulk product import from a streamed NDJSON or CSV body.
+        Rows are parsed as the body arrives, validated in batches against business rules
+        and applied in ONE storage write - no AI call per row.
         """
         
-        # AI must determine the intent - no fallback logic allowed
-        ai_response = self.ai_provider.generate_response(prompt)
+        permission_check = self._check_permissions(user_role, {"action": "bulk_import_products"})
+        if not permission_check["allowed"]:
+            return {
+                "error": "Access Denied",
+                "message": permission_check["message"],
+                "user_role": user_role,
+                "requested_action": "bulk_import_products",
+                "timestamp": self._get_timestamp()
+            }
+        
+        fmt = detect_format(content_type, params.get("format"))
+        atomic = str(params.get("atomic", "false")).lower() == "true"
+        fields = self.policies.get("entities", {}).get("product", {}).get("fields", ["id", "name", "category", "price", "stock"])
+        
+        # Rows carrying an existing id update that product - only roles with 'update' may do that
+        # (checked against the catalog inside the commit, so a concurrent add is never overwritten)
+        permissions = self.policies.get("access_policies", {}).get(user_role, {}).get("permissions", [])
+        allow_update = "update" in permissions
+        
+        accepted, accepted_lines, errors, pending = [], [], [], []
+        seen_ids = set()
+        counts = {"rows": 0, "rejected": 0}
+        
+        def reject(line: int, message: str):
+            counts["rejected"] += 1
+            if len(errors) < MAX_REPORTED_ROW_ERRORS:
+                errors.append({"line": line, "message": message})
+        
+        def validate_pending():
+            rows, row_errors = self.product_validator.validate_batch([row for _, row in pending])
+            row_errors = dict(row_errors)
+            for index, ((line, _), row) in enumerate(zip(pending, rows)):
+                if index in row_errors:
+                    reject(line, row_errors[index])
+                elif row.get("id") is not None and row["id"] in seen_ids:
+                    reject(line, f"Duplicate id '{row['id']}' in import")
+                else:
+                    if row.get("id") is not None:
+                        seen_ids.add(row["id"])
+                    accepted.append(row)
+                    accepted_lines.append(line)
+            pending.clear()
+        
+        async for line, row, parse_error in iter_product_rows(chunks, fmt):
+            counts["rows"] += 1
+            if parse_error:
+                reject(line, parse_error)
+                continue
+            pending.append((line, {key: value for key, value in row.items() if key in fields}))
+            if len(pending) >= BULK_VALIDATION_BATCH:
+                validate_pending()
+        validate_pending()
+        
+        log.info("📥 Bulk import (%s): %d rows, %d valid, %d rejected", fmt, counts["rows"], len(accepted), counts["rejected"])
+        
+        if not accepted or (atomic and counts["rejected"]):
+            return {
+                "error": "Validation Failed",
+                "message": "No rows imported" + (" (atomic import rejects the whole file on any invalid row)" if accepted else ""),
+                "rows": counts["rows"],
+                "rejected": counts["rejected"],
+                "row_errors": errors,
+                "user_role": user_role,
+                "timestamp": self._get_timestamp()
+            }
+        
+        # One mutation, one durable write for the whole file
+        with metrics.stage("storage_write"):
+            skipped = await self.storage.upsert_products_async(accepted, allow_update=allow_update, atomic=atomic)
+        if skipped is None:
+            return {
+                "error": "Storage Error",
+                "message": "AI Runtime Engine failed to save imported products",
+                "user_role": user_role,
+                "timestamp": self._get_timestamp()
+            }
+        for index in skipped:
+            reject(accepted_lines[index], f"Product '{accepted[index]['id']}' already exists; updating it requires 'update' permission")
+        imported = len(accepted) - len(skipped)
+        if skipped and (atomic or not imported):
+            return {
+                "error": "Validation Failed",
+                "message": "No rows imported" + (" (atomic import rejects the whole file on any invalid row)" if atomic else ""),
+                "rows": counts["rows"],
+                "rejected": counts["rejected"],
+                "row_errors": errors,
+                "user_role": user_role,
+                "timestamp": self._get_timestamp()
+            }
+        
+        return {
+            "success": True,
+            "message": f"{imported} products imported by {user_role}",
+            "format": fmt,
+            "rows": counts["rows"],
+            "imported": imported,
+            "rejected": counts["rejected"],
+            "row_errors": errors,
+            "user_role": user_role,
+            "timestamp": self._get_timestamp()
+        }
+    
+    def handle_export(self, user_role: str, params: Dict) -> Dict:
+        """Streaming product export; returns an error response or the chunk iterator to send"""
+        
+        permission_check = self._check_permissions(user_role, {"action": "export_products"})
+        if not permission_check["allowed"]:
+            return {
+                "error": "Access Denied",
+                "message": permission_check["message"],
+                "user_role": user_role,
+                "requested_action": "export_products",
+                "timestamp": self._get_timestamp()
+            }
+        
+        fmt = params.get("format") if params.get("format") in MEDIA_TYPES else "ndjson"
+        products = self.storage.get_products()
+        log.info("📤 Bulk export (%s): %d products for %s", fmt, len(products), user_role)
+        return {
+            "stream": export_chunks(products, fmt),
+            "media_type": MEDIA_TYPES[fmt],
+            "filename": f"products.{fmt}",
+            "count": len(products)
+        }
+    
+    def handle_events(self, user_role: str, last_event_id: Optional[str] = None) -> Dict:
+        """Server-Sent Events change feed; returns an error response or the event stream to send"""
+        
+        permission_check = self._check_permissions(user_role, {"action": "subscribe_events"})
+        if not permission_check["allowed"]:
+            return {
+                "error": "Access Denied",
+                "message": permission_check["message"],
+                "user_role": user_role,
+                "requested_action": "subscribe_events",
+                "timestamp": self._get_timestamp()
+            }
         
         try:
-            import json
-            print(f"DEBUG: Raw AI response: {ai_response}") # Added for debugging
-            # Parse AI response as JSON
-            intent = json.loads(ai_response)
-            if "action" not in intent:
-                raise ValueError("AI response missing 'action' field")
-            return intent
-        except Exception as e:
-            # If AI fails, the application MUST fail - no fallback
-            raise RuntimeError(f"AI Engine Failed: Unable to analyze request intent. AI Response: {ai_response}. Error: {e}")
+            since = int(last_event_id) if last_event_id else None
+        except ValueError:
+            since = None
+        log.info("📡 Change feed subscriber connected: %s", user_role)
+        return {"stream": self._event_stream(user_role, since)}
+    
+    async def _event_stream(self, user_role: str, since: Optional[int]):
+        """Push each storage commit to one subscriber, filtered for its role"""
+        feed = self.storage.change_feed
+        subscriber = feed.subscribe()
+        try:
+            last_sent = feed.last_sequence
+            yield f"retry: {EVENT_RETRY_MS}\n\n"
+            
+            # Reconnect: replay what the client missed, or ask it to refetch if that is gone
+            missed = feed.events_since(since) if since is not None else []
+            if missed is None:
+                yield format_sse("resync", {"reason": "missed events are no longer buffered"}, last_sent)
+                missed = []
+            yield format_sse("ready", {"user_role": user_role, "sequence": last_sent}, None if missed else last_sent)
+            for event in missed:
+                last_sent = max(last_sent, event["sequence"])
+                yield format_sse("change", self._change_event_for_role(event, user_role), event["sequence"])
+            
+            version = self.storage.get_version()
+            idle = 0.0
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), EVENT_VERSION_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    # Commits by other worker processes never reach this process's feed
+                    current = self.storage.get_version()
+                    if current != version:
+                        version = current
+                        yield format_sse("resync", {"reason": "catalog changed in another worker"}, last_sent)
+                    idle += EVENT_VERSION_POLL_SECONDS
+                    if idle >= EVENT_HEARTBEAT_SECONDS:
+                        idle = 0.0
+                        yield ": keep-alive\n\n"
+                    continue
+                
+                idle = 0.0
+                version = self.storage.get_version()
+                if event["type"] == "resync":
+                    subscriber.overflowed = False
+                    yield format_sse("resync", {"reason": event["reason"]}, last_sent)
+                elif event["sequence"] > last_sent:
+                    last_sent = event["sequence"]
+                    yield format_sse("change", self._change_event_for_role(event, user_role), last_sent)
+        finally:
+            feed.unsubscribe(subscriber)
+            log.info("📡 Change feed subscriber disconnected: %s", user_role)
+    
+    def _change_event_for_role(self, event: Dict, user_role: str) -> Dict:
+        """The part of a change event this role may see - category deltas follow categories_feature access"""
+        filtered = {
+            "sequence": event["sequence"],
+            "timestamp": event["timestamp"],
+            "changed": event["changed"],
+            "products": event["products"]
+        }
+        
+        categories_feature = self.policies.get("categories_feature", {})
+        user_access = categories_feature.get("access_control", {}).get(user_role, {})
+        if categories_feature.get("enabled", False) and user_access.get("allowed", False):
+            # Same fields the role gets from get_categories
+            fields = ["name", "product_count", "total_inventory_value"]
+            features = user_access.get("features", [])
+            if "basic_analytics" in features:
+                fields.append("low_stock_alerts")
+            if "advanced_metrics" in features:
+                fields.extend(["total_stock_units", "price_sum"])
+            filtered["category_deltas"] = [
+                {field: delta[field] for field in fields}
+                for delta in event["category_deltas"]
+            ]
+        return filtered
     
+    def _analyze_request_intents(self, requests: List[tuple], user_role: str) -> List[Dict]:
+        """AI determines the intents of several requests with a single prompt"""
+        
+        # Only intents that are not cached yet go to the AI
+        intents = [self._cached_intent(path, method) for path, method, _ in requests]
+        unknown = [index for index, intent in enumerate(intents) if intent is None]
+        
+        if len(unknown) == 1:
+            path, method, data = requests[unknown[0]]
+            intents[unknown[0]] = self._analyze_request_intent(path, method, data, user_role)
+        elif unknown:
+            self.rate_limiter.admit_llm(user_role)
+            prompt = self.prompt_builder.build_batch([requests[index] for index in unknown])
+            
+            # AI must determine the intents - no fallback logic allowed
+            try:
+                answer = self._call_provider_json(prompt, "batch_intent", make_batch_validator(self.intent_actions, len(unknown)))
+            except ValueError as e:
+                # If AI fails, the application MUST fail - no fallback
+                raise RuntimeError(f"AI Engine Failed: Unable to analyze batch intents. Error: {e}")
+            for index, intent in zip(unknown, answer["intents"]):
+                path, method, _ = requests[index]
+                self._cache_intent(path, method, intent)
+                intents[index] = intent
+        
+        return intents
+    
+    def _cached_intent(self, path: str, method: str) -> Optional[Dict]:
+        if self.intent_cache is None:
+            return None
+        intent = self.intent_cache.get(f"{method} {path.strip('/')}")
+        metrics.record_cache_lookup("intents", intent is not None)
+        return intent
+    
+    def _cache_intent(self, path: str, method: str, intent: Dict):
+        if self.intent_cache is not None:
+            self.intent_cache.set(f"{method} {path.strip('/')}", intent)
+    
+    def _analyze_request_intent(self, path: str, method: str, data: Dict, user_role: str) -> Dict:
+        """AI determines what the user is trying to do - NO HARDCODED LOGIC"""
+        
+        # The same method + path always means the same intent
+        cached = self._cached_intent(path, method)
+        if cached is not None:
+            return cached
+        
+        # Uncached intents cost a provider call - they spend the stricter LLM budget
+        self.rate_limiter.admit_llm(user_role)
+        
+        # Compact prompt: precompiled policy-derived prefix + budgeted request suffix
+        prompt = self.prompt_builder.build(path, method, data)
+        
+        # AI must determine the intent - no fallback logic allowed; stray prose around
+        # the JSON object is tolerated, the object itself must match the action schema
+        try:
+            intent = self._call_provider_json(prompt, "intent", self.intent_validator)
+        except ValueError as e:
+            # If AI fails, the application MUST fail - no fallback
+            raise RuntimeError(f"AI Engine Failed: Unable to analyze request intent. Error: {e}")
+        
+        self._cache_intent(path, method, intent)
+        return intent
     
     def _check_permissions(self, user_role: str, request_intent: Dict) -> Dict:
         """AI checks if user can perform the requested action"""
@@ -254,18 +1179,8 @@ class AIRuntimeEngine:
         permissions = user_policies.get("permissions", [])
         
         # Map actions to required permissions
-        action_permission_map = {
-            "get_products": "view",
-            "add_product": "add", 
-            "delete_product": "delete",
-            "get_user_context": "view",
-            "get_health": "view",
-            "get_demo_info": "view",
-            "get_categories": "view",
-            "get_menu_items": "view"
-        }
-        
-        required_permission = action_permission_map.get(request_intent["action"])
+        required_permission = (ACTION_PERMISSIONS.get(request_intent["action"])
+                               or RESERVED_ACTION_PERMISSIONS.get(request_intent["action"]))
         
         if required_permission and required_permission in permissions:
             return {
@@ -278,12 +1193,15 @@ class AIRuntimeEngine:
                 "message": f"Role '{user_role}' cannot perform '{request_intent['action']}'. Required permission: '{required_permission}'"
             }
     
-    async def _handle_get_products(self, user_role: str, is_ui_request: bool = False) -> Dict:
+    async def _handle_get_products(self, user_role: str, is_ui_request: bool = False,
+                                   sections: Optional[List[str]] = None) -> Dict:
         """AI generates product list response based on user role"""
         
         products = self.storage.get_products()
         access_policies = self.policies.get("access_policies", {})
         user_policies = access_policies.get(user_role, {})
+        if sections is None:
+            sections = self._response_sections("get_products", user_role, {}, is_ui_request)
         
         # AI determines response structure based on user role
         response = {
@@ -301,19 +1219,16 @@ class AIRuntimeEngine:
             try:
                 response = self.ai_provider.enhance_response(response, f"product_list_for_{user_role}")
             except Exception as e:
-                print(f"⚠️ AI enhancement failed: {e}")
+                log.warning("⚠️ AI enhancement failed: %s", e)
                 response["ai_note"] = "AI enhancement attempted but fell back to policy-based response"
         
-        # AI adds role-specific data
-        ui_behavior = self.policies.get("ui_behavior", {})
-        themes = ui_behavior.get("themes", {})
-        
-        if user_role in themes:
+        # Optional sections are built only when selected - a plain listing never computes stats
+        themes = self.policies.get("ui_behavior", {}).get("themes", {})
+        if "theme" in sections and user_role in themes:
             response["theme"] = themes[user_role]
         
-        # Admin gets additional AI-generated insights
-        if user_role == "admin":
-            stats = self.storage.get_stats()
+        stats = await self._get_stats() if {"admin_insights", "manager_insights"} & set(sections) else None
+        if "admin_insights" in sections:
             response["admin_insights"] = {
                 "total_products": stats["total_products"],
                 "total_value": stats["total_inventory_value"],
@@ -321,23 +1236,47 @@ class AIRuntimeEngine:
                 "categories": stats["categories"]
             }
         
-        # Manager gets business insights
-        elif user_role == "manager":
-            stats = self.storage.get_stats()
+        if "manager_insights" in sections:
             response["manager_insights"] = {
                 "total_products": stats["total_products"],
                 "categories": stats["categories"],
-                "action_needed": len(stats["low_stock_items"]) > 0
+                "action_needed": stats["low_stock_count"] > 0
             }
         
-        # Add UI generation instructions if this is a UI request
-        if is_ui_request:
+        if "ui_instructions" in sections:
             response["ui_instructions"] = self._generate_ui_instructions(user_role, "products", response)
         
         return response
     
+    def _response_sections(self, action: str, user_role: str, data: Dict, is_ui_request: bool) -> List[str]:
+        """
+        Optional sections to materialize for this response, from ui_behavior.response_sections:
+        the role's ui_elements must cover a section's `requires`, and the request must ask
+        for it - by name in ?fields=, or by request kind via its `default` list.
+        """
+        declared = (self.policies.get("ui_behavior", {}).get("response_sections", {}).get(action)
+                    or DEFAULT_RESPONSE_SECTIONS.get(action, {}))
+        ui_elements = set(self.policies.get("access_policies", {}).get(user_role, {}).get("ui_elements", []))
+        
+        fields = data.get("fields") if isinstance(data, dict) else None
+        requested = {name.strip() for name in str(fields).split(",")} if fields else None
+        kind = "ui" if is_ui_request else "api"
+        
+        sections = []
+        for name, spec in declared.items():
+            if not set(spec.get("requires", [])) <= ui_elements:
+                continue
+            if (name in requested) if requested is not None else (kind in spec.get("default", [])):
+                sections.append(name)
+        return sorted(sections)
+    
     def _generate_ui_instructions(self, user_role: str, view_type: str, data: Dict) -> Dict:
         """Generate AI-driven UI instructions for dynamic frontend rendering"""
+        with metrics.stage("ui_generation"):
+            return self._build_ui_instructions(user_role, view_type, data)
+    
+    def _build_ui_instructions(self, user_role: str, view_type: str, data: Dict) -> Dict:
+        """UI instructions for one view (see _generate_ui_instructions)"""
         
         access_policies = self.policies.get("access_policies", {})
         user_policies = access_policies.get(user_role, {})
@@ -403,9 +1342,11 @@ class AIRuntimeEngine:
                         "fields": [
                             {"name": "name", "type": "text", "required": True, "label": "Product Name"},
                             {"name": "category", "type": "select", "required": True, "label": "Category", 
-                             "options": ["Electronics", "Furniture", "Stationery", "Clothing", "Books"]},
-                            {"name": "price", "type": "number", "required": True, "label": "Price", "min": 0.01},
-                            {"name": "stock", "type": "number", "required": True, "label": "Stock", "min": 0}
+                             "options": self.product_validator.allowed_categories or ["Electronics", "Furniture", "Stationery"]},
+                            {"name": "price", "type": "number", "required": True, "label": "Price",
+                             "min": self.product_validator.min_price, "max": self.product_validator.max_price},
+                            {"name": "stock", "type": "number", "required": True, "label": "Stock",
+                             "min": 0, "max": self.product_validator.max_stock}
                         ],
                         "submitEndpoint": "/api/products",
                         "submitMethod": "POST"
@@ -416,11 +1357,9 @@ class AIRuntimeEngine:
                 })
         
         elif view_type == "categories":
-            print(f"DEBUG: _generate_ui_instructions - Handling categories view for role: {user_role}")
-            print(f"DEBUG: _generate_ui_instructions - Permissions for categories: {permissions}")
+            log.debug("Generating categories UI", role=user_role, permissions=permissions)
             # Simple categories table - keep it simple for concept demo
             if "view_categories" in permissions:
-                print("DEBUG: _generate_ui_instructions - 'view_categories' permission found. Adding analytics component.")
                 ui_config["components"].append({
                     "id": "categories-analytics",
                     "type": "analytics", 
@@ -435,7 +1374,7 @@ class AIRuntimeEngine:
                     "position": {"section": "main", "order": 1}
                 })
             else:
-                print("DEBUG: _generate_ui_instructions - 'view_categories' permission NOT found. No analytics component added.")
+                log.debug("No 'view_categories' permission - categories analytics component omitted", role=user_role)
         
         # Add admin dashboard components
         if user_role == "admin" and data.get("admin_insights"):
@@ -491,21 +1430,12 @@ class AIRuntimeEngine:
                 "timestamp": self._get_timestamp()
             }
         
-        # Ensure numeric fields are properly typed (convert from strings if needed)
-        if "price" in product_data:
-            try:
-                product_data["price"] = float(product_data["price"])
-            except (ValueError, TypeError):
-                product_data["price"] = 0.0
-                
-        if "stock" in product_data:
-            try:
-                product_data["stock"] = int(product_data["stock"])
-            except (ValueError, TypeError):
-                product_data["stock"] = 0
+        # Numeric fields typed and category in its canonical spelling
+        product_data = validation["product"]
         
         # AI adds the product
-        success = self.storage.add_product(product_data)
+        with metrics.stage("storage_write"):
+            success = await self.storage.add_product_async(product_data)
         
         if success:
             return {
@@ -539,7 +1469,8 @@ class AIRuntimeEngine:
             }
         
         # AI performs deletion
-        success = self.storage.delete_product(product_id)
+        with metrics.stage("storage_write"):
+            success = await self.storage.delete_product_async(product_id)
         
         if success:
             return {
@@ -578,7 +1509,7 @@ class AIRuntimeEngine:
             "theme": themes.get(user_role, {"color": "gray", "layout": "minimal"}),
             "message": user_policies.get("message", f"Context for {user_role}"),
             "available_actions": self._get_available_actions(user_role),
-            "ai_suggestions": self._get_user_suggestions(user_role),
+            "ai_suggestions": await self._get_user_suggestions(user_role),
             "timestamp": self._get_timestamp()
         }
         
@@ -590,7 +1521,7 @@ class AIRuntimeEngine:
     
     async def _handle_health_check(self) -> Dict:
         """AI-generated health check"""
-        stats = self.storage.get_stats()
+        stats = await self._get_stats()
         
         return {
             "status": "UP",
@@ -650,8 +1581,6 @@ class AIRuntimeEngine:
     
     async def _handle_get_categories(self, user_role: str, is_ui_request: bool = False) -> Dict:
         """AI generates product categories response based on policies"""
-        print(f"DEBUG: _handle_get_categories called. is_ui_request: {is_ui_request}")
-        
         # Check permissions from loaded policies
         access_policies = self.policies.get("access_policies", {})
         user_policies = access_policies.get(user_role, {})
@@ -680,48 +1609,22 @@ class AIRuntimeEngine:
         aggregation_rules = categories_feature.get("aggregation_rules", {})
         group_by_field = aggregation_rules.get("group_by_field", "category")
         
-        # Get products and group by category
-        products = self.storage.get_products()
-        categories = {}
-        
-        for product in products:
-            category = product.get(group_by_field, "Unknown")
-            if category not in categories:
-                categories[category] = {
-                    "name": category,
-                    "product_count": 0,
-                    "total_inventory_value": 0,
-                    "total_stock_units": 0,
-                    "low_stock_alerts": 0,
-                    "products": []
-                }
-            
-            # Ensure price and stock are numbers (convert from string if needed)
-            price = float(product.get("price", 0))
-            stock = int(product.get("stock", 0))
-            value = price * stock
-            
-            categories[category]["product_count"] += 1
-            categories[category]["total_inventory_value"] += value
-            categories[category]["total_stock_units"] += stock
-            categories[category]["products"].append(product)
-            
-            if stock < 20:
-                categories[category]["low_stock_alerts"] += 1
+        # Group products by category - vectorized over the columnar product view (on the CPU executor when large)
+        columns = self.storage.get_columns()
+        categories = await self.executors.run_cpu(aggregate_groups, *columns.group_inputs(group_by_field),
+                                                  self.stock_tiers.low_stock, size=columns.count)
         
         # Build response based on role access level
         access_level = user_access.get("access_level", "basic")
         features = user_access.get("features", [])
         
         category_list = []
-        total_value = sum(cat["total_inventory_value"] for cat in categories.values())
+        total_value = sum(cat["total_inventory_value"] for cat in categories)
         
-        for category_data in categories.values():
+        for category_data in categories:
             # Calculate metrics
             if category_data["product_count"] > 0:
-                # Ensure prices are numbers when calculating average
-                total_price = sum(float(p.get("price", 0)) for p in category_data["products"])
-                average_price = total_price / category_data["product_count"]
+                average_price = category_data["price_sum"] / category_data["product_count"]
             else:
                 average_price = 0
             
@@ -771,7 +1674,7 @@ class AIRuntimeEngine:
         # Add UI generation instructions if this is a UI request
         if is_ui_request:
             ui_instructions = self._generate_ui_instructions(user_role, "categories", response)
-            print(f"DEBUG: Generated UI instructions for categories: {ui_instructions}")
+            log.debug("Generated UI instructions for categories", components=len(ui_instructions.get("components", [])))
             response["ui_instructions"] = ui_instructions
         
         return response
@@ -834,6 +1737,51 @@ class AIRuntimeEngine:
             "timestamp": self._get_timestamp()
         }
     
+    async def _handle_get_low_stock(self, user_role: str, data: Dict) -> Dict:
+        """AI lists products below a stock threshold using the policy's stock tiers"""
+        
+        tiers = self.stock_tiers
+        tier = data.get("tier")
+        if tier is not None and tier not in tiers.names:
+            return {
+                "error": "Validation Failed",
+                "message": f"Unknown stock tier '{tier}'. Tiers: {', '.join(tiers.names)}",
+                "user_role": user_role,
+                "timestamp": self._get_timestamp()
+            }
+        try:
+            threshold = int(data["below"]) if "below" in data else (tiers.threshold(tier) if tier else tiers.low_stock)
+            since = int(data.get("since", 0))
+        except (ValueError, TypeError):
+            return {
+                "error": "Validation Failed",
+                "message": "'below' and 'since' must be integers",
+                "user_role": user_role,
+                "timestamp": self._get_timestamp()
+            }
+        
+        # Range query on the stock index: a tier is [previous threshold, its threshold)
+        index = self.storage.get_stock_index()
+        if tier and "below" not in data:
+            position = tiers.names.index(tier)
+            lower = tiers.thresholds[position - 1] if position else -2**63
+            products = index.between(lower, threshold)
+        else:
+            products = index.below(threshold)
+        
+        return {
+            "products": products,
+            "count": len(products),
+            "threshold": threshold,
+            "tier": tier,
+            "tiers": tiers.to_dict(),
+            "tier_counts": index.tier_counts(tiers),
+            "alerts": self.storage.stock_alerts.events_since(since),
+            "user_role": user_role,
+            "message": f"{len(products)} products with stock below {threshold}",
+            "timestamp": self._get_timestamp()
+        }
+    
     async def _handle_unknown_request(self, path: str, method: str, user_role: str, data: Dict) -> Dict:
         """AI handles requests it doesn't recognize"""
         
@@ -850,6 +1798,7 @@ class AIRuntimeEngine:
             ],
             "supported_patterns": {
                 "GET /api/products": "List products with role-based filtering",
+                "GET /api/products/low-stock?tier=critical|low&below=N": "Products under a stock threshold",
                 "POST /api/products": "Add new product (if permitted)",
                 "DELETE /api/products/{id}": "Delete product (if permitted)",
                 "GET /api/user-context/{role}": "Get user capabilities",
@@ -861,42 +1810,8 @@ class AIRuntimeEngine:
         }
     
     def _validate_product_data(self, data: Dict) -> Dict:
-        """AI validates product data against business rules"""
-        
-        required_fields = ["name", "category", "price", "stock"]
-        missing_fields = [field for field in required_fields if field not in data or not data[field]]
-        
-        if missing_fields:
-            return {
-                "valid": False,
-                "message": f"Missing required fields: {', '.join(missing_fields)}",
-                "details": {"missing_fields": missing_fields, "required_fields": required_fields}
-            }
-        
-        # AI checks business rules from policies
-        business_rules = self.policies.get("business_rules", {})
-        
-        # Validate price
-        if isinstance(data.get("price"), (int, float)) and data["price"] <= 0:
-            return {
-                "valid": False,
-                "message": "Price must be greater than 0",
-                "details": {"invalid_field": "price", "value": data["price"]}
-            }
-        
-        # Validate stock
-        if isinstance(data.get("stock"), int) and data["stock"] < 0:
-            return {
-                "valid": False,
-                "message": "Stock cannot be negative",
-                "details": {"invalid_field": "stock", "value": data["stock"]}
-            }
-        
-        return {
-            "valid": True,
-            "message": "Product data is valid",
-            "ai_assessment": "All business rules satisfied"
-        }
+        """AI validates product data against the business rules compiled from policies"""
+        return self.product_validator.validate(data)
     
     def _get_available_actions(self, user_role: str) -> List[str]:
         """AI determines what actions user can perform"""
@@ -941,12 +1856,12 @@ class AIRuntimeEngine:
         else:
             return "Normal deletion - minimal inventory impact"
     
-    def _get_user_suggestions(self, user_role: str) -> List[str]:
+    async def _get_user_suggestions(self, user_role: str) -> List[str]:
         """AI generates personalized suggestions for user"""
         suggestions = []
         
         if user_role == "admin":
-            stats = self.storage.get_stats()
+            stats = await self._get_stats()
             if stats["low_stock_count"] > 0:
                 suggestions.append(f"Review {stats['low_stock_count']} low stock items")
             suggestions.append("Monitor inventory trends and user activity")
@@ -975,6 +1890,7 @@ class AIRuntimeEngine:
             "path": path,
             "ai_analysis": "Error handling demonstrates AI's resilience",
             "recovery_suggestion": "AI can adapt and continue operating",
+            "request_id": tracing.current_request_id(),
             "timestamp": self._get_timestamp()
         }
 
@@ -984,6 +1900,48 @@ class MockAIProvider:
     def generate_response(self, prompt: str) -> str:
         return f"Mock AI decision: {prompt[:50]}..."
 
+class LocalIntentProvider:
+    """In-process intent classification - no network, sub-millisecond answers"""
+    
+    def __init__(self, classifier: IntentClassifier, fallback=None, threshold: float = 0.75):
+        self.classifier = classifier
+        self.fallback = fallback
+        self.threshold = threshold
+        self.stats = {"local": 0, "escalated": 0}
+    
+    def generate_response(self, prompt: str) -> str:
+        """Classify intent prompts locally; escalate anything uncertain to the fallback provider"""
+        paths = [path.strip() for path in re.findall(r"^\s*Path:\s*(.*)$", prompt, re.MULTILINE)]
+        methods = re.findall(r"^\s*Method:\s*(\S+)", prompt, re.MULTILINE)
+        
+        if not paths or len(paths) != len(methods):
+            # Not an intent prompt - only a real model can answer it
+            if self.fallback is None:
+                raise RuntimeError("CRITICAL AI FAILURE: Local intent provider only answers intent prompts and has no fallback provider.")
+            return self.fallback.generate_response(prompt)
+        
+        requests = list(zip(methods, paths))
+        results = [self.classifier.classify(method, path) for method, path in requests]
+        
+        if all(confidence >= self.threshold for _, confidence in results) or self.fallback is None:
+            self.stats["local"] += 1
+            intents = [intent if confidence >= self.threshold else {"action": "unknown"} for intent, confidence in results]
+            return json.dumps(intents[0] if len(intents) == 1 else {"intents": intents})
+        
+        # Low confidence: ask the remote provider and learn from its answer
+        self.stats["escalated"] += 1
+        log.info("🧩 Local intent confidence %.2f below %s - escalating %d request(s)",
+                 min(confidence for _, confidence in results), self.threshold, len(requests))
+        ai_response = self.fallback.generate_response(prompt)
+        try:
+            answer = json.loads(ai_response)
+            resolved = answer.get("intents", []) if len(requests) > 1 else [answer]
+            for (method, path), intent in zip(requests, resolved):
+                self.classifier.learn(method, path, intent)
+        except (ValueError, AttributeError):
+            pass
+        return ai_response
+
 class HuggingFaceProvider:
     """Real AI using Hugging Face (free)"""
     
@@ -992,7 +1950,7 @@ class HuggingFaceProvider:
         self.model_name = os.getenv('HF_MODEL', 'microsoft/DialoGPT-medium')
         self.base_url = "https://api-inference.huggingface.co/models"
         self.headers = {"Authorization": f"Bearer {api_key}"}
-        print(f"🤖 HuggingFace AI Provider initialized with model: {self.model_name}")
+        log.info("🤖 HuggingFace AI Provider initialized with model: %s", self.model_name)
     
     def generate_response(self, prompt: str) -> str:
         """Generate AI response using HuggingFace Inference API"""
@@ -1007,7 +1965,8 @@ class HuggingFaceProvider:
                 "parameters": {
                     "max_length": 150,
                     "temperature": 0.7,
-                    "do_sample": True
+                    "do_sample": True,
+                    "return_full_text": False
                 }
             }
             
@@ -1068,27 +2027,78 @@ class HuggingFaceProvider:
 class OpenAIProvider:
     """Real AI using OpenAI"""
     
+    # Constant and first in the message list so OpenAI's automatic prompt caching
+    # can reuse it together with the static intent prompt prefix
+    SYSTEM_PROMPT = "Return valid JSON objects only."
+    
     def __init__(self, api_key: str):
-        from openai import OpenAI
-        self.client = OpenAI(api_key=api_key)
+        self.api_key = api_key
+        self._client = None
         self.model_name = os.getenv('OPENAI_MODEL', 'gpt-4o-mini') # Use a chat model
-        print(f"🤖 OpenAI AI Provider initialized with model: {self.model_name}")
+        self.last_usage = None
+        log.info("🤖 OpenAI AI Provider initialized with model: %s", self.model_name)
+    
+    @property
+    def client(self):
+        """The SDK is imported and its client built on first use, not at startup"""
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self.api_key)
+        return self._client
 
     def generate_response(self, prompt: str) -> str:
+        self.last_usage = None
         try:
             response = self.client.chat.completions.create(
                 model=self.model_name,
                 messages=[
-                    {"role": "system", "content": "You are a helpful assistant that returns JSON objects only. Always return valid JSON."},
+                    {"role": "system", "content": self.SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=150,
                 temperature=0.7,
                 response_format={ "type": "json_object" }
             )
+            self.last_usage = self._read_usage(response)
             return response.choices[0].message.content.strip()
         except Exception as e:
             raise RuntimeError(f"CRITICAL AI FAILURE: Pure AI Runtime Engine cannot work without AI. Error: {e}")
+    
+    def stream_response(self, prompt: str):
+        """Yield generated text as it arrives; closing the generator aborts the generation"""
+        self.last_usage = None
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=[
+                    {"role": "system", "content": self.SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=150,
+                temperature=0.7,
+                response_format={ "type": "json_object" },
+                stream=True
+            )
+        except Exception as e:
+            raise RuntimeError(f"CRITICAL AI FAILURE: Pure AI Runtime Engine cannot work without AI. Error: {e}")
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+    
+    def _read_usage(self, response) -> Optional[Dict]:
+        """Token usage reported by the API, including prompt tokens served from cache"""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return None
+        details = getattr(usage, "prompt_tokens_details", None)
+        return {
+            "tokens_in": usage.prompt_tokens,
+            "tokens_out": usage.completion_tokens,
+            "cached_tokens": getattr(details, "cached_tokens", 0) or 0
+        }
 
 class OllamaProvider:
     """Local AI using Ollama"""
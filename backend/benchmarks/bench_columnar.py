@@ -0,0 +1,101 @@
+"""
+Analytics benchmark - dict loops vs the columnar NumPy product table
+Times inventory value, per-category group-by and the low-stock filter on
+synthetic catalogs, and checks both implementations agree.
+
+Usage (from backend/):
+    python benchmarks/bench_columnar.py --sizes 10000 100000 1000000
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from columnar import ProductColumns  # noqa: E402
+
+CATEGORIES = ["Electronics", "Furniture", "Stationery", "Clothing", "Books", "Garden", "Toys", "Sports"]
+
+
+def synthetic_catalog(size: int, seed: int = 3) -> list:
+    rng = random.Random(seed)
+    return [
+        {"id": f"p{index}", "name": f"SKU {index}", "category": rng.choice(CATEGORIES),
+         "price": round(rng.uniform(1, 5000), 2), "stock": rng.randint(0, 1000)}
+        for index in range(size)
+    ]
+
+
+def loop_analytics(products: list, threshold: int = 20):
+    """The dict-loop implementation get_stats/_handle_get_categories used before the columnar table"""
+    total_value = sum(float(p.get("price", 0)) * int(p.get("stock", 0)) for p in products)
+    low_stock = [p for p in products if int(p.get("stock", 0)) < threshold]
+    categories = {}
+    for product in products:
+        category = product.get("category", "Unknown")
+        if category not in categories:
+            categories[category] = {"product_count": 0, "total_inventory_value": 0, "total_stock_units": 0,
+                                    "low_stock_alerts": 0, "products": []}
+        price = float(product.get("price", 0))
+        stock = int(product.get("stock", 0))
+        group = categories[category]
+        group["product_count"] += 1
+        group["total_inventory_value"] += price * stock
+        group["total_stock_units"] += stock
+        group["products"].append(product)
+        if stock < threshold:
+            group["low_stock_alerts"] += 1
+    for group in categories.values():
+        group["average_price"] = sum(float(p.get("price", 0)) for p in group["products"]) / group["product_count"]
+    return total_value, len(low_stock), categories
+
+
+def columnar_analytics(columns: ProductColumns, threshold: int = 20):
+    groups = columns.group_by("category", low_stock_threshold=threshold)
+    return columns.inventory_value(), len(columns.below(threshold)), groups
+
+
+def build_columns(products: list) -> ProductColumns:
+    columns = ProductColumns(products)
+    columns.codes("category")
+    return columns
+
+
+def timed(function, *args, repeat: int = 3):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'products':>10}{'loops (ms)':>12}{'build (ms)':>12}{'columnar (ms)':>15}{'speedup':>10}")
+    for size in args.sizes:
+        products = synthetic_catalog(size)
+        loop_ms, (loop_value, loop_low, loop_groups) = timed(loop_analytics, products)
+        # Built once per catalog version (arrays + category codes), then reused by every request
+        build_ms, columns = timed(build_columns, products, repeat=1)
+        column_ms, (value, low, groups) = timed(columnar_analytics, columns)
+
+        agree = (math.isclose(value, loop_value, rel_tol=1e-9) and low == loop_low and all(
+            math.isclose(group["total_inventory_value"], loop_groups[group["name"]]["total_inventory_value"], rel_tol=1e-9)
+            and group["low_stock_alerts"] == loop_groups[group["name"]]["low_stock_alerts"]
+            for group in groups
+        ))
+        if not agree:
+            print(f"❌ loop and columnar results disagree for {size} products")
+            sys.exit(1)
+        print(f"{size:>10}{loop_ms:>12.1f}{build_ms:>12.1f}{column_ms:>15.2f}{loop_ms / column_ms:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Group commit ingest benchmark
+Adds N products to a scratch catalog one durable write at a time (add_product)
+and then concurrently through the group-commit writer (add_product_async).
+
+Usage (from backend/):
+    python benchmarks/bench_group_commit.py --products 2000 --catalog 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import JSONStorage  # noqa: E402
+
+
+def scratch_storage(catalog_size: int) -> JSONStorage:
+    data_dir = tempfile.mkdtemp(prefix="bench-group-commit-")
+    products = [
+        {"id": f"p{i}", "name": f"Seed {i}", "category": "Electronics", "price": 10.0, "stock": 10}
+        for i in range(1, catalog_size + 1)
+    ]
+    with open(os.path.join(data_dir, "products.json"), "w") as f:
+        json.dump({"products": products}, f)
+    return JSONStorage(data_dir)
+
+
+def new_product(index: int) -> dict:
+    return {"name": f"Bulk {index}", "category": "Furniture", "price": 5.0, "stock": 3}
+
+
+def bench_sequential(catalog_size: int, count: int) -> float:
+    storage = scratch_storage(catalog_size)
+    start = time.perf_counter()
+    for index in range(count):
+        storage.add_product(new_product(index))
+    elapsed = time.perf_counter() - start
+    shutil.rmtree(storage.data_dir)
+    return elapsed
+
+
+def bench_group_commit(catalog_size: int, count: int) -> tuple:
+    storage = scratch_storage(catalog_size)
+
+    async def ingest():
+        return await asyncio.gather(*(storage.add_product_async(new_product(index)) for index in range(count)))
+
+    start = time.perf_counter()
+    results = asyncio.run(ingest())
+    elapsed = time.perf_counter() - start
+    assert all(results) and len(storage.get_products()) == catalog_size + count
+    stats = dict(storage.group_commit.stats)
+    shutil.rmtree(storage.data_dir)
+    return elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=2000, help="products to ingest")
+    parser.add_argument("--catalog", type=int, default=1000, help="existing catalog size")
+    args = parser.parse_args()
+
+    sequential = bench_sequential(args.catalog, args.products)
+    grouped, stats = bench_group_commit(args.catalog, args.products)
+
+    print(f"catalog {args.catalog} + {args.products} adds")
+    print(f"one write per add: {sequential:8.2f}s  {args.products / sequential:10.0f} adds/s")
+    print(f"group commit:      {grouped:8.2f}s  {args.products / grouped:10.0f} adds/s  "
+          f"({stats['commits']} commits, {sequential / grouped:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Product memory benchmark - plain dicts vs compact ProductRecords
+Writes a synthetic products.json, then loads it in a fresh subprocess per mode
+and reports the resident-set growth (RSS) per 100k products held in memory.
+
+Usage (from backend/):
+    python benchmarks/bench_memory.py --products 100000 500000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+CATEGORIES = ["Electronics", "Furniture", "Stationery"]
+
+
+def rss_kb() -> int:
+    """Current resident set size (Linux /proc, falling back to peak RSS elsewhere)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def write_catalog(data_dir: str, count: int):
+    rng = random.Random(5)
+    products = [
+        {"id": f"p{index}", "name": f"Product {index}", "category": rng.choice(CATEGORIES),
+         "price": round(rng.uniform(1, 5000), 2), "stock": rng.randint(0, 1000)}
+        for index in range(count)
+    ]
+    with open(os.path.join(data_dir, "products.json"), "w") as f:
+        json.dump({"products": products}, f, indent=2)
+
+
+def measure(mode: str, data_dir: str) -> int:
+    """Run in a subprocess: RSS growth in KB after loading the catalog"""
+    from storage import JSONStorage  # imported up front in both modes so module memory is not counted
+    gc.collect()
+    before = rss_kb()
+    if mode == "dicts":
+        with open(os.path.join(data_dir, "products.json")) as f:
+            products = json.load(f)["products"]
+    else:
+        products = JSONStorage(data_dir).get_products()
+    gc.collect()
+    growth = rss_kb() - before
+    assert products
+    return growth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, nargs="+", default=[100000])
+    parser.add_argument("--mode", choices=["dicts", "records"], help=argparse.SUPPRESS)
+    parser.add_argument("--data-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(measure(args.mode, args.data_dir))
+        return
+
+    print(f"{'products':>10}{'dicts (MB/100k)':>18}{'records (MB/100k)':>20}{'saved':>8}")
+    for count in args.products:
+        data_dir = tempfile.mkdtemp(prefix="bench-memory-")
+        try:
+            write_catalog(data_dir, count)
+            results = {}
+            for mode in ("dicts", "records"):
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--mode", mode, "--data-dir", data_dir],
+                    cwd=BACKEND, capture_output=True, text=True, check=True
+                ).stdout
+                results[mode] = int(output.strip().splitlines()[-1]) / 1024 * 100000 / count
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+        saved = 100 - results["records"] * 100 / results["dicts"]
+        print(f"{count:>10}{results['dicts']:>18.1f}{results['records']:>20.1f}{saved:>7.0f}%")
+
+
+if __name__ == "__main__":
+    main()
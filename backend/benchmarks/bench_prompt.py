@@ -0,0 +1,107 @@
+"""
+Intent prompt benchmark - legacy inline prompt vs compiled IntentPromptBuilder
+Reports prompt size and build time offline; with --live it also times real
+provider calls (AI_PROVIDER from the environment) for both prompt variants.
+
+Usage (from backend/):
+    python benchmarks/bench_prompt.py
+    python benchmarks/bench_prompt.py --live --calls 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompt_builder import estimate_tokens  # noqa: E402
+
+SAMPLE_REQUESTS = [
+    ("api/products", "GET", {}),
+    ("api/products", "POST", {"name": "Desk Lamp", "category": "Furniture", "price": 49.5, "stock": 30}),
+    ("api/products/p4", "DELETE", {}),
+    ("api/categories", "GET", {"sort": "value"}),
+    ("api/products", "POST", {"name": "Bulk " * 200, "category": "Electronics", "price": 10, "stock": 5}),
+]
+
+
+def legacy_prompt(path: str, method: str, data) -> str:
+    """The intent prompt as it was built inline before the prompt builder"""
+    return f"""
+        Analyze this HTTP request and determine the user's intent.
+
+        Path: {path}
+        Method: {method}
+        Data: {data}
+
+        Available actions: get_products, add_product, delete_product, get_user_context, get_health, get_demo_info, get_categories, get_menu_items, unknown
+
+        Return ONLY a JSON object with the action and any required parameters. Do NOT include any other text or explanation.
+
+        Examples:
+        - For GET /api/products: {{"action": "get_products"}}
+        - For POST /api/products: {{"action": "add_product"}}
+        - For DELETE /api/products/p4: {{"action": "delete_product", "product_id": "p4"}}
+        - For GET /api/user-context/admin: {{"action": "get_user_context", "role": "admin"}}
+        - For GET /api/categories: {{"action": "get_categories"}}
+        - For GET /api/menu-items: {{"action": "get_menu_items"}}
+
+        IMPORTANT: For delete operations, use "product_id" field name, not "entity".
+        """
+
+
+def time_builds(build, iterations: int) -> float:
+    """Mean microseconds to build every sample prompt"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for path, method, data in SAMPLE_REQUESTS:
+            build(path, method, data)
+    return (time.perf_counter() - start) / (iterations * len(SAMPLE_REQUESTS)) * 1e6
+
+
+def time_calls(engine, build, calls: int) -> list:
+    """Wall-clock milliseconds of real provider calls"""
+    samples = []
+    for index in range(calls):
+        path, method, data = SAMPLE_REQUESTS[index % len(SAMPLE_REQUESTS)]
+        prompt = build(path, method, data)
+        start = time.perf_counter()
+        engine._call_provider(prompt, "benchmark")
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--live", action="store_true", help="also time real provider calls")
+    parser.add_argument("--calls", type=int, default=10)
+    args = parser.parse_args()
+
+    from ai_engine import AIRuntimeEngine
+    engine = AIRuntimeEngine()
+    builder = engine.prompt_builder
+
+    print("\n=== Intent prompt size (estimated tokens) ===")
+    print(f"{'request':<28}{'legacy':>10}{'compact':>10}{'saved':>8}")
+    for path, method, data in SAMPLE_REQUESTS:
+        legacy = estimate_tokens(legacy_prompt(path, method, data))
+        compact = estimate_tokens(builder.build(path, method, data))
+        print(f"{method + ' ' + path:<28}{legacy:>10}{compact:>10}{100 - compact * 100 // legacy:>7}%")
+    print(f"static prefix (cacheable): ~{builder.prefix_tokens} tokens")
+
+    print("\n=== Prompt build time ===")
+    print(f"legacy:  {time_builds(legacy_prompt, args.iterations):.2f} us/prompt")
+    print(f"compact: {time_builds(builder.build, args.iterations):.2f} us/prompt")
+
+    if args.live:
+        print(f"\n=== Provider latency ({args.calls} calls, AI_PROVIDER={os.getenv('AI_PROVIDER')}) ===")
+        for label, build in (("legacy", legacy_prompt), ("compact", builder.build)):
+            samples = time_calls(engine, build, args.calls)
+            print(f"{label:<8} mean {statistics.mean(samples):8.1f} ms   median {statistics.median(samples):8.1f} ms")
+        print(f"token usage: {engine.token_usage}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Catalog snapshot benchmark - products.json vs the memory-mapped snapshot
+For synthetic catalogs it reports file size, time to open (startup), time to
+materialize every product, and per-lookup latency of get_product_by_id.
+
+Usage (from backend/):
+    python benchmarks/bench_snapshot.py --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records import product_object_hook  # noqa: E402
+from snapshot import CatalogSnapshot, source_version, write_snapshot  # noqa: E402
+from storage import JSONStorage  # noqa: E402
+
+
+def write_catalog(data_dir: str, size: int):
+    rng = random.Random(11)
+    products = [
+        {"id": f"p{index}", "name": f"Product {index}", "category": rng.choice(["Electronics", "Furniture", "Stationery"]),
+         "price": round(rng.uniform(1, 5000), 2), "stock": rng.randint(0, 1000)}
+        for index in range(size)
+    ]
+    json_path = os.path.join(data_dir, "products.json")
+    with open(json_path, "w") as f:
+        json.dump({"products": products}, f, indent=2)
+    return json_path
+
+
+def ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'products':>10}{'json MB':>9}{'snap MB':>9}{'json load':>11}{'snap open':>11}"
+          f"{'snap all':>10}{'scan us':>10}{'probe us':>10}")
+    for size in args.sizes:
+        data_dir = tempfile.mkdtemp(prefix="bench-snapshot-")
+        try:
+            json_path = write_catalog(data_dir, size)
+            snap_path = os.path.join(data_dir, "products.snap")
+
+            start = time.perf_counter()
+            with open(json_path) as f:
+                products = json.load(f, object_hook=product_object_hook)["products"]
+            json_load = ms(start)
+            write_snapshot(products, snap_path, source_version(json_path))
+
+            start = time.perf_counter()
+            snapshot = CatalogSnapshot(snap_path)
+            snap_open = ms(start)
+            start = time.perf_counter()
+            decoded = snapshot.products()
+            snap_all = ms(start)
+            assert decoded == products
+
+            ids = [f"p{random.randrange(size)}" for _ in range(args.lookups)]
+            start = time.perf_counter()
+            for product_id in ids[:200]:
+                next((p for p in products if p.get("id") == product_id), None)
+            scan = ms(start) * 1000 / 200
+            storage = JSONStorage(data_dir)
+            start = time.perf_counter()
+            for product_id in ids:
+                assert storage.get_product_by_id(product_id) is not None
+            probe = ms(start) * 1000 / len(ids)
+
+            print(f"{size:>10}{os.path.getsize(json_path) / 2**20:>9.1f}{os.path.getsize(snap_path) / 2**20:>9.1f}"
+                  f"{json_load:>9.0f}ms{snap_open:>9.2f}ms{snap_all:>8.0f}ms{scan:>10.0f}{probe:>10.1f}")
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Product validation benchmark - single-record path vs columnar batch path
+Validates synthetic catalogs (with a share of invalid rows) against the business
+rules in POLICIES and checks both paths reject exactly the same rows.
+
+Usage (from backend/):
+    python benchmarks/bench_validation.py --rows 10000 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from validation import ProductValidator  # noqa: E402
+
+POLICY_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           "POLICIES", "business_rules.yaml")
+
+
+def synthetic_rows(count: int, invalid_share: float, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for index in range(count):
+        row = {
+            "name": f"SKU {index}",
+            "category": rng.choice(["Electronics", "furniture", "Stationery"]),
+            "price": round(rng.uniform(1, 5000), 2),
+            "stock": rng.randint(0, 1000)
+        }
+        if rng.random() < invalid_share:
+            field, value = rng.choice([("price", -1), ("stock", 5000), ("category", "Toys"), ("name", "<b>"), ("price", "n/a")])
+            row[field] = value
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--invalid", type=float, default=0.05, help="share of invalid rows")
+    args = parser.parse_args()
+
+    with open(POLICY_FILE) as f:
+        validator = ProductValidator(yaml.safe_load(f)["business_rules"])
+
+    print(f"{'rows':>10}{'single (s)':>14}{'batch (s)':>12}{'speedup':>10}{'invalid':>10}")
+    for count in args.rows:
+        rows = synthetic_rows(count, args.invalid)
+
+        start = time.perf_counter()
+        single = [index for index, row in enumerate(rows) if not validator.validate(row)["valid"]]
+        single_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _, errors = validator.validate_batch(rows)
+        batch_time = time.perf_counter() - start
+
+        if [index for index, _ in errors] != single:
+            print(f"❌ single and batch paths disagree for {count} rows")
+            sys.exit(1)
+        print(f"{count:>10}{single_time:>14.3f}{batch_time:>12.3f}{single_time / batch_time:>9.1f}x{len(errors):>10}")
+
+
+if __name__ == "__main__":
+    main()
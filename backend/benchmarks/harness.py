@@ -0,0 +1,256 @@
+"""
+Runtime engine benchmark harness - throughput and latency percentiles per route
+Runs the FastAPI app in-process (ASGI transport, no sockets) against an engine
+built on a synthetic catalog and a deterministic fake provider with configurable
+latency (or a recording replayed by ReplayProvider). Every route x role x (API | X-UI-Request) scenario gets warmup requests,
+then measured requests at the given concurrency; results are saved as JSON.
+
+Catalogs are generated once into ../DATA/benchmarks/ and copied to a scratch
+directory per run, so add/delete scenarios never touch DATA/products.json.
+
+Usage (from backend/):
+    python benchmarks/harness.py --sizes 100 10000 --output bench.json
+    python benchmarks/harness.py --sizes 100 10000 --compare bench.json
+    python benchmarks/harness.py --replay ../DATA/recordings/provider.jsonl.gz --jitter-ms 20
+Exits non-zero when --compare finds a p95 or throughput regression beyond --threshold.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("AI_PROVIDER", "mock")  # main.py's own engine is replaced below
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+from ai_engine import INTENT_EXAMPLES, AIRuntimeEngine, LocalIntentProvider  # noqa: E402
+from intent_classifier import IntentClassifier  # noqa: E402
+from logs import configure_logging  # noqa: E402
+from replay import ReplayProvider  # noqa: E402
+from storage import JSONStorage  # noqa: E402
+
+CATALOG_DIR = "../DATA/benchmarks"
+CATEGORIES = ["Electronics", "Furniture", "Stationery", "Appliances", "Books"]
+ROLES = ["viewer", "manager", "admin"]
+
+# route name -> (method, path template); {id} is filled per request
+ROUTES = {
+    "products": ("GET", "/api/products"),
+    "categories": ("GET", "/api/categories"),
+    "menu-items": ("GET", "/api/menu-items"),
+    "user-context": ("GET", "/api/user-context/{role}"),
+    "add": ("POST", "/api/products"),
+    "delete": ("DELETE", "/api/products/{id}"),
+}
+
+
+class FakeProvider:
+    """Deterministic intent answers (the local classifier) after a fixed latency"""
+
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+        self.intents = LocalIntentProvider(IntentClassifier(INTENT_EXAMPLES))
+        self.calls = 0
+
+    def generate_response(self, prompt: str) -> str:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)  # provider SDK calls block the event loop the same way
+        return self.intents.generate_response(prompt)
+
+
+def catalog_path(size: int) -> str:
+    """Synthetic products.json with `size` products (ids p0..pN), generated once and reused"""
+    path = os.path.join(CATALOG_DIR, f"catalog-{size}.json")
+    if os.path.exists(path):
+        return path
+    os.makedirs(CATALOG_DIR, exist_ok=True)
+    rng = random.Random(size)
+    products = [
+        {"id": f"p{index}", "name": f"Product {index}", "category": rng.choice(CATEGORIES),
+         "price": round(rng.uniform(1, 5000), 2), "stock": rng.randint(0, 1000),
+         "description": f"Synthetic benchmark product {index}"}
+        for index in range(size)
+    ]
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump({"products": products}, f, separators=(",", ":"))
+    os.replace(temp_path, path)
+    return path
+
+
+def build_provider(args):
+    """Fake provider, or the recording when --replay is given (unrecorded prompts fall back to the fake)"""
+    fake = FakeProvider(args.latency_ms if not args.replay else 0.0)
+    if not args.replay:
+        return fake
+    return ReplayProvider(args.replay, latency_model=args.replay_latency, latency_ms=args.latency_ms,
+                          jitter_ms=args.jitter_ms, seed=0, fallback=fake)
+
+
+def build_engine(size: int, args) -> AIRuntimeEngine:
+    data_dir = os.path.join(CATALOG_DIR, f"run-{size}")
+    shutil.rmtree(data_dir, ignore_errors=True)
+    os.makedirs(data_dir)
+    shutil.copyfile(catalog_path(size), os.path.join(data_dir, "products.json"))
+    engine = AIRuntimeEngine(storage=JSONStorage(data_dir), ai_provider=build_provider(args))
+    if args.no_cache:
+        engine.intent_cache = engine.response_cache = None
+    engine.rate_limiter.enabled = False  # one client firing thousands of requests is the point here
+    configure_logging({"logging_level": "warning"})  # per-request info logs would dominate the timings
+    return engine
+
+
+def percentile(ordered: list, fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+async def run_scenario(client: httpx.AsyncClient, route: str, role: str, ui: bool,
+                       requests: int, warmup: int, concurrency: int, delete_ids) -> dict:
+    method, template = ROUTES[route]
+    headers = {"X-User-Role": role}
+    if ui:
+        headers["X-UI-Request"] = "true"
+
+    async def send(index: int):
+        path = template.format(role=role, id=next(delete_ids) if "{id}" in template else "")
+        body = None
+        if method == "POST":
+            body = {"name": f"Bench {role} {index}", "category": CATEGORIES[index % len(CATEGORIES)],
+                    "price": 10 + index % 90, "stock": index % 200}
+        start = time.perf_counter()
+        response = await client.request(method, path, headers=headers, json=body)
+        return time.perf_counter() - start, response.status_code
+
+    gate = asyncio.Semaphore(concurrency)
+
+    async def limited(index: int):
+        async with gate:
+            return await send(index)
+
+    for index in range(warmup):
+        await send(index)
+    start = time.perf_counter()
+    samples = await asyncio.gather(*(limited(index) for index in range(requests)))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(seconds * 1000 for seconds, _ in samples)
+    statuses = {}
+    for _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "requests": requests,
+        "statuses": statuses,
+        "errors": sum(count for status, count in statuses.items() if int(status) >= 500),
+        "throughput_rps": round(requests / wall, 1) if wall else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+    }
+
+
+async def run_size(size: int, args) -> dict:
+    main.ai_engine = build_engine(size, args)
+    transport = httpx.ASGITransport(app=main.app)
+    delete_ids = (f"p{index}" for index in itertools.count())  # every delete targets a distinct product
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for route in args.routes:
+            for role in args.roles:
+                for ui in (False, True):
+                    key = f"{size}/{route}/{role}/{'ui' if ui else 'api'}"
+                    results[key] = await run_scenario(client, route, role, ui, args.requests, args.warmup,
+                                                      args.concurrency, delete_ids)
+                    result = results[key]
+                    print(f"{key:<38}{result['throughput_rps']:>10.1f}{result['p50_ms']:>10.2f}"
+                          f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['errors']:>7}")
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta_ms: float) -> list:
+    """Scenarios whose p95 latency or throughput got worse than the baseline by more than threshold"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        slower = result["p95_ms"] - base["p95_ms"]
+        if result["p95_ms"] > base["p95_ms"] * (1 + threshold) and slower > min_delta_ms:
+            regressions.append(f"{key}: p95 {base['p95_ms']:.2f}ms -> {result['p95_ms']:.2f}ms")
+        if result["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(f"{key}: throughput {base['throughput_rps']:.1f} -> {result['throughput_rps']:.1f} req/s")
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{key}: {result['errors']} server errors (baseline {base['errors']})")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000], help="catalog sizes (100 to 1000000)")
+    parser.add_argument("--routes", nargs="+", choices=list(ROUTES), default=list(ROUTES))
+    parser.add_argument("--roles", nargs="+", default=ROLES)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="fake provider latency per call")
+    parser.add_argument("--replay", help="replay a recorded provider session instead of the fake provider")
+    parser.add_argument("--replay-latency", choices=["none", "fixed", "recorded"], default="recorded",
+                        help="replay latency model (fixed uses --latency-ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="replay latency jitter (+/-)")
+    parser.add_argument("--no-cache", action="store_true", help="disable intent and response caches")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --output run")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore p95 increases smaller than this")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<38}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'5xx':>7}")
+    results = {}
+    for size in args.sizes:
+        results.update(asyncio.run(run_size(size, args)))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+            "replay": args.replay,
+            "cache": not args.no_cache,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,142 @@
+"""
+JSONStorage concurrency stress test
+Hammers a scratch copy of the catalog with concurrent mutations from several
+processes, threads and coroutines while readers keep parsing it, then checks
+that no update was lost, IDs stayed unique and every read saw a complete file.
+
+Usage (from backend/):
+    python benchmarks/stress_storage.py --processes 4 --threads 4 --ops 50
+Exits non-zero if an invariant is violated.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import JSONStorage  # noqa: E402
+
+
+def _product(tag: str, index: int) -> dict:
+    return {"name": f"stress-{tag}-{index}", "category": "Electronics", "price": 1.0 + index, "stock": index % 50}
+
+
+def _thread_worker(data_dir: str, tag: str, ops: int):
+    """Add ops products, update every one of them, delete every other one"""
+    storage = JSONStorage(data_dir)
+    added = []
+    for index in range(ops):
+        product = _product(tag, index)
+        if not storage.add_product(product):
+            raise RuntimeError(f"add failed for {product['name']}")
+        added.append(product["id"])
+    for product_id in added:
+        storage.update_product(product_id, {"stock": 999})
+    for product_id in added[::2]:
+        storage.delete_product(product_id)
+
+
+async def _async_worker(data_dir: str, tag: str, ops: int, tasks: int):
+    storage = JSONStorage(data_dir)
+    await asyncio.gather(*(
+        storage.add_product_async(_product(f"{tag}-a{task}", index))
+        for task in range(tasks) for index in range(ops)
+    ))
+
+
+def _process_worker(data_dir: str, process_index: int, threads: int, ops: int):
+    workers = [
+        threading.Thread(target=_thread_worker, args=(data_dir, f"p{process_index}t{thread}", ops))
+        for thread in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    asyncio.run(_async_worker(data_dir, f"p{process_index}", ops, threads))
+    for worker in workers:
+        worker.join()
+
+
+def _reader(data_dir: str, stop: threading.Event, results: dict):
+    """Parse the raw file in a tight loop - it must never be truncated"""
+    path = os.path.join(data_dir, "products.json")
+    while not stop.is_set():
+        try:
+            with open(path) as f:
+                json.load(f)
+            results["reads"] += 1
+        except json.JSONDecodeError:
+            results["torn"] += 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=25, help="mutations of each kind per worker")
+    args = parser.parse_args()
+
+    source = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "DATA")
+    data_dir = tempfile.mkdtemp(prefix="stress-storage-")
+    shutil.copy(os.path.join(source, "products.json"), data_dir)
+    shutil.copy(os.path.join(source, "users.json"), data_dir)
+    initial = len(JSONStorage(data_dir).get_products())
+
+    stop = threading.Event()
+    read_results = {"reads": 0, "torn": 0}
+    reader = threading.Thread(target=_reader, args=(data_dir, stop, read_results))
+    reader.start()
+
+    start = time.perf_counter()
+    processes = [
+        multiprocessing.Process(target=_process_worker, args=(data_dir, index, args.threads, args.ops))
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    reader.join()
+
+    products = JSONStorage(data_dir).get_products()
+    workers = args.processes * args.threads
+    sync_kept = workers * (args.ops - (args.ops + 1) // 2)
+    async_added = workers * args.ops
+    expected = initial + sync_kept + async_added
+    mutations = workers * args.ops * 2 + workers * ((args.ops + 1) // 2) + async_added
+
+    ids = [product["id"] for product in products]
+    failures = []
+    if any(process.exitcode != 0 for process in processes):
+        failures.append("a worker process crashed")
+    if len(products) != expected:
+        failures.append(f"lost updates: {len(products)} products, expected {expected}")
+    if len(set(ids)) != len(ids):
+        failures.append(f"duplicate ids: {len(ids) - len(set(ids))}")
+    if any(p["name"].startswith("stress-") and "-a" not in p["name"] and p["stock"] != 999 for p in products):
+        failures.append("lost stock updates")
+    if read_results["torn"]:
+        failures.append(f"{read_results['torn']} reads saw a partially written file")
+
+    print(f"{mutations} mutations by {args.processes} processes x {args.threads} threads (+ coroutines) "
+          f"in {elapsed:.2f}s ({mutations / elapsed:.0f} ops/s), {read_results['reads']} concurrent reads")
+    shutil.rmtree(data_dir, ignore_errors=True)
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("✅ No lost updates, unique ids, no torn reads")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
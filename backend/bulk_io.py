@@ -0,0 +1,107 @@
+"""
+Bulk product import/export - streaming NDJSON and CSV
+Rows are parsed as request body chunks arrive and exported a chunk at a time,
+so neither side ever holds the whole payload as one string.
+"""
+import codecs
+import csv
+import io
+import json
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from records import json_default
+
+PRODUCT_COLUMNS = ["id", "name", "category", "price", "stock"]
+
+# Media types accepted/produced per format
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def detect_format(content_type: str, requested: Optional[str] = None) -> str:
+    """Pick ndjson or csv from an explicit ?format= or the Content-Type header"""
+    if requested in MEDIA_TYPES:
+        return requested
+    return "csv" if "csv" in (content_type or "").lower() else "ndjson"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream incrementally and yield complete lines"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending.strip():
+        yield pending.rstrip("\r")
+
+
+def _coerce(row: Dict) -> Dict:
+    """CSV cells are strings - convert numeric product fields where they parse"""
+    product = {key: value for key, value in row.items() if key and value not in (None, "")}
+    for field, cast in (("price", float), ("stock", int)):
+        if isinstance(product.get(field), str):
+            try:
+                product[field] = cast(product[field])
+            except ValueError:
+                pass
+    return product
+
+
+async def iter_product_rows(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """Yield (line_number, product, parse_error) for every non-empty input line"""
+    header = None
+    line_number = 0
+    async for line in iter_lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+
+        if fmt == "csv":
+            # One record per line (quoted fields may not contain newlines)
+            cells = next(csv.reader([line]))
+            if header is None:
+                header = [cell.strip() for cell in cells]
+                continue
+            if len(cells) != len(header):
+                yield line_number, None, f"expected {len(header)} columns, got {len(cells)}"
+                continue
+            yield line_number, _coerce(dict(zip(header, cells))), None
+        else:
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "each line must be a JSON object"
+                continue
+            yield line_number, row, None
+
+
+def export_chunks(products: List, fmt: str, rows_per_chunk: int = 1000) -> Iterator[str]:
+    """Serialize products (records or dicts) as NDJSON or CSV, rows_per_chunk rows at a time"""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(PRODUCT_COLUMNS)
+        for start in range(0, len(products), rows_per_chunk):
+            writer.writerows(
+                [product.get(column, "") for column in PRODUCT_COLUMNS]
+                for product in products[start:start + rows_per_chunk]
+            )
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        dumps = json.JSONEncoder(separators=(",", ":"), default=json_default).encode
+        for start in range(0, len(products), rows_per_chunk):
+            yield "".join(dumps(product) + "\n" for product in products[start:start + rows_per_chunk])
@@ -0,0 +1,173 @@
+"""
+Response and intent caches for the AI Runtime Engine
+In single-process mode caches live in process memory. In multi-worker mode the
+master process starts a cache server (a multiprocessing manager listening on a
+local socket) before forking, and every worker reads and writes the same store.
+"""
+import os
+import time
+from multiprocessing.managers import SyncManager
+from typing import Any, Dict, Optional
+
+from logs import get_logger
+
+log = get_logger("cache")
+
+_MISSING = object()
+
+
+class TTLCache:
+    """In-process cache with per-entry expiry and a size bound"""
+
+    def __init__(self, name: str, ttl: float = 300, max_entries: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._store = {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._read(key)
+        if entry is _MISSING or entry[0] < time.time():
+            self.misses += 1
+            return default
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        if len(self._store) >= self.max_entries:
+            self._evict()
+        self._write(key, (time.time() + (self.ttl if ttl is None else ttl), value))
+
+    def delete(self, key: str):
+        self._store.pop(key, None)
+
+    def clear(self):
+        self._store.clear()
+
+    def keys(self):
+        return list(self._store.keys())
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "entries": len(self._store),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "shared": False
+        }
+
+    def _read(self, key: str):
+        return self._store.get(key, _MISSING)
+
+    def _write(self, key: str, entry):
+        self._store[key] = entry
+
+    def _evict(self):
+        """Drop expired entries, then the oldest-expiring ones, down to 3/4 capacity"""
+        now = time.time()
+        entries = sorted(self._store.items(), key=lambda item: item[1][0])
+        keep = [(key, entry) for key, entry in entries if entry[0] >= now][-(self.max_entries * 3 // 4):]
+        self._store.clear()
+        self._store.update(keep)
+
+
+class SharedCache(TTLCache):
+    """
+    TTLCache whose store is a dict proxy served by the cache server - visible to every worker.
+    A second proxy maps each key to its expiry, so eviction picks its victims without
+    pulling the cached values across the socket and deletes only those keys.
+    """
+
+    def __init__(self, name: str, store, expiries, ttl: float = 300, max_entries: int = 1024):
+        super().__init__(name, ttl, max_entries)
+        self._store = store
+        self._expiries = expiries
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return super().get(key, default)
+        except (OSError, EOFError) as e:
+            # Cache server unavailable - behave like a miss rather than failing the request
+            log.warning("⚠️ Shared cache '%s' unavailable: %s", self.name, e)
+            self.misses += 1
+            return default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        try:
+            super().set(key, value, ttl)
+        except (OSError, EOFError) as e:
+            log.warning("⚠️ Shared cache '%s' unavailable: %s", self.name, e)
+
+    def delete(self, key: str):
+        super().delete(key)
+        self._expiries.pop(key, None)
+
+    def clear(self):
+        super().clear()
+        self._expiries.clear()
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats["shared"] = True
+        return stats
+
+    def _read(self, key: str):
+        # Sentinels do not survive the round trip to the cache server; None marks a miss
+        entry = self._store.get(key)
+        return _MISSING if entry is None else entry
+
+    def _write(self, key: str, entry):
+        self._store[key] = entry
+        self._expiries[key] = entry[0]
+
+    def _evict(self):
+        """Delete expired keys, then the oldest-expiring ones, down to 3/4 capacity - key by key"""
+        try:
+            now = time.time()
+            expiries = sorted(self._expiries.copy().items(), key=lambda item: item[1])
+            keep = self.max_entries * 3 // 4
+            live = [key for key, expiry in expiries if expiry >= now]
+            victims = [key for key, expiry in expiries if expiry < now] + live[:max(0, len(live) - keep)]
+            for key in victims:
+                self._store.pop(key, None)
+                self._expiries.pop(key, None)
+        except (OSError, EOFError):
+            pass
+
+
+class CacheServer:
+    """Owns the cross-process cache manager; started once in the master before workers fork"""
+
+    def __init__(self):
+        self.manager = SyncManager()
+        self.manager.start()
+        self._stores = {}
+        log.info("🗄️ Shared cache server started at %s (pid %d)", self.manager.address, os.getpid())
+
+    def store(self, name: str):
+        """Dict proxy for a named cache; created before fork so every worker inherits it"""
+        if name not in self._stores:
+            self._stores[name] = self.manager.dict()
+        return self._stores[name]
+
+    def lock(self):
+        return self.manager.Lock()
+
+
+def worker_count() -> int:
+    """Number of worker processes the server was started with (AI_WORKERS)"""
+    try:
+        return max(1, int(os.getenv("AI_WORKERS", "1")))
+    except ValueError:
+        return 1
+
+
+def create_cache(name: str, server: Optional[CacheServer], ttl: float = 300, max_entries: int = 1024) -> TTLCache:
+    """Shared cache when a cache server is running, in-process cache otherwise"""
+    if server is not None:
+        return SharedCache(name, server.store(name), server.store(f"{name}.expiries"), ttl, max_entries)
+    return TTLCache(name, ttl, max_entries)
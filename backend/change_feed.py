@@ -0,0 +1,159 @@
+"""
+Product change feed
+Every storage commit becomes one event: the product deltas it applied plus the
+per-category aggregate deltas they imply (computed from the (before, after) pairs,
+O(changed products) - the catalog is never rescanned). Events carry sequence
+numbers and are kept in a ring buffer, so a reconnecting client can catch up from
+its Last-Event-ID. Async subscribers (one per Server-Sent Events connection) get
+events through an asyncio queue on their own loop; commits run on executor threads.
+"""
+import asyncio
+import itertools
+import json
+import math
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from records import json_default
+from stock_index import StockTiers
+
+# Events buffered per subscriber before it is told to resync instead
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# Larger commits (bulk imports) only carry category deltas - clients refetch the products
+MAX_PRODUCT_DELTAS = 500
+
+
+def _number(value, cast):
+    try:
+        number = cast(value)
+    except (ValueError, TypeError, OverflowError):
+        return 0
+    return number if math.isfinite(number) else 0
+
+
+def format_sse(event: str, data: Dict, event_id: Optional[int] = None) -> str:
+    """One Server-Sent Events message"""
+    lines = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{lines}event: {event}\ndata: {json.dumps(data, separators=(',', ':'), default=json_default)}\n\n"
+
+
+class _Subscriber:
+    """Delivery side of one async subscription"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def deliver(self, event: Dict):
+        # Runs on the subscriber's loop
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync", "reason": "subscriber fell behind"})
+
+
+class ProductChangeFeed:
+    """In-process feed of committed product changes, with sequence numbers for catch-up reads"""
+
+    def __init__(self, tiers: StockTiers, group_by_field: str = "category", max_events: int = 1000):
+        self.tiers = tiers
+        self.group_by_field = group_by_field
+        self._events = deque(maxlen=max_events)
+        self._sequence = itertools.count(1)
+        self._subscribers: List[_Subscriber] = []
+        self._lock = threading.Lock()
+
+    @property
+    def last_sequence(self) -> int:
+        with self._lock:
+            return self._events[-1]["sequence"] if self._events else 0
+
+    def _category_deltas(self, changes: List[Tuple]) -> List[Dict]:
+        low_stock = self.tiers.low_stock
+        deltas = {}
+        for before, after in changes:
+            for product, sign in ((before, -1), (after, 1)):
+                if product is None:
+                    continue
+                price = _number(product.get("price", 0), float)
+                stock = _number(product.get("stock", 0), int)
+                delta = deltas.setdefault(product.get(self.group_by_field, "Unknown"), {
+                    "product_count": 0, "total_inventory_value": 0.0, "total_stock_units": 0,
+                    "price_sum": 0.0, "low_stock_alerts": 0
+                })
+                delta["product_count"] += sign
+                delta["total_inventory_value"] += sign * price * stock
+                delta["total_stock_units"] += sign * stock
+                delta["price_sum"] += sign * price
+                delta["low_stock_alerts"] += sign * (stock < low_stock)
+        return [
+            {"name": name, **delta}
+            for name, delta in deltas.items()
+            if any(delta.values())
+        ]
+
+    def publish(self, changes: List[Tuple[Optional[Dict], Optional[Dict]]], timestamp: str) -> Optional[Dict]:
+        """Turn one commit's (before, after) product pairs into a change event"""
+        if not changes:
+            return None
+        products = None
+        if len(changes) <= MAX_PRODUCT_DELTAS:
+            products = []
+            for before, after in changes:
+                if after is None:
+                    products.append({"op": "delete", "id": before.get("id")})
+                else:
+                    products.append({"op": "add" if before is None else "update", "id": after.get("id"), "product": after})
+        event = {
+            "type": "change",
+            "products": products,
+            "changed": len(changes),
+            "category_deltas": self._category_deltas(changes),
+            "timestamp": timestamp
+        }
+
+        with self._lock:
+            event["sequence"] = next(self._sequence)
+            self._events.append(event)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.deliver, event)
+            except RuntimeError:  # loop already closed - the connection is gone
+                self._remove(subscriber)
+        return event
+
+    def events_since(self, sequence: int) -> Optional[List[Dict]]:
+        """Buffered events after `sequence`, or None if some of them were already dropped"""
+        with self._lock:
+            last = self._events[-1]["sequence"] if self._events else 0
+            if sequence > last or (self._events and self._events[0]["sequence"] > sequence + 1):
+                return None
+            return [event for event in self._events if event["sequence"] > sequence]
+
+    def subscribe(self) -> _Subscriber:
+        """Register an async subscriber on the running loop; pair with unsubscribe()"""
+        subscriber = _Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: _Subscriber):
+        self._remove(subscriber)
+
+    def _remove(self, subscriber: _Subscriber):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
@@ -0,0 +1,84 @@
+"""
+Columnar product table for analytics
+Prices and stocks live in NumPy arrays and categories as integer codes into a
+dictionary, so sums, group-bys and threshold filters run as vectorized operations
+instead of Python loops over product dicts.
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+def _number(value, cast) -> float:
+    try:
+        return cast(value)
+    except (ValueError, TypeError):
+        return 0
+
+
+class ProductColumns:
+    """Columnar view of one version of the product list (the list itself is kept as `source`)"""
+
+    def __init__(self, products: List[Dict]):
+        self.source = products
+        self.count = len(products)
+        try:
+            self.price = np.array([p.get("price", 0) for p in products], dtype=np.float64)
+        except (ValueError, TypeError):
+            self.price = np.array([_number(p.get("price", 0), float) for p in products], dtype=np.float64)
+        self.price[~np.isfinite(self.price)] = 0.0
+        try:
+            self.stock = np.array([p.get("stock", 0) for p in products], dtype=np.int64)
+        except (ValueError, TypeError, OverflowError):
+            self.stock = np.array([_number(p.get("stock", 0), int) for p in products], dtype=np.int64)
+        self.value = self.price * self.stock
+        self._codes = {}
+
+    def codes(self, field: str = "category"):
+        """(code per product, dictionary of distinct values in first-seen order) for a field"""
+        if field not in self._codes:
+            dictionary = {}
+            codes = np.fromiter(
+                (dictionary.setdefault(p.get(field, "Unknown"), len(dictionary)) for p in self.source),
+                dtype=np.int32, count=self.count
+            )
+            self._codes[field] = (codes, list(dictionary))
+        return self._codes[field]
+
+    def inventory_value(self) -> float:
+        return float(self.value.sum())
+
+    def below(self, threshold: int) -> np.ndarray:
+        """Indices of products with stock under threshold"""
+        return np.flatnonzero(self.stock < threshold)
+
+    def group_by(self, field: str = "category", low_stock_threshold: int = 20) -> List[Dict]:
+        """Per-group count, inventory value, stock units, price sum and low-stock count via bincount"""
+        return aggregate_groups(*self.group_inputs(field), low_stock_threshold)
+
+    def group_inputs(self, field: str = "category") -> Tuple:
+        """Arguments of aggregate_groups for a field - plain arrays, cheap to hand to a worker process"""
+        codes, names = self.codes(field)
+        return codes, names, self.price, self.stock, self.value
+
+
+def aggregate_groups(codes: np.ndarray, names: List, price: np.ndarray, stock: np.ndarray,
+                     value: np.ndarray, low_stock_threshold: int = 20) -> List[Dict]:
+    """group_by over already-extracted columns"""
+    groups = len(names)
+    counts = np.bincount(codes, minlength=groups)
+    values = np.bincount(codes, weights=value, minlength=groups)
+    stock_units = np.bincount(codes, weights=stock, minlength=groups)
+    price_sums = np.bincount(codes, weights=price, minlength=groups)
+    low_stock = np.bincount(codes[stock < low_stock_threshold], minlength=groups)
+    return [
+        {
+            "name": name,
+            "product_count": int(counts[code]),
+            "total_inventory_value": float(values[code]),
+            "total_stock_units": int(stock_units[code]),
+            "price_sum": float(price_sums[code]),
+            "low_stock_alerts": int(low_stock[code])
+        }
+        for code, name in enumerate(names)
+    ]
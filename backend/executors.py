@@ -0,0 +1,121 @@
+"""
+Executor layer for work that should not run on the event loop
+Blocking file I/O (catalog reloads, stats that read users.json) goes to a thread
+pool; CPU-heavy aggregation and serialization of large responses go to the CPU
+executor - threads by default (NumPy and json's C encoder do most of the work,
+and nothing has to be pickled), or worker processes with cpu_executor: process.
+Work smaller than offload_threshold rows runs inline: a pool hop costs more than
+it saves on a small catalog.
+
+A probe task measures event-loop lag - how late a timer fires - and exports it
+as ai_engine_event_loop_lag_seconds.
+
+Configured by system_config.performance (io_threads, cpu_executor, cpu_workers,
+offload_threshold, loop_lag_interval).
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+import metrics
+from logs import get_logger
+
+log = get_logger("executors")
+
+CPU_EXECUTORS = ("thread", "process")
+
+
+def payload_rows(content) -> int:
+    """Rough size of a response: items in its top-level lists"""
+    if not isinstance(content, dict):
+        return len(content) if isinstance(content, list) else 0
+    return sum(len(value) for value in content.values() if isinstance(value, list))
+
+
+class EngineExecutors:
+    def __init__(self, performance: Optional[Dict] = None):
+        performance = performance or {}
+        cpus = os.cpu_count() or 1
+        self.io_threads = int(performance.get("io_threads", min(32, cpus + 4)))
+        self.cpu_workers = int(performance.get("cpu_workers", cpus))
+        self.cpu_executor = str(performance.get("cpu_executor", "thread")).lower()
+        if self.cpu_executor not in CPU_EXECUTORS:
+            log.warning("⚠️ Unknown cpu_executor '%s', using threads", self.cpu_executor)
+            self.cpu_executor = "thread"
+        self.offload_threshold = int(performance.get("offload_threshold", 5000))
+        self.loop_lag_interval = float(performance.get("loop_lag_interval", 0.5))
+        # Pools start on first use - a small catalog may never need them
+        self._io: Optional[ThreadPoolExecutor] = None
+        self._cpu: Optional[Executor] = None
+        self._lag_task: Optional[asyncio.Task] = None
+
+    def _io_pool(self) -> ThreadPoolExecutor:
+        if self._io is None:
+            self._io = ThreadPoolExecutor(self.io_threads, thread_name_prefix="engine-io")
+        return self._io
+
+    def _cpu_pool(self) -> Executor:
+        if self._cpu is None:
+            if self.cpu_executor == "process":
+                self._cpu = ProcessPoolExecutor(self.cpu_workers)
+            else:
+                self._cpu = ThreadPoolExecutor(self.cpu_workers, thread_name_prefix="engine-cpu")
+            log.info("⚙️ CPU executor started: %d %s worker(s)", self.cpu_workers, self.cpu_executor)
+        return self._cpu
+
+    def should_offload(self, size: int) -> bool:
+        return size >= self.offload_threshold
+
+    async def _run(self, pool: str, executor: Executor, fn: Callable, *args, **kwargs):
+        metrics.OFFLOADED.inc(pool=pool)
+        call = functools.partial(fn, *args, **kwargs)
+        if isinstance(executor, ThreadPoolExecutor):
+            # Threads carry the request's context, so stages keep their labels and trace spans
+            call = functools.partial(contextvars.copy_context().run, call)
+        return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+    async def run_io(self, fn: Callable, *args, **kwargs):
+        """Blocking I/O on the I/O thread pool"""
+        return await self._run("io", self._io_pool(), fn, *args, **kwargs)
+
+    async def run_cpu(self, fn: Callable, *args, size: int = 0, **kwargs):
+        """
+        CPU-bound work on the CPU executor when size reaches the threshold, inline otherwise.
+        With process workers fn and its arguments are pickled - pass module-level
+        functions and plain data (arrays, dicts, records), never engine objects.
+        """
+        if not self.should_offload(size):
+            return fn(*args, **kwargs)
+        return await self._run(self.cpu_executor, self._cpu_pool(), fn, *args, **kwargs)
+
+    @property
+    def monitoring(self) -> bool:
+        return self._lag_task is not None
+
+    def start_loop_monitor(self):
+        """Start the event-loop lag probe on the running loop (loop_lag_interval: 0 disables it)"""
+        if self.loop_lag_interval > 0 and self._lag_task is None:
+            self._lag_task = asyncio.get_running_loop().create_task(self._monitor_loop_lag())
+
+    async def _monitor_loop_lag(self):
+        interval = self.loop_lag_interval
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag = max(0.0, time.perf_counter() - start - interval)
+            metrics.EVENT_LOOP_LAG.observe(lag)
+            metrics.EVENT_LOOP_LAG_LAST.set(lag)
+
+    def shutdown(self):
+        """Stop the lag probe and release the pools once the work already queued on them is done"""
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            self._lag_task = None
+        for pool in (self._io, self._cpu):
+            if pool is not None:
+                pool.shutdown(wait=False)
+        self._io = self._cpu = None
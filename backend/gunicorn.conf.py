@@ -0,0 +1,29 @@
+"""
+Multi-worker deployment for the AI Runtime Engine
+
+    gunicorn -c gunicorn.conf.py main:app
+
+The app is preloaded in the master: policies are parsed and the shared cache
+server is started ONCE, then workers fork and share those pages copy-on-write.
+Intent and response caches live in the cache server (a local socket), and
+product writes are serialized across workers by the storage file lock.
+"""
+import gc
+import multiprocessing
+import os
+
+workers = int(os.getenv("AI_WORKERS", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+preload_app = True
+timeout = int(os.getenv("REQUEST_TIMEOUT", "30"))
+
+# Read by the engine while the app is preloaded: more than one worker => shared caches
+os.environ["AI_WORKERS"] = str(workers)
+
+
+def when_ready(server):
+    # Move everything allocated during preload out of the GC's reach so that
+    # collections in the workers do not touch (and un-share) those pages
+    gc.freeze()
+    server.log.info(f"AI Runtime Engine preloaded - forking {workers} workers")
@@ -0,0 +1,185 @@
+"""
+Local Intent Classifier - zero-network request intent resolution
+Nearest-neighbour lookup over TF-IDF weighted path n-grams, trained from the
+intent prompt examples plus a log of intents previously resolved by the AI.
+"""
+import json
+import math
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from logs import get_logger
+
+log = get_logger("intents")
+
+
+def _raw_segments(path: str) -> List[str]:
+    """Split a request path into segments as sent (query string dropped) - parameter values come from these"""
+    path = path.split("?", 1)[0]
+    return [segment for segment in path.strip("/").split("/") if segment]
+
+
+def _segments(path: str) -> List[str]:
+    """Lowercase path segments, for matching"""
+    return [segment.lower() for segment in _raw_segments(path)]
+
+
+def _shape(segment: str) -> str:
+    """Collapse identifier-like segments (p4, 123) into a placeholder"""
+    return "{id}" if any(char.isdigit() for char in segment) else segment
+
+
+class IntentClassifier:
+    """
+    Learns the mapping (method, path) -> intent from labeled examples.
+    Exact path templates answer with full confidence; anything else falls back
+    to cosine similarity over sparse TF-IDF vectors of path n-grams.
+    """
+
+    def __init__(self, examples: Optional[List[Tuple[str, str, Dict]]] = None, log_path: Optional[str] = None):
+        self.log_path = log_path
+        self._examples = []
+        self._templates = {}
+        self._idf = {}
+        self._vectors = []
+        self._dirty = False
+
+        for method, path, intent in examples or []:
+            self._add_example(method, path, intent)
+        self._load_log()
+        self._fit()
+
+    def _add_example(self, method: str, path: str, intent: Dict):
+        """Register a labeled example and its parameter positions"""
+        method = method.upper()
+        segments = _segments(path)
+
+        # Remember which path segment carried each parameter (e.g. product_id -> index 2)
+        param_positions = {}
+        for key, value in intent.items():
+            if key == "action" or not isinstance(value, str):
+                continue
+            for index, segment in enumerate(segments):
+                if segment == value.lower():
+                    param_positions[key] = index
+                    break
+
+        wildcard_positions = set(param_positions.values())
+        template = tuple(
+            None if index in wildcard_positions else _shape(segment)
+            for index, segment in enumerate(segments)
+        )
+
+        example = {
+            "method": method,
+            "segments": segments,
+            "action": intent["action"],
+            "params": param_positions,
+            "features": self._features(segments),
+        }
+        self._examples.append(example)
+        self._templates[(method, template)] = example
+        self._dirty = True
+
+    def _features(self, segments: List[str]) -> Dict[str, float]:
+        """Bag of positional shapes, words and character trigrams (method is matched exactly)"""
+        features = {f"n:{len(segments)}": 0.5}
+        for index, segment in enumerate(segments):
+            shape = _shape(segment)
+            features[f"s{index}:{shape}"] = features.get(f"s{index}:{shape}", 0.0) + 1.0
+            for word in re.split(r"[-_.]", shape):
+                if word:
+                    features[f"w:{word}"] = features.get(f"w:{word}", 0.0) + 1.0
+            padded = f"^{shape}$"
+            for start in range(len(padded) - 2):
+                gram = f"c:{padded[start:start + 3]}"
+                features[gram] = features.get(gram, 0.0) + 0.5
+        return features
+
+    def _fit(self):
+        """Recompute IDF weights and normalized example vectors"""
+        document_count = len(self._examples)
+        document_frequency = {}
+        for example in self._examples:
+            for feature in example["features"]:
+                document_frequency[feature] = document_frequency.get(feature, 0) + 1
+
+        self._idf = {
+            feature: math.log((1 + document_count) / (1 + count)) + 1.0
+            for feature, count in document_frequency.items()
+        }
+        self._vectors = [self._vectorize(example["features"]) for example in self._examples]
+        self._dirty = False
+
+    def _vectorize(self, features: Dict[str, float]) -> Dict[str, float]:
+        """Apply IDF weights and L2-normalize a feature bag"""
+        vector = {feature: weight * self._idf.get(feature, 1.0) for feature, weight in features.items()}
+        norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+        return {feature: value / norm for feature, value in vector.items()}
+
+    def _build_intent(self, example: Dict, segments: List[str]) -> Dict:
+        """Materialize an intent from an example, filling parameters from the original-case path segments"""
+        intent = {"action": example["action"]}
+        for key, index in example["params"].items():
+            if index < len(segments):
+                intent[key] = segments[index]
+        return intent
+
+    def classify(self, method: str, path: str) -> Tuple[Dict, float]:
+        """Return (intent, confidence) for a request"""
+        if self._dirty:
+            self._fit()
+
+        method = method.upper()
+        segments = _segments(path)
+        shapes = [_shape(segment) for segment in segments]
+
+        # Fast path: an exact template match (parameter positions are wildcards)
+        for (template_method, template), example in self._templates.items():
+            if template_method != method or len(template) != len(shapes):
+                continue
+            if all(part is None or part == shape for part, shape in zip(template, shapes)):
+                return self._build_intent(example, _raw_segments(path)), 1.0
+
+        # Fuzzy path: nearest neighbour among examples with the same method
+        query = self._vectorize(self._features(segments))
+        best_example, best_score = None, 0.0
+        for example, vector in zip(self._examples, self._vectors):
+            if example["method"] != method:
+                continue
+            score = sum(weight * vector.get(feature, 0.0) for feature, weight in query.items())
+            if score > best_score:
+                best_example, best_score = example, score
+
+        if best_example is None:
+            return {"action": "unknown"}, 0.0
+        return self._build_intent(best_example, _raw_segments(path)), best_score
+
+    def learn(self, method: str, path: str, intent: Dict):
+        """Add a resolved intent to the model and append it to the intent log"""
+        if not isinstance(intent, dict) or "action" not in intent:
+            return
+        self._add_example(method, path, intent)
+
+        if self.log_path:
+            try:
+                with open(self.log_path, 'a') as f:
+                    f.write(json.dumps({"method": method.upper(), "path": path, "intent": intent}) + "\n")
+            except OSError as e:
+                log.warning("⚠️ Could not append to intent log: %s", e)
+
+    def _load_log(self):
+        """Replay previously resolved intents from the intent log"""
+        if not self.log_path or not os.path.exists(self.log_path):
+            return
+        try:
+            with open(self.log_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self._add_example(entry["method"], entry["path"], entry["intent"])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except OSError as e:
+            log.warning("⚠️ Could not read intent log: %s", e)
@@ -0,0 +1,142 @@
+"""
+Tolerant JSON extraction for AI provider output
+Finds the first JSON object that satisfies a schema check inside arbitrary
+text (prose, code fences, echoed prompts), incrementally, so streamed
+generations can be stopped as soon as the object closes.
+"""
+import json
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+Validator = Callable[[Dict], bool]
+
+# Letters that can appear outside strings in JSON (true, false, null, exponents)
+JSON_LITERAL_LETTERS = frozenset("truefalsnE")
+
+
+class IncrementalJSONExtractor:
+    """Scans text chunks for the first balanced {...} block that parses and validates"""
+
+    def __init__(self, validate: Optional[Validator] = None):
+        self.validate = validate or (lambda obj: isinstance(obj, dict))
+        self.buffer = ""
+        self.result = None
+        self._position = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> Optional[Dict]:
+        """Add text; returns the object as soon as a valid one has closed"""
+        if self.result is not None:
+            return self.result
+        self.buffer += chunk
+        return self._scan()
+
+    def _scan(self) -> Optional[Dict]:
+        buffer = self.buffer
+        while self._position < len(buffer):
+            char = buffer[self._position]
+
+            if self._depth == 0:
+                if char == "{":
+                    self._start = self._position
+                    self._depth = 1
+                self._position += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char.isalpha() and char not in JSON_LITERAL_LETTERS:
+                # Prose, so this brace does not open the object - retry from the next one
+                self._retry_after_start()
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = self._parse(buffer[self._start:self._position + 1])
+                    if candidate is not None:
+                        self.result = candidate
+                        self._position += 1
+                        return candidate
+                    # Not a valid object - rescan from just after its opening brace
+                    self._retry_after_start()
+            self._position += 1
+        return None
+
+    def _retry_after_start(self):
+        """Drop the current candidate; scanning resumes just after its opening brace"""
+        self._position = self._start
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def _parse(self, text: str) -> Optional[Dict]:
+        try:
+            obj = json.loads(text)
+        except ValueError:
+            return None
+        return obj if isinstance(obj, dict) and self.validate(obj) else None
+
+
+def extract_json_object(text: str, validate: Optional[Validator] = None, prompt: Optional[str] = None) -> Dict:
+    """Return the first valid JSON object in text; raises ValueError if there is none"""
+    if prompt and text.startswith(prompt):
+        # Some text-generation models echo the prompt (and its examples) before answering
+        text = text[len(prompt):]
+    result = IncrementalJSONExtractor(validate).feed(text)
+    if result is None:
+        raise ValueError("No valid JSON object found in AI response")
+    return result
+
+
+def extract_from_stream(chunks: Iterable[str], validate: Optional[Validator] = None) -> Tuple[Dict, str]:
+    """Consume a chunk stream only until a valid object closes; returns (object, text read)"""
+    extractor = IncrementalJSONExtractor(validate)
+    for chunk in chunks:
+        if extractor.feed(chunk) is not None:
+            close = getattr(chunks, "close", None)
+            if close:
+                # Stop generation early - the rest of the output is not needed
+                close()
+            return extractor.result, extractor.buffer
+    raise ValueError(f"No valid JSON object found in AI response: {extractor.buffer}")
+
+
+def make_intent_validator(actions: List[str]) -> Validator:
+    """Schema check for a single intent object"""
+    allowed = set(actions)
+
+    def validate(obj: Dict) -> bool:
+        if obj.get("action") not in allowed:
+            return False
+        return all(
+            value is None or isinstance(value, (str, int, float, bool))
+            for key, value in obj.items() if key != "action"
+        )
+
+    return validate
+
+
+def make_batch_validator(actions: List[str], count: int) -> Validator:
+    """Schema check for a batch answer: {"intents": [intent, ...]} with count entries"""
+    validate_intent = make_intent_validator(actions)
+
+    def validate(obj: Dict) -> bool:
+        intents = obj.get("intents")
+        return (
+            isinstance(intents, list)
+            and len(intents) == count
+            and all(isinstance(intent, dict) and validate_intent(intent) for intent in intents)
+        )
+
+    return validate
@@ -0,0 +1,69 @@
+"""
+JSON Patch (RFC 6902) diffs
+make_patch(old, new) returns add / remove / replace operations that turn the
+plain-JSON document `old` into `new`. Objects are diffed key by key; arrays keep
+their common prefix and suffix and patch only the middle, so an appended or
+edited row costs one operation instead of resending the array.
+"""
+from typing import Any, Dict, List
+
+
+def _pointer(path: str, token) -> str:
+    return f"{path}/{str(token).replace('~', '~0').replace('/', '~1')}"
+
+
+def _same(old: Any, new: Any) -> bool:
+    # 1, 1.0 and True compare equal in Python but not in JSON - at any depth
+    if type(old) is not type(new) or old != new:
+        return False
+    if isinstance(old, dict):
+        return all(_same(value, new[key]) for key, value in old.items())
+    if isinstance(old, list):
+        return all(map(_same, old, new))
+    return True
+
+
+def _diff_list(old: List, new: List, path: str, ops: List[Dict]):
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and _same(old[start], new[start]):
+        start += 1
+    end = 0
+    while end < limit - start and _same(old[len(old) - 1 - end], new[len(new) - 1 - end]):
+        end += 1
+    old_middle = old[start:len(old) - end]
+    new_middle = new[start:len(new) - end]
+
+    common = min(len(old_middle), len(new_middle))
+    for offset in range(common):
+        _diff(old_middle[offset], new_middle[offset], _pointer(path, start + offset), ops)
+    # Removals run from the highest index down so earlier indices stay valid
+    for index in range(start + len(old_middle) - 1, start + common - 1, -1):
+        ops.append({"op": "remove", "path": _pointer(path, index)})
+    for offset in range(common, len(new_middle)):
+        ops.append({"op": "add", "path": _pointer(path, start + offset), "value": new_middle[offset]})
+
+
+def _diff(old: Any, new: Any, path: str, ops: List[Dict]):
+    if _same(old, new):
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": _pointer(path, key)})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": _pointer(path, key), "value": value})
+            else:
+                _diff(old[key], value, _pointer(path, key), ops)
+    elif isinstance(old, list) and isinstance(new, list):
+        _diff_list(old, new, path, ops)
+    else:
+        ops.append({"op": "replace", "path": path, "value": new})
+
+
+def make_patch(old: Any, new: Any) -> List[Dict]:
+    """Operations turning old into new (both plain JSON values)"""
+    ops: List[Dict] = []
+    _diff(old, new, "", ops)
+    return ops
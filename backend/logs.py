@@ -0,0 +1,145 @@
+"""
+Structured logging for the AI Runtime Engine
+Log calls only enqueue a record: a background listener thread formats it and
+writes it to stdout, so a slow output pipe never blocks the event loop. Messages
+use %-style arguments plus keyword fields, and both are formatted by the listener,
+never by the caller - and not at all when the level is disabled. Debug events can
+be sampled. Records logged while serving a request carry its request_id.
+
+    log = get_logger("engine")
+    log.info("🤖 Processing %s %s", method, path, role=user_role)
+    log.debug("Raw AI response", purpose=purpose, response=text)
+
+Configured from system_config: logging_level (debug/info/warning/error),
+logging_format (text/json) and debug_sample_rate (0-1).
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from tracing import current_request_id
+
+ROOT_LOGGER = "ai_engine"
+
+LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+
+_settings = {"debug_sample_rate": 1.0, "format": "text"}
+_listener: Optional[QueueListener] = None
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Enqueue records as they are - message arguments are merged by the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class StructuredFormatter(logging.Formatter):
+    """One line per record: text (message then key=value fields) or a JSON object"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        fields = getattr(record, "fields", None) or {}
+        timestamp = datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds")
+        if record.exc_info:
+            fields = {**fields, "exception": self.formatException(record.exc_info)}
+
+        if _settings["format"] == "json":
+            entry = {"timestamp": timestamp, "level": record.levelname.lower(), "logger": record.name, "message": message}
+            entry.update(fields)
+            return json.dumps(entry, default=str, ensure_ascii=False)
+
+        line = f"{timestamp} {record.levelname:<7} {message}"
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class StructuredLogger:
+    """Thin wrapper over a stdlib logger: level check first, keyword fields, sampled debug"""
+
+    __slots__ = ("_logger",)
+
+    def __init__(self, name: str):
+        self._logger = logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+    def _log(self, level: int, message: str, args, fields: Dict, exc_info=None):
+        request_id = current_request_id()
+        if request_id is not None:
+            fields["request_id"] = request_id
+        self._logger._log(level, message, args, exc_info=exc_info, extra={"fields": fields} if fields else None)
+
+    def enabled(self, level: str) -> bool:
+        return self._logger.isEnabledFor(LEVELS[level])
+
+    def debug(self, message: str, *args, **fields):
+        if self._logger.isEnabledFor(logging.DEBUG):
+            rate = _settings["debug_sample_rate"]
+            if rate >= 1.0 or random.random() < rate:
+                self._log(logging.DEBUG, message, args, fields)
+
+    def info(self, message: str, *args, **fields):
+        if self._logger.isEnabledFor(logging.INFO):
+            self._log(logging.INFO, message, args, fields)
+
+    def warning(self, message: str, *args, **fields):
+        if self._logger.isEnabledFor(logging.WARNING):
+            self._log(logging.WARNING, message, args, fields)
+
+    def error(self, message: str, *args, exc_info=None, **fields):
+        if self._logger.isEnabledFor(logging.ERROR):
+            self._log(logging.ERROR, message, args, fields, exc_info=exc_info)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(name)
+
+
+def _start():
+    """(Re)create the queue and its listener thread - also in forked workers, where threads do not survive"""
+    global _listener
+    records = queue.SimpleQueue()
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(StructuredFormatter())
+
+    root = logging.getLogger(ROOT_LOGGER)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_DeferredQueueHandler(records))
+    root.propagate = False
+
+    _listener = QueueListener(records, output)
+    _listener.start()
+
+
+def _stop():
+    """Flush what is queued (the listener drains the queue before it exits)"""
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def configure_logging(system_config: Dict):
+    """Apply system_config.logging_level / logging_format / debug_sample_rate"""
+    level = str(system_config.get("logging_level", "info")).lower()
+    logging.getLogger(ROOT_LOGGER).setLevel(LEVELS.get(level, logging.INFO))
+    _settings["format"] = "json" if system_config.get("logging_format") == "json" else "text"
+    _settings["debug_sample_rate"] = min(1.0, max(0.0, float(system_config.get("debug_sample_rate", 1.0))))
+
+
+logging.getLogger(ROOT_LOGGER).setLevel(logging.INFO)
+_start()
+atexit.register(_stop)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_start)
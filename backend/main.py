@@ -2,12 +2,20 @@
 Pure AI Runtime Engine Demo - ZERO Hardcoded Endpoints
 This is the revolutionary approach: AI handles ALL requests dynamically
 """
+import startup  # first, so the startup profile covers every import below
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
-import traceback
+startup.mark("import fastapi")
+import time
+import metrics
 from ai_engine import AIRuntimeEngine
+from executors import payload_rows
+from logs import get_logger
+from records import dump_json
+startup.mark("import engine")
+
+log = get_logger("http")
 
 # FastAPI app with ZERO hardcoded endpoints
 app = FastAPI(
@@ -24,13 +32,39 @@ app.add_middleware(
     allow_origins=["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:3001", "http://127.0.0.1:3001"],
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-    allow_headers=["Content-Type", "X-User-Role", "X-UI-Request", "Authorization"],
+    allow_headers=["Content-Type", "X-User-Role", "X-UI-Request", "Authorization", "Last-Event-ID", "X-Request-ID", "X-UI-Version"],
+    expose_headers=["X-Request-ID", "Server-Timing", "Retry-After"],
 )
 
+class EngineJSONResponse(JSONResponse):
+    """JSON response that serializes compact product records - the only place they become dicts"""
+    
+    def render(self, content) -> bytes:
+        with metrics.stage("serialization"):
+            return dump_json(content)
+
+startup.mark("app setup")
+
+async def engine_response(content) -> Response:
+    """
+    Engine answer as JSON, with the status code (and Retry-After when throttled) it calls for.
+    Large bodies are serialized on the CPU executor instead of the event loop.
+    """
+    status_code = ai_engine.status_code_for(content)
+    headers = {"Retry-After": content["retry_after"]} if status_code == 429 else None
+    rows = payload_rows(content)
+    if ai_engine.executors.should_offload(rows):
+        with metrics.stage("serialization"):
+            body = await ai_engine.executors.run_cpu(dump_json, content, size=rows)
+        return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
+    return EngineJSONResponse(content=content, status_code=status_code, headers=headers)
+
 # Single AI Runtime Engine instance - this IS the entire application
 print("🚀 Initializing Pure AI Runtime Engine...")
 ai_engine = AIRuntimeEngine()
+startup.mark("app ready")
 print("✅ AI Runtime Engine ready - ZERO business logic code exists!")
+startup.report(log)
 
 @app.api_route("/{full_path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"])
 async def handle_everything(request: Request, full_path: str):
@@ -56,16 +90,83 @@ async def handle_everything(request: Request, full_path: str):
             headers={
                 "Access-Control-Allow-Origin": "*",
                 "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, PATCH, OPTIONS",
-                "Access-Control-Allow-Headers": "Content-Type, X-User-Role, X-UI-Request, Authorization",
+                "Access-Control-Allow-Headers": "Content-Type, X-User-Role, X-UI-Request, Authorization, X-Request-ID, X-UI-Version",
             }
         )
     
+    # Prometheus scrapes - served before any role handling or AI intent analysis
+    if ai_engine.reserved_action(full_path, request.method) == "metrics":
+        return PlainTextResponse(ai_engine.render_metrics(), media_type=metrics.CONTENT_TYPE)
+    
+    start = time.perf_counter()
+    reserved_action = ai_engine.reserved_action(full_path, request.method)
+    user_role = request.headers.get("X-User-Role")
+    if not user_role and reserved_action == "subscribe_events":
+        # EventSource cannot send custom headers - the change feed takes the role as ?role= instead
+        user_role = request.query_params.get("role")
+    user_role = user_role or "viewer"
+    ai_engine.begin_metrics(user_role)
+    trace = ai_engine.start_trace(request.headers.get("X-Request-ID"), request.method, "/" + full_path, user_role)
+    throttled = ai_engine.admit_request(
+        user_role,
+        request.client.host if request.client else None,
+        request.headers.get("X-Forwarded-For"),
+        reserved_action
+    )
+    if throttled is not None:
+        response = await engine_response(throttled)
+    else:
+        response = await handle_engine_request(request, full_path, user_role)
+    labels = metrics.current_labels()
+    metrics.REQUESTS.inc(status=response.status_code, **labels)
+    metrics.REQUEST_SECONDS.observe(time.perf_counter() - start, **labels)
+    if trace is not None:
+        response.headers.update(ai_engine.finish_trace(trace, response.status_code))
+    return response
+
+async def handle_engine_request(request: Request, full_path: str, user_role: str):
+    """Hand one request to the AI Runtime Engine and turn its answer into an HTTP response"""
     try:
-        # Extract user context from headers
-        user_role = request.headers.get("X-User-Role", "viewer")
         method = request.method
         
-        print(f"🎯 AI Runtime Engine: {method} /{full_path} (role: {user_role})")
+        log.debug("🎯 AI Runtime Engine: %s /%s (role: %s)", method, full_path, user_role)
+        
+        # Bulk import/export and the change feed stream instead of buffering JSON
+        reserved_action = ai_engine.reserved_action(full_path, method)
+        if reserved_action is not None:
+            metrics.set_action(reserved_action)
+        if reserved_action == "bulk_import_products":
+            ai_response = await ai_engine.handle_bulk_import(
+                user_role=user_role,
+                chunks=request.stream(),
+                content_type=request.headers.get("content-type", ""),
+                params=dict(request.query_params)
+            )
+            return await engine_response(ai_response)
+        if reserved_action == "export_products":
+            export = ai_engine.handle_export(user_role, dict(request.query_params))
+            if "error" in export:
+                return JSONResponse(content=export, status_code=ai_engine.status_code_for(export))
+            return StreamingResponse(
+                export["stream"],
+                media_type=export["media_type"],
+                headers={"Content-Disposition": f'attachment; filename="{export["filename"]}"'}
+            )
+        if reserved_action == "debug_traces":
+            traces = ai_engine.handle_debug_traces(user_role, dict(request.query_params))
+            return await engine_response(traces)
+        if reserved_action == "subscribe_events":
+            events = ai_engine.handle_events(
+                user_role,
+                request.headers.get("Last-Event-ID") or request.query_params.get("last_event_id")
+            )
+            if "error" in events:
+                return JSONResponse(content=events, status_code=ai_engine.status_code_for(events))
+            return StreamingResponse(
+                events["stream"],
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
         
         # Get request data
         request_data = {}
@@ -87,22 +188,10 @@ async def handle_everything(request: Request, full_path: str):
         )
         
         # AI determines the HTTP status code
-        status_code = 200
-        if "error" in ai_response:
-            if "Access Denied" in ai_response.get("error", ""):
-                status_code = 403
-            elif "Not Found" in ai_response.get("error", ""):
-                status_code = 404
-            elif "Validation" in ai_response.get("error", ""):
-                status_code = 400
-            else:
-                status_code = 500
-        
-        return JSONResponse(content=ai_response, status_code=status_code)
+        return await engine_response(ai_response)
         
     except Exception as e:
-        print(f"❌ Error in AI Runtime Engine: {e}")
-        print(traceback.format_exc())
+        log.error("❌ Error in AI Runtime Engine: %s", e, exc_info=True)
         
         # AI Engine handles errors too
         try:
@@ -125,6 +214,7 @@ async def handle_everything(request: Request, full_path: str):
 async def startup_event():
     """AI Runtime Engine startup"""
     print("🧠 Pure AI Runtime Engine Demo Starting...")
+    ai_engine.executors.start_loop_monitor()
     print("🚀 Revolutionary Concept: AI IS the application runtime")
     print("📋 ZERO hardcoded business logic exists")
     print("⚡ All requests handled dynamically by AI")
@@ -140,6 +230,7 @@ async def startup_event():
 async def shutdown_event():
     """AI Runtime Engine shutdown"""
     print("🛑 AI Runtime Engine shutting down...")
+    ai_engine.executors.shutdown()
 
 # Health check endpoint (the only "hardcoded" endpoint, but it just calls AI)
 @app.get("/")
@@ -164,6 +255,7 @@ async def root():
         }
 
 if __name__ == "__main__":
+    import uvicorn  # only needed when run directly - workers are started by uvicorn/gunicorn
     print("🚀 Starting Pure AI Runtime Engine on port 8000...")
     uvicorn.run(
         app, 
@@ -0,0 +1,231 @@
+"""
+Metrics for the AI Runtime Engine, in Prometheus text exposition format
+Counters, gauges and histograms with labels, kept in process memory and rendered
+by the reserved /metrics route. Request stages are timed with `stage()`, which
+labels each observation with the action and role of the request being served
+(tracked in a context variable, so concurrent requests never mix labels).
+
+Provider calls and cache lookups made while resolving an intent are labeled
+action="unresolved" (action="batch" for batched resolution); the intent stage
+itself is recorded under the action it resolved to.
+
+Each worker process keeps its own registry; scrape every worker (or run one).
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from tracing import record_span
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # the response adds charset=utf-8
+
+# Seconds - from sub-millisecond cache hits up to slow provider calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Action and role of the request the current task is serving
+_request_labels: contextvars.ContextVar[Optional[Dict[str, str]]] = contextvars.ContextVar("request_labels", default=None)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic count per label set"""
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that goes up and down per label set"""
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram of observations (seconds) per label set"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, ([*state[0]], state[1], state[2])) for key, state in self._values.items())
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "ai_engine_stage_duration_seconds",
+    "Time spent per request stage (intent, permission, handler, provider, storage_read, storage_write, ui_generation, ui_delta, serialization)",
+    ["stage", "action", "role"]
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "ai_engine_request_duration_seconds", "End-to-end request latency", ["action", "role"]
+))
+REQUESTS = REGISTRY.register(Counter(
+    "ai_engine_requests_total", "Requests served", ["action", "role", "status"]
+))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "ai_engine_requests_in_flight", "Requests currently being handled", ["action", "role"]
+))
+PROVIDER_CALLS = REGISTRY.register(Counter(
+    "ai_engine_provider_calls_total", "AI provider calls", ["provider", "purpose", "action", "role"]
+))
+PROVIDER_ERRORS = REGISTRY.register(Counter(
+    "ai_engine_provider_errors_total", "AI provider calls that raised", ["provider", "purpose", "action", "role"]
+))
+PROVIDER_TOKENS = REGISTRY.register(Counter(
+    "ai_engine_provider_tokens_total", "Tokens sent to (in) and generated by (out) the AI provider",
+    ["provider", "direction", "action", "role"]
+))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "ai_engine_cache_lookups_total", "Cache lookups by result (hit/miss)", ["cache", "result", "action", "role"]
+))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "ai_engine_cache_hit_ratio", "Hit ratio over the cache's lifetime", ["cache"]
+))
+EVENT_LOOP_LAG = REGISTRY.register(Histogram(
+    "ai_engine_event_loop_lag_seconds", "How late the event loop ran a scheduled timer"
+))
+EVENT_LOOP_LAG_LAST = REGISTRY.register(Gauge(
+    "ai_engine_event_loop_lag_last_seconds", "Event-loop lag at the latest probe"
+))
+UI_RESPONSES = REGISTRY.register(Counter(
+    "ai_engine_ui_responses_total", "UI instructions sent to clients holding a base version, by encoding (full/delta/unchanged)", ["encoding"]
+))
+OFFLOADED = REGISTRY.register(Counter(
+    "ai_engine_offloaded_tasks_total", "Work handed from the event loop to an executor pool", ["pool"]
+))
+
+
+def begin_request(role: str, action: str = "unresolved") -> Dict[str, str]:
+    """Start labeling this task's observations; the action is filled in once it is resolved"""
+    labels = {"action": action, "role": role}
+    _request_labels.set(labels)
+    return labels
+
+
+def set_action(action: str):
+    labels = _request_labels.get()
+    if labels is not None:
+        labels["action"] = action
+
+
+def current_labels() -> Dict[str, str]:
+    return _request_labels.get() or {"action": "none", "role": "none"}
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block as one request stage (also a span on the request's trace)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, start)
+
+
+def observe_stage(name: str, start: float):
+    """Record a stage that began at perf_counter() time `start` and ends now"""
+    duration = time.perf_counter() - start
+    STAGE_SECONDS.observe(duration, stage=name, **current_labels())
+    record_span(name, start, duration)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss", **current_labels())
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,255 @@
+"""
+Policy loading with a precompiled cache
+Parsing the YAML policy files is the slowest part of engine start. The merged
+result is saved as a JSON artifact keyed by a hash of every policy file's name
+and content; while no file changes, startup loads the artifact and never imports
+or runs the YAML parser. libyaml's CSafeLoader is used when available. The
+artifact is plain data - loading it never runs code - and is only written when
+the policies survive a JSON round trip unchanged (no dates or non-string keys).
+
+POLICY_CACHE sets the artifact path ("off" disables it).
+
+Loaded policies are versioned per path: every top-level key and every key below
+it ("ui_behavior.themes") gets a content hash. The engine serves them through a
+PolicyView, which - while record_policy_reads() is active - notes which of those
+paths a handler read, so a cached response can be checked against exactly the
+policy content it was built from.
+"""
+import contextvars
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from logs import get_logger
+
+log = get_logger("policies")
+
+DEFAULT_CACHE_PATH = "../DATA/.policy_cache.json"
+CACHE_FORMAT = 2
+
+# Path standing for just the set of top-level policy keys (listing them reads no content)
+KEYS_PATH = "."
+
+# Paths read by the handler currently recording (path -> read as a whole)
+_policy_reads: contextvars.ContextVar[Optional[Dict[str, bool]]] = contextvars.ContextVar("policy_reads", default=None)
+
+
+def policy_files(policies_dir: str) -> List[str]:
+    """Every YAML policy file, in merge (name) order"""
+    if not os.path.exists(policies_dir):
+        return []
+    return sorted(filename for filename in os.listdir(policies_dir) if filename.endswith(".yaml"))
+
+
+def _read_sources(policies_dir: str, files: List[str]) -> Tuple[Dict[str, bytes], str]:
+    sources = {}
+    digest = hashlib.sha256(f"format:{CACHE_FORMAT}".encode())
+    for filename in files:
+        with open(os.path.join(policies_dir, filename), "rb") as f:
+            sources[filename] = f.read()
+        digest.update(filename.encode() + b"\0" + sources[filename] + b"\0")
+    return sources, digest.hexdigest()
+
+
+def _parse_yaml(source: bytes):
+    import yaml  # only needed when the cache misses
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(source, Loader=loader)
+
+
+def cache_path() -> Optional[str]:
+    path = os.getenv("POLICY_CACHE", DEFAULT_CACHE_PATH)
+    return None if path.lower() in ("", "off", "0", "false") else path
+
+
+def _load_artifact(path: str, digest: str) -> Optional[Dict]:
+    try:
+        with open(path, "rb") as f:
+            artifact = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(artifact, dict) or artifact.get("digest") != digest or not isinstance(artifact.get("policies"), dict):
+        return None
+    return artifact["policies"]
+
+
+def _save_artifact(path: str, digest: str, policies: Dict):
+    try:
+        encoded = json.dumps({"digest": digest, "policies": policies}, separators=(",", ":"), ensure_ascii=False)
+    except (TypeError, ValueError):
+        encoded = None
+    if encoded is None or json.loads(encoded)["policies"] != policies:
+        log.info("ℹ️ Policies hold values JSON cannot represent exactly - not caching them")
+        return
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(encoded)
+        os.replace(temp_path, path)
+    except OSError as e:
+        log.warning("⚠️ Could not write policy cache %s: %s", path, e)
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+
+def load_policies(policies_dir: str, merge: Callable[[Dict, Dict], Dict]) -> Tuple[Dict, List[str], bool]:
+    """
+    Merged policies from every YAML file in policies_dir.
+    Returns (policies, files loaded, whether they came from the cache).
+    """
+    files = policy_files(policies_dir)
+    sources, digest = _read_sources(policies_dir, files)
+
+    path = cache_path()
+    if path and files:
+        cached = _load_artifact(path, digest)
+        if cached is not None:
+            return cached, files, True
+
+    policies = {}
+    for filename in files:
+        file_policies = _parse_yaml(sources[filename])
+        if file_policies:
+            policies = merge(policies, file_policies)
+            log.info("✅ Loaded policies from %s", filename)
+
+    if path and policies:
+        _save_artifact(path, digest, policies)
+    return policies, files, False
+
+
+def files_signature(policies_dir: str) -> Tuple:
+    """Cheap change check: name, mtime and size of every policy file"""
+    signature = []
+    for filename in policy_files(policies_dir):
+        try:
+            stat = os.stat(os.path.join(policies_dir, filename))
+        except OSError:
+            continue
+        signature.append((filename, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def _content_hash(value) -> str:
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def policy_hashes(policies: Dict) -> Dict[str, str]:
+    """Content hash of every top-level policy key and of each key directly below it"""
+    hashes = {KEYS_PATH: _content_hash(sorted(map(str, policies)))}
+    for key, value in policies.items():
+        hashes[key] = _content_hash(value)
+        if isinstance(value, dict):
+            for child, child_value in value.items():
+                hashes[f"{key}.{child}"] = _content_hash(child_value)
+    return hashes
+
+
+def changed_paths(old: Dict[str, str], new: Dict[str, str]) -> Set[str]:
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+
+class PolicyView(dict):
+    """
+    Read-only policies that report reads to the active recorder.
+    Top-level values that are mappings are views too; anything deeper is plain data.
+    """
+
+    __slots__ = ("_path",)
+
+    def __init__(self, policies: Dict, path: str = ""):
+        super().__init__()
+        self._path = path
+        for key, value in policies.items():
+            if not path and isinstance(value, dict):
+                value = PolicyView(value, str(key))
+            dict.__setitem__(self, key, value)
+
+    def _note(self, key):
+        reads = _policy_reads.get()
+        if reads is not None:
+            path = f"{self._path}.{key}" if self._path else str(key)
+            reads.setdefault(path, False)
+
+    def _note_whole(self):
+        reads = _policy_reads.get()
+        if reads is not None:
+            for path in ([self._path] if self._path else map(str, dict.keys(self))):
+                reads[path] = True
+
+    def _note_keys(self):
+        if self._path:
+            self._note_whole()
+            return
+        reads = _policy_reads.get()
+        if reads is not None:
+            reads[KEYS_PATH] = True
+
+    def get(self, key, default=None):
+        self._note(key)
+        return dict.get(self, key, default)
+
+    def __getitem__(self, key):
+        self._note(key)
+        return dict.__getitem__(self, key)
+
+    def __contains__(self, key):
+        self._note(key)
+        return dict.__contains__(self, key)
+
+    def __iter__(self):
+        self._note_keys()
+        return dict.__iter__(self)
+
+    def keys(self):
+        self._note_keys()
+        return dict.keys(self)
+
+    def values(self):
+        self._note_whole()
+        return dict.values(self)
+
+    def items(self):
+        self._note_whole()
+        return dict.items(self)
+
+    def copy(self):
+        self._note_whole()
+        return dict(dict.items(self))
+
+
+def note_policy_read(path: str):
+    """
+    Record a whole-path read made through state built from the policies (validators,
+    stock tiers, ...) rather than through the PolicyView itself.
+    """
+    reads = _policy_reads.get()
+    if reads is not None:
+        reads[path] = True
+
+
+@contextmanager
+def record_policy_reads(enabled: bool = True):
+    """
+    Collect the policy paths read inside the block (yields a set, filled on exit).
+    A path that was only walked through to reach a deeper one is not a dependency.
+    """
+    if not enabled:
+        yield None
+        return
+    reads: Dict[str, bool] = {}
+    token = _policy_reads.set(reads)
+    dependencies: Set[str] = set()
+    try:
+        yield dependencies
+    finally:
+        _policy_reads.reset(token)
+        dependencies.update(
+            path for path, whole in reads.items()
+            if whole or not any(other.startswith(path + ".") for other in reads)
+        )
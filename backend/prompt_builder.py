@@ -0,0 +1,70 @@
+"""
+Intent Prompt Builder - compact, cache-friendly prompts for the AI provider
+The static instruction block is compiled once from the loaded policies and kept
+byte-stable, so provider-side prompt caching can reuse it across calls.
+"""
+import json
+from typing import Dict, List, Tuple
+
+# Rough characters-per-token ratio for English/JSON text (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_budget(data, token_budget: int) -> str:
+    """Serialize request data compactly, cutting it down to a token budget"""
+    try:
+        text = json.dumps(data, separators=(",", ":"), sort_keys=True, default=str)
+    except (TypeError, ValueError):
+        text = str(data)
+
+    max_chars = token_budget * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:max(max_chars - 14, 0)] + "...(truncated)"
+
+
+class IntentPromptBuilder:
+    """Builds intent prompts as a precompiled static prefix plus a small per-request suffix"""
+
+    def __init__(self, actions: List[str], examples: List[Tuple[str, str, Dict]], data_token_budget: int = 48):
+        self.actions = actions
+        self.data_token_budget = data_token_budget
+        self.prefix = self._compile_prefix(actions, examples)
+        self.prefix_tokens = estimate_tokens(self.prefix)
+
+    def _compile_prefix(self, actions: List[str], examples: List[Tuple[str, str, Dict]]) -> str:
+        """Static instruction block - must not contain anything request-specific"""
+        example_lines = "\n".join(
+            f"{method} {path} -> {json.dumps(intent, separators=(',', ':'))}"
+            for method, path, intent in examples
+        )
+        return (
+            "Classify HTTP requests by intent. Reply with JSON only, no prose.\n"
+            "An intent is {\"action\":<action>, ...parameters}.\n"
+            f"Actions: {', '.join(actions)}\n"
+            "Use \"product_id\" for delete_product and \"role\" for get_user_context.\n"
+            f"Examples:\n{example_lines}\n"
+        )
+
+    def _request_block(self, path: str, method: str, data) -> str:
+        return f"Path: {path}\nMethod: {method}\nData: {truncate_to_budget(data, self.data_token_budget)}\n"
+
+    def build(self, path: str, method: str, data) -> str:
+        """Prompt for a single request"""
+        return f"{self.prefix}\nRequest:\n{self._request_block(path, method, data)}Reply with one intent object."
+
+    def build_batch(self, requests: List[Tuple[str, str, Dict]]) -> str:
+        """Prompt for several requests answered in one call"""
+        blocks = "".join(
+            f"\nRequest {index}:\n{self._request_block(path, method, data)}"
+            for index, (path, method, data) in enumerate(requests)
+        )
+        return (
+            f"{self.prefix}{blocks}"
+            f"Reply with {{\"intents\":[...]}} holding exactly {len(requests)} intent objects in request order."
+        )
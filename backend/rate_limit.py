@@ -0,0 +1,138 @@
+"""
+Token-bucket rate limiting
+Every request takes a token from its (role, client IP) bucket and from the
+client's IP-wide bucket; requests whose intent has to be resolved by the AI
+provider also take one from a stricter LLM bucket, and actions can have budgets
+of their own. A bucket refills continuously at its rate up to its burst size;
+an empty bucket means 429 with the seconds until a token is back (Retry-After).
+
+Configured by system_config.security.rate_limiting. Buckets live in process
+memory, or in the cache server's shared store when `shared` is on and several
+workers run, so the budget holds across all of them.
+"""
+import contextvars
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from logs import get_logger
+
+log = get_logger("rate_limit")
+
+# Bucket count that triggers dropping idle (full) buckets
+SWEEP_THRESHOLD = 10000
+
+DEFAULT_LIMITS = {
+    "requests": {"requests_per_minute": 600, "burst": 120},
+    "llm": {"requests_per_minute": 30, "burst": 10},
+}
+
+# Client address of the request the current task is serving
+_client_ip: contextvars.ContextVar[str] = contextvars.ContextVar("client_ip", default="unknown")
+
+
+class RateLimited(Exception):
+    """Raised where a budget runs out deep in request handling"""
+
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"{scope} rate limit exceeded")
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+def _parse_limit(config: Optional[Dict]) -> Optional[Tuple[float, float]]:
+    """(tokens per second, burst) from {requests_per_minute, burst}; None means unlimited"""
+    if not config:
+        return None
+    per_minute = float(config.get("requests_per_minute", 0))
+    if per_minute <= 0:
+        return None
+    return per_minute / 60.0, float(config.get("burst", max(1.0, per_minute / 6)))
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+class RateLimiter:
+    def __init__(self, config, store=None, lock=None):
+        if not isinstance(config, dict):
+            config = {"enabled": bool(config)}
+        self.enabled = bool(config.get("enabled", True))
+        self.trust_forwarded_for = bool(config.get("trust_forwarded_for", False))
+        self._defaults = {kind: _parse_limit({**DEFAULT_LIMITS[kind], **(config.get(kind) or {})})
+                          for kind in DEFAULT_LIMITS}
+        self._roles = {
+            role: {kind: _parse_limit({**DEFAULT_LIMITS[kind], **limits[kind]}) for kind in DEFAULT_LIMITS if kind in limits}
+            for role, limits in (config.get("roles") or {}).items()
+        }
+        self._per_ip = _parse_limit(config.get("per_ip"))
+        self._actions = {action: _parse_limit(limits) for action, limits in (config.get("actions") or {}).items()}
+        self._buckets = store if store is not None else {}
+        self._lock = lock if lock is not None else threading.Lock()
+        self.shared = store is not None
+
+    def _limit(self, kind: str, role: str) -> Optional[Tuple[float, float]]:
+        role_limits = self._roles.get(role, {})
+        return role_limits[kind] if kind in role_limits else self._defaults[kind]
+
+    def _acquire(self, buckets: List[Tuple[str, Tuple[float, float]]]) -> float:
+        """Take one token from every bucket, or from none; returns 0 or the seconds to wait"""
+        now = time.time()
+        with self._lock:
+            updated = []
+            wait = 0.0
+            for key, (rate, burst) in buckets:
+                tokens, stamp = self._buckets.get(key, (burst, now))
+                tokens = min(burst, tokens + (now - stamp) * rate)
+                if tokens < 1.0:
+                    wait = max(wait, (1.0 - tokens) / rate)
+                updated.append((key, tokens))
+            if wait:
+                return wait
+            for key, tokens in updated:
+                self._buckets[key] = (tokens - 1.0, now)
+            if len(self._buckets) > SWEEP_THRESHOLD:
+                self._sweep(now)
+        return 0.0
+
+    def _sweep(self, now: float):
+        # Buckets idle long enough to be full again hold no state worth keeping
+        for key, (tokens, stamp) in list(self._buckets.items()):
+            if now - stamp > 600:
+                self._buckets.pop(key, None)
+
+    def client_ip(self, peer: Optional[str], forwarded_for: Optional[str]) -> str:
+        if self.trust_forwarded_for and forwarded_for:
+            return forwarded_for.split(",")[0].strip()
+        return peer or "unknown"
+
+    def admit_request(self, role: str, client_ip: str) -> float:
+        """Per-request budget of this role and client, plus the client's overall budget"""
+        _client_ip.set(client_ip)
+        if not self.enabled:
+            return 0.0
+        buckets = []
+        limit = self._limit("requests", role)
+        if limit:
+            buckets.append((f"requests|{role}|{client_ip}", limit))
+        if self._per_ip:
+            buckets.append((f"ip|{client_ip}", self._per_ip))
+        return self._acquire(buckets) if buckets else 0.0
+
+    def admit_action(self, action: str, role: str) -> float:
+        """Budget of one action (only for actions listed under `actions`)"""
+        limit = self._actions.get(action) if self.enabled else None
+        if not limit:
+            return 0.0
+        return self._acquire([(f"action|{action}|{role}|{_client_ip.get()}", limit)])
+
+    def admit_llm(self, role: str):
+        """Budget of requests that need an AI provider call; raises RateLimited when it is spent"""
+        limit = self._limit("llm", role) if self.enabled else None
+        if not limit:
+            return
+        wait = self._acquire([(f"llm|{role}|{_client_ip.get()}", limit)])
+        if wait:
+            raise RateLimited("AI provider", wait)
@@ -0,0 +1,110 @@
+"""
+Compact product records
+Products are held as __slots__ records instead of dicts: no per-instance dict,
+field names stored once on the class and category strings interned. Records are
+immutable and read like mappings (record["name"], record.get("price")), so they
+are shared between the storage cache and responses without copying; they only
+become dicts at the serialization boundary (json_default / to_dict).
+"""
+import json
+import sys
+from typing import Any, Dict, Iterator, Optional
+
+PRODUCT_FIELDS = ("id", "name", "category", "price", "stock")
+
+
+class ProductRecord:
+    """Immutable product; fields outside PRODUCT_FIELDS are kept in `extra`"""
+
+    __slots__ = PRODUCT_FIELDS + ("extra",)
+
+    def __init__(self, id=None, name=None, category=None, price=None, stock=None, extra: Optional[Dict] = None):
+        set_field = object.__setattr__
+        set_field(self, "id", id)
+        set_field(self, "name", name)
+        set_field(self, "category", sys.intern(category) if type(category) is str else category)
+        set_field(self, "price", price)
+        set_field(self, "stock", stock)
+        set_field(self, "extra", extra or None)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ProductRecord":
+        if isinstance(data, ProductRecord):
+            return data
+        extra = {key: value for key, value in data.items() if key not in PRODUCT_FIELDS}
+        return cls(data.get("id"), data.get("name"), data.get("category"), data.get("price"), data.get("stock"), extra)
+
+    def to_dict(self) -> Dict:
+        data = {field: getattr(self, field) for field in PRODUCT_FIELDS if getattr(self, field) is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def replace(self, **updates) -> "ProductRecord":
+        """New record with some fields changed"""
+        return ProductRecord.from_dict({**self.to_dict(), **updates})
+
+    # Read-only mapping protocol - lets existing dict-based code read records unchanged
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in PRODUCT_FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.extra.get(key, default) if self.extra else default
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ProductRecord is immutable - use replace()")
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ProductRecord, dict)):
+            return self.to_dict() == (other.to_dict() if isinstance(other, ProductRecord) else other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    def __reduce__(self):
+        # Compact pickling for the shared cross-worker cache
+        return (ProductRecord, (self.id, self.name, self.category, self.price, self.stock, self.extra))
+
+
+_MISSING = object()
+
+
+def json_default(obj):
+    """json.dumps default= hook - records serialize as plain product objects"""
+    if isinstance(obj, ProductRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dump_json(content) -> bytes:
+    """Compact UTF-8 JSON of a response body (module level, so worker processes can run it)"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                      default=json_default).encode("utf-8")
+
+
+def product_object_hook(data: Dict):
+    """json.load object_hook for products.json - product objects become records as they are parsed"""
+    if "id" in data or "name" in data:
+        return ProductRecord.from_dict(data)
+    return data
@@ -0,0 +1,144 @@
+"""
+Record and replay AI provider traffic
+RecordingProvider wraps a real provider and appends every prompt -> response pair
+(with the call's latency and reported token usage) to a compact JSON Lines file,
+gzip-compressed when the path ends in .gz. ReplayProvider serves those responses
+back with no network, under a latency model, so load tests exercise the full
+engine pipeline - intent extraction, caching, handlers - with realistic answers.
+
+Prompts are stored as a hash: the recording holds responses, never request data.
+"""
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+from logs import get_logger
+
+log = get_logger("replay")
+
+LATENCY_MODELS = ("none", "fixed", "recorded")
+
+
+def prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:32]
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class RecordingProvider:
+    """Pass calls through to a real provider and record what it answered"""
+
+    def __init__(self, provider, path: str):
+        self.provider = provider
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Only offer streaming when the wrapped provider does (the engine checks with hasattr)
+        if hasattr(provider, "stream_response"):
+            self.stream_response = self._stream_and_record
+        log.info("⏺️ Recording %s responses to %s", type(provider).__name__, path)
+
+    @property
+    def last_usage(self) -> Optional[Dict]:
+        return getattr(self.provider, "last_usage", None)
+
+    def _record(self, prompt: str, response: str, seconds: float):
+        entry = {"k": prompt_key(prompt), "r": response, "ms": round(seconds * 1000, 1)}
+        if self.last_usage:
+            entry["u"] = [self.last_usage["tokens_in"], self.last_usage["tokens_out"]]
+        line = json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n"
+        with self._lock, _open(self.path, "a") as f:
+            f.write(line)
+
+    def generate_response(self, prompt: str) -> str:
+        start = time.perf_counter()
+        response = self.provider.generate_response(prompt)
+        self._record(prompt, response, time.perf_counter() - start)
+        return response
+
+    def _stream_and_record(self, prompt: str):
+        """Stream through; what was generated before the engine stopped reading is recorded"""
+        start = time.perf_counter()
+        chunks = []
+        try:
+            for chunk in self.provider.stream_response(prompt):
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            if chunks:
+                self._record(prompt, "".join(chunks), time.perf_counter() - start)
+
+
+class ReplayProvider:
+    """
+    Answer prompts from a recording.
+    Latency models: none, fixed (latency_ms) or recorded (each response's own
+    latency times `scale`); jitter_ms adds uniform noise of +/- that much.
+    Repeated recordings of one prompt are replayed in turn. Unrecorded prompts go to
+    the fallback provider if there is one and fail otherwise.
+    """
+
+    def __init__(self, path: str, latency_model: str = "none", latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, scale: float = 1.0, seed: Optional[int] = None, fallback=None):
+        if latency_model not in LATENCY_MODELS:
+            raise RuntimeError(f"CRITICAL: Unknown replay latency model '{latency_model}'. Options: {', '.join(LATENCY_MODELS)}")
+        self.latency_model = latency_model
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.scale = scale
+        self.fallback = fallback
+        self.last_usage = None
+        self.stats = {"hits": 0, "misses": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._turns: Dict[str, int] = {}
+        self._entries: Dict[str, List[Dict]] = {}
+        with _open(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["k"], []).append(entry)
+        log.info("⏯️ Replaying %d recorded prompts from %s (latency: %s)", len(self._entries), path, latency_model)
+
+    def _delay(self, entry: Dict) -> float:
+        if self.latency_model == "fixed":
+            delay = self.latency_ms
+        elif self.latency_model == "recorded":
+            delay = entry.get("ms", 0.0) * self.scale
+        else:
+            delay = 0.0
+        if self.jitter_ms:
+            delay += self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, delay) / 1000
+
+    def generate_response(self, prompt: str) -> str:
+        key = prompt_key(prompt)
+        entries = self._entries.get(key)
+        if not entries:
+            self.stats["misses"] += 1
+            if self.fallback is None:
+                raise RuntimeError("CRITICAL AI FAILURE: Prompt not in the replay recording and no fallback provider.")
+            self.last_usage = None
+            return self.fallback.generate_response(prompt)
+
+        with self._lock:
+            turn = self._turns.get(key, 0)
+            self._turns[key] = turn + 1
+            entry = entries[turn % len(entries)]
+            delay = self._delay(entry)
+        self.stats["hits"] += 1
+        if delay:
+            time.sleep(delay)  # blocks like the synchronous SDK call it stands in for
+        self.last_usage = {"tokens_in": entry["u"][0], "tokens_out": entry["u"][1]} if "u" in entry else None
+        return entry["r"]
@@ -0,0 +1,263 @@
+"""
+Memory-mapped catalog snapshot
+A read-only binary image of products.json:
+
+    header | fixed-width record table | string heap | id hash index
+
+Opening a snapshot only maps the file (O(1), pages shared by every worker via the
+page cache) and get() is a hash probe on the id index that decodes one record, so
+id lookups never load the catalog. Full list reads (products()) still decode every
+record - O(n), cheaper than parsing JSON but not lazy. The header records the version of the products.json it was built from,
+so a stale snapshot is never served.
+
+Usage (from backend/):
+    python snapshot.py to-snapshot ../DATA/products.json ../DATA/products.snap
+    python snapshot.py to-json ../DATA/products.snap products.json
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from typing import Iterable, List, Optional, Tuple
+
+from records import PRODUCT_FIELDS, ProductRecord, json_default
+
+MAGIC = b"PSNP"
+FORMAT_VERSION = 1
+
+# magic, format version, reserved, record count, index capacity,
+# record table / string heap / index offsets, source (inode, mtime_ns, size)
+HEADER = struct.Struct("<4sHHIIQQQQqQ")
+
+# Per record: (offset, length) into the heap for id, name, category and extra JSON,
+# flags, reserved, price, stock
+RECORD = struct.Struct("<10Idq")
+INDEX_SLOT = struct.Struct("<I")
+
+NONE = 0xFFFFFFFF
+PRICE_IS_INT = 1
+PRICE_NONE = 2
+STOCK_NONE = 4
+
+STRING_FIELDS = ("id", "name", "category")
+
+
+def source_version(path: str) -> Optional[Tuple[int, int, int]]:
+    """(inode, mtime_ns, size) of the JSON file a snapshot is built from"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _slot(key: bytes, capacity: int) -> int:
+    return zlib.crc32(key) & (capacity - 1)
+
+
+def write_snapshot(products: Iterable, path: str, source: Optional[Tuple[int, int, int]] = None):
+    """Serialize products (records or dicts) to a snapshot file, atomically"""
+    heap = bytearray()
+    heap_offsets = {}
+
+    def put(text: str) -> Tuple[int, int]:
+        # Repeated strings (categories) are stored once
+        if text in heap_offsets:
+            return heap_offsets[text]
+        data = text.encode("utf-8")
+        location = heap_offsets[text] = (len(heap), len(data))
+        heap.extend(data)
+        return location
+
+    records = bytearray()
+    ids = []
+    count = 0
+    for product in products:
+        data = product.to_dict() if isinstance(product, ProductRecord) else dict(product)
+        extra = {key: value for key, value in data.items() if key not in PRODUCT_FIELDS}
+        fields = []
+        for field in STRING_FIELDS:
+            value = data.get(field)
+            if isinstance(value, str):
+                fields.extend(put(value))
+            else:
+                if value is not None:
+                    extra[field] = value  # non-string values round-trip through the extra JSON
+                fields.extend((0, NONE))
+
+        flags = 0
+        price, stock = data.get("price"), data.get("stock")
+        if price is None:
+            flags |= PRICE_NONE
+            price = 0.0
+        elif isinstance(price, bool) or not isinstance(price, (int, float)):
+            extra["price"] = price
+            flags |= PRICE_NONE
+            price = 0.0
+        elif isinstance(price, int):
+            flags |= PRICE_IS_INT
+        if stock is None:
+            flags |= STOCK_NONE
+            stock = 0
+        elif isinstance(stock, bool) or not isinstance(stock, int) or not -2**63 <= stock < 2**63:
+            extra["stock"] = stock
+            flags |= STOCK_NONE
+            stock = 0
+
+        if extra:
+            offset = len(heap)
+            encoded = json.dumps(extra, default=json_default).encode("utf-8")
+            heap.extend(encoded)
+            fields.extend((offset, len(encoded)))
+        else:
+            fields.extend((0, NONE))
+
+        records.extend(RECORD.pack(*fields, flags, 0, float(price), stock))
+        ids.append(data.get("id") if isinstance(data.get("id"), str) else None)
+        count += 1
+
+    # Open-addressing id index, at most half full
+    capacity = 1
+    while capacity < max(2, count * 2):
+        capacity *= 2
+    index = [0] * capacity
+    for position, product_id in enumerate(ids):
+        if product_id is None:
+            continue
+        slot = _slot(product_id.encode("utf-8"), capacity)
+        while index[slot]:
+            slot = (slot + 1) & (capacity - 1)
+        index[slot] = position + 1
+
+    records_offset = HEADER.size
+    heap_offset = records_offset + len(records)
+    index_offset = heap_offset + len(heap)
+    index_offset += -index_offset % 8
+    ino, mtime_ns, size = source or (0, 0, 0)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, count, capacity,
+                         records_offset, heap_offset, index_offset, ino, mtime_ns, size)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".products.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(records)
+            f.write(heap)
+            f.write(b"\0" * (index_offset - heap_offset - len(heap)))
+            f.write(struct.pack(f"<{capacity}I", *index))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class CatalogSnapshot:
+    """Read-only, memory-mapped view of a snapshot file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, self.count, self._capacity, self._records, self._heap, self._index,
+         ino, mtime_ns, size) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} catalog snapshot")
+        self.source = (ino, mtime_ns, size)
+
+    def is_fresh(self, source: Optional[Tuple[int, int, int]]) -> bool:
+        """True if the snapshot was built from this exact version of products.json"""
+        return source is not None and source == self.source
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _string(self, offset: int, length: int) -> Optional[str]:
+        if length == NONE:
+            return None
+        start = self._heap + offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def record(self, position: int) -> ProductRecord:
+        """Decode one record from the table"""
+        return self._decode(RECORD.unpack_from(self._map, self._records + position * RECORD.size))
+
+    def _decode(self, fields) -> ProductRecord:
+        (id_offset, id_length, name_offset, name_length, category_offset, category_length,
+         extra_offset, extra_length, flags, _, price, stock) = fields
+        record = ProductRecord(
+            self._string(id_offset, id_length),
+            self._string(name_offset, name_length),
+            self._string(category_offset, category_length),
+            None if flags & PRICE_NONE else (int(price) if flags & PRICE_IS_INT else price),
+            None if flags & STOCK_NONE else stock
+        )
+        if extra_length != NONE:
+            # Extra fields, plus any core field whose value was not of its native type
+            record = record.replace(**json.loads(self._string(extra_offset, extra_length)))
+        return record
+
+    def get(self, product_id: str) -> Optional[ProductRecord]:
+        """Id index probe - O(1), touches only the pages it reads"""
+        key = product_id.encode("utf-8")
+        mask = self._capacity - 1
+        slot = _slot(key, self._capacity)
+        while True:
+            entry = INDEX_SLOT.unpack_from(self._map, self._index + slot * INDEX_SLOT.size)[0]
+            if not entry:
+                return None
+            fields = RECORD.unpack_from(self._map, self._records + (entry - 1) * RECORD.size)
+            if fields[1] == len(key):
+                start = self._heap + fields[0]
+                if self._map[start:start + len(key)] == key:
+                    return self._decode(fields)
+            slot = (slot + 1) & mask
+
+    def products(self) -> List[ProductRecord]:
+        """Decode every record, in file order"""
+        table = memoryview(self._map)[self._records:self._records + self.count * RECORD.size]
+        try:
+            return [self._decode(fields) for fields in RECORD.iter_unpack(table)]
+        finally:
+            table.release()
+
+    def close(self):
+        self._map.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Convert between products.json and catalog snapshots")
+    parser.add_argument("direction", choices=["to-snapshot", "to-json"])
+    parser.add_argument("source")
+    parser.add_argument("target")
+    args = parser.parse_args()
+
+    if args.direction == "to-snapshot":
+        with open(args.source) as f:
+            products = json.load(f).get("products", [])
+        write_snapshot(products, args.target, source_version(args.source))
+        print(f"✅ Wrote {len(products)} products to {args.target}")
+    else:
+        snapshot = CatalogSnapshot(args.source)
+        products = snapshot.products()
+        snapshot.close()
+        with open(args.target, "w") as f:
+            json.dump({"products": products}, f, indent=2, default=json_default)
+        print(f"✅ Wrote {len(products)} products to {args.target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
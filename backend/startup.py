@@ -0,0 +1,41 @@
+"""
+Startup profile
+Marks split process start into named phases (imports, policy loading, caches,
+provider setup, ...), each timed from the previous mark. main.py imports this
+module first and logs the breakdown once the engine is ready - every phase when
+STARTUP_PROFILE=1, otherwise a one-line summary. For a per-module import
+breakdown run `python -X importtime main.py`.
+"""
+import os
+import time
+from typing import Dict, List, Tuple
+
+_origin = time.perf_counter()
+_last = _origin
+_phases: List[Tuple[str, float]] = []
+
+
+def mark(phase: str):
+    """Close the phase that started at the previous mark"""
+    global _last
+    now = time.perf_counter()
+    _phases.append((phase, now - _last))
+    _last = now
+
+
+def profile() -> Dict:
+    return {
+        "total_ms": round((_last - _origin) * 1000, 1),
+        "phases": [{"phase": phase, "ms": round(seconds * 1000, 1)} for phase, seconds in _phases]
+    }
+
+
+def report(log):
+    """Log the startup breakdown"""
+    total = _last - _origin
+    imports = sum(seconds for phase, seconds in _phases if phase.startswith("import"))
+    log.info("⏱️ Startup took %.0fms (imports %.0fms, initialization %.0fms)",
+             total * 1000, imports * 1000, (total - imports) * 1000)
+    if os.getenv("STARTUP_PROFILE", "").lower() in ("1", "true", "yes"):
+        for phase, seconds in _phases:
+            log.info("⏱️   %-28s %7.1fms", phase, seconds * 1000)
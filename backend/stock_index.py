@@ -0,0 +1,140 @@
+"""
+Stock level index and low-stock alerts
+Tiers come from business_rules.product_management.stock_thresholds. The index is
+a stock-sorted permutation of the catalog, so "stock below X" is a binary search
+plus a slice (O(log n + k)); the alert feed records every mutation that moves a
+product from one tier to another.
+"""
+import bisect
+import itertools
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from columnar import ProductColumns
+from logs import get_logger
+
+log = get_logger("stock")
+
+DEFAULT_THRESHOLDS = {"critical_stock": 5, "low_stock": 20}
+
+
+class StockTiers:
+    """Policy-driven stock tiers: a product is in the first tier whose threshold its stock is below"""
+
+    def __init__(self, stock_thresholds: Optional[Dict] = None):
+        thresholds = stock_thresholds or DEFAULT_THRESHOLDS
+        tiers = sorted(
+            (int(value), key[:-len("_stock")])
+            for key, value in thresholds.items()
+            if key.endswith("_stock") and key != "max_stock" and isinstance(value, (int, float))
+        )
+        self.thresholds = [threshold for threshold, _ in tiers]
+        self.names = [name for _, name in tiers]
+
+    def threshold(self, tier: str) -> Optional[int]:
+        return self.thresholds[self.names.index(tier)] if tier in self.names else None
+
+    @property
+    def low_stock(self) -> int:
+        """Threshold below which a product counts as low stock (the highest tier)"""
+        return self.thresholds[-1] if self.thresholds else 0
+
+    def tier(self, stock) -> str:
+        if stock is None:
+            return "ok"
+        position = bisect.bisect_right(self.thresholds, stock)
+        return self.names[position] if position < len(self.names) else "ok"
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(zip(self.names, self.thresholds))
+
+
+class StockIndex:
+    """Stock-sorted view of one catalog version; built once per version with a vectorized argsort"""
+
+    def __init__(self, columns: ProductColumns):
+        self.columns = columns
+        self._order = np.argsort(columns.stock, kind="stable")
+        self._sorted = columns.stock[self._order]
+
+    def below(self, threshold: int) -> List:
+        """Products with stock < threshold, lowest stock first"""
+        end = int(np.searchsorted(self._sorted, threshold, side="left"))
+        return [self.columns.source[i] for i in self._order[:end].tolist()]
+
+    def between(self, low: int, high: int) -> List:
+        """Products with low <= stock < high, lowest stock first"""
+        start = int(np.searchsorted(self._sorted, low, side="left"))
+        end = int(np.searchsorted(self._sorted, high, side="left"))
+        return [self.columns.source[i] for i in self._order[start:max(start, end)].tolist()]
+
+    def count_below(self, threshold: int) -> int:
+        return int(np.searchsorted(self._sorted, threshold, side="left"))
+
+    def tier_counts(self, tiers: StockTiers) -> Dict[str, int]:
+        """Products per tier (tiers are exclusive: a critical product is not also counted as low)"""
+        counts = {}
+        previous = 0
+        for name, threshold in zip(tiers.names, tiers.thresholds):
+            below = self.count_below(threshold)
+            counts[name] = below - previous
+            previous = below
+        counts["ok"] = len(self._sorted) - previous
+        return counts
+
+
+class StockAlertFeed:
+    """In-process change feed of tier crossings, with sequence numbers for catch-up reads"""
+
+    def __init__(self, tiers: StockTiers, max_events: int = 1000):
+        self.tiers = tiers
+        self._events = deque(maxlen=max_events)
+        self._sequence = itertools.count(1)
+        self._listeners: List[Callable[[Dict], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, listener: Callable[[Dict], None]):
+        """listener(event) is called from the committing thread for every new event"""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[Dict], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def publish(self, changes: List[Tuple[Optional[Dict], Optional[Dict]]], timestamp: str) -> List[Dict]:
+        """Turn committed (before, after) product pairs into tier-crossing events"""
+        events = []
+        for before, after in changes:
+            old_tier = self.tiers.tier(before.get("stock")) if before is not None else None
+            new_tier = self.tiers.tier(after.get("stock")) if after is not None else None
+            if old_tier == new_tier or (old_tier in (None, "ok") and new_tier in (None, "ok")):
+                continue
+            product = after if after is not None else before
+            events.append({
+                "product_id": product.get("id"),
+                "name": product.get("name"),
+                "category": product.get("category"),
+                "from_tier": old_tier,
+                "to_tier": new_tier,
+                "stock": after.get("stock") if after is not None else None,
+                "timestamp": timestamp
+            })
+
+        with self._lock:
+            for event in events:
+                event["sequence"] = next(self._sequence)
+                self._events.append(event)
+        for event in events:
+            for listener in list(self._listeners):
+                try:
+                    listener(event)
+                except Exception as e:
+                    log.warning("⚠️ Stock alert listener failed: %s", e)
+        return events
+
+    def events_since(self, sequence: int = 0, limit: int = 100) -> List[Dict]:
+        with self._lock:
+            return [event for event in self._events if event["sequence"] > sequence][-limit:]
@@ -1,9 +1,206 @@
 """
 Simple JSON file storage - no database needed for AI Runtime Engine Demo
 """
+import asyncio
+import functools
 import json
 import os
-from typing import List, Dict, Optional
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+
+from change_feed import ProductChangeFeed
+from columnar import ProductColumns
+from logs import get_logger
+from metrics import stage
+from records import ProductRecord, json_default, product_object_hook
+from snapshot import CatalogSnapshot, write_snapshot
+from stock_index import StockAlertFeed, StockIndex, StockTiers
+
+try:
+    import fcntl
+except ImportError:  # Windows - single-process only
+    fcntl = None
+
+log = get_logger("storage")
+
+class _Catalog:
+    """Working copy of the product list for one commit, with an id index built on demand"""
+    
+    def __init__(self, products: List[Dict]):
+        self._products = list(products)
+        self._index = None
+        self._max_id = None
+        self._deleted = 0
+        self.changed = False
+        self.changes = []  # (before, after) per applied mutation - feeds stock alerts and the change feed
+        self._undo = []  # one callable per edit, newest last - rolls a failed mutation back
+    
+    def _positions(self) -> Dict[str, int]:
+        if self._index is None:
+            self._index = {p.get('id'): i for i, p in enumerate(self._products) if p is not None}
+        return self._index
+    
+    def __contains__(self, product_id) -> bool:
+        return product_id is not None and product_id in self._positions()
+    
+    def _next_id(self) -> str:
+        """Next "p<N>" id - the max is scanned once per commit, not once per add"""
+        if self._max_id is None:
+            self._max_id = 0
+            for p in self._products:
+                if p is not None and str(p.get('id', '')).startswith('p'):
+                    try:
+                        self._max_id = max(self._max_id, int(p['id'][1:]))
+                    except ValueError:
+                        pass
+        self._max_id += 1
+        return f"p{self._max_id}"
+    
+    def add(self, product: Dict) -> bool:
+        """Add a product (the caller's dict gets its generated id); stored as a compact record"""
+        # Generate ID if not provided
+        if 'id' not in product:
+            product['id'] = self._next_id()
+        elif self._max_id is not None and str(product['id']).startswith('p'):
+            try:
+                self._max_id = max(self._max_id, int(product['id'][1:]))
+            except ValueError:
+                pass
+        record = ProductRecord.from_dict(product)
+        self._products.append(record)
+        self._undo.append(self._undo_add)
+        if self._index is not None:
+            self._index[product['id']] = len(self._products) - 1
+        self.changes.append((None, record))
+        self.changed = True
+        return True
+    
+    def update(self, product_id: str, updates: Dict) -> bool:
+        position = self._positions().get(product_id)
+        if position is None:
+            return False  # Product not found
+        # Records are immutable - the cached list may be in use by concurrent readers
+        before = self._products[position]
+        self._products[position] = before.replace(**updates)
+        self._undo.append(lambda: self._products.__setitem__(position, before))
+        self.changes.append((before, self._products[position]))
+        self.changed = True
+        return True
+    
+    def upsert(self, product: Dict) -> bool:
+        """Update the product with this id if it exists, add it otherwise"""
+        if product.get('id') is not None and product['id'] in self._positions():
+            return self.update(product['id'], product)
+        return self.add(product)
+    
+    def delete(self, product_id: str) -> bool:
+        position = self._positions().pop(product_id, None)
+        if position is None:
+            return False  # Product not found
+        record = self._products[position]
+        self._products[position] = None
+        self._deleted += 1
+        self._undo.append(lambda: self._undo_delete(position, record))
+        self.changes.append((record, None))
+        self.changed = True
+        return True
+    
+    def _undo_add(self):
+        self._products.pop()
+        self._max_id = None  # rescanned on the next generated id
+    
+    def _undo_delete(self, position: int, record):
+        self._products[position] = record
+        self._deleted -= 1
+    
+    def savepoint(self) -> Tuple[int, int]:
+        return len(self._undo), len(self.changes)
+    
+    def rollback(self, savepoint: Tuple[int, int]):
+        """Undo every edit made since the savepoint"""
+        undo_count, change_count = savepoint
+        while len(self._undo) > undo_count:
+            self._undo.pop()()
+        self._index = None  # rebuilt on demand from the restored list
+        del self.changes[change_count:]
+        self.changed = bool(self.changes)
+    
+    def products(self) -> List[Dict]:
+        if not self._deleted:
+            return self._products
+        return [p for p in self._products if p is not None]
+
+
+class GroupCommitWriter:
+    """
+    Group commit for product mutations.
+    Mutations arriving within window_ms (or until max_batch are queued) are applied
+    together and flushed with a single write; every caller's await resolves only
+    after the write holding its mutation has been fsynced and renamed into place.
+    """
+    
+    def __init__(self, storage: "JSONStorage", window_ms: float = 2.0, max_batch: int = 512):
+        self.storage = storage
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self.stats = {"commits": 0, "mutations": 0}
+        self._batches = {}
+        self._flushes = set()  # the loop only keeps weak references to tasks
+    
+    def configure(self, window_ms: float, max_batch: int):
+        self.window_ms = window_ms
+        self.max_batch = max(1, max_batch)
+    
+    async def submit(self, mutation) -> bool:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        batch = self._batches.get(loop)
+        if batch is None:
+            # First mutation of a new batch: it schedules the flush for everyone that joins
+            batch = self._batches[loop] = {"items": [], "full": asyncio.Event()}
+            flush = loop.create_task(self._flush(loop, batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+        batch["items"].append((mutation, future))
+        if len(batch["items"]) >= self.max_batch:
+            batch["full"].set()
+        
+        return await future
+    
+    async def _flush(self, loop, batch: Dict):
+        try:
+            await asyncio.wait_for(batch["full"].wait(), self.window_ms / 1000)
+        except asyncio.TimeoutError:
+            pass
+        
+        # Close the batch; later mutations start the next one while this one is written
+        if self._batches.get(loop) is batch:
+            del self._batches[loop]
+        items = batch["items"]
+        
+        async with self.storage._async_lock():
+            try:
+                results = await loop.run_in_executor(
+                    None, functools.partial(self.storage._commit, [mutation for mutation, _ in items])
+                )
+            except Exception as e:
+                log.error("Error committing %d product mutations: %s", len(items), e)
+                results = [False] * len(items)
+        
+        self.stats["commits"] += 1
+        self.stats["mutations"] += len(items)
+        for (_, future), result in zip(items, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                log.error("Error applying product mutation: %s", result)
+                result = False
+            future.set_result(result)
+
 
 class JSONStorage:
     """Simple JSON file storage - no database needed"""
@@ -12,6 +209,113 @@ class JSONStorage:
         self.data_dir = data_dir
         self.users_file = os.path.join(data_dir, "users.json")
         self.products_file = os.path.join(data_dir, "products.json")
+        self.lock_file = os.path.join(data_dir, ".products.lock")
+        # Optional memory-mapped snapshot - used (and kept current by writers) when the file exists
+        self.snapshot_file = os.path.join(data_dir, "products.snap")
+        self._snapshot = None
+        
+        # Writers: thread lock within the process, OS file lock across processes,
+        # and an asyncio lock so waiting coroutines queue without holding threads
+        self._thread_lock = threading.RLock()
+        self._async_locks = {}
+        self.group_commit = GroupCommitWriter(self)
+        
+        # Readers never lock: parsed products are cached under the file's version
+        self._products_snapshot = (None, [])
+        self._columns = ProductColumns([])
+        self._stock_index = StockIndex(self._columns)
+        
+        # Policy-driven stock tiers and the feed of tier-crossing events (set by the engine)
+        self.stock_tiers = StockTiers()
+        self.stock_alerts = StockAlertFeed(self.stock_tiers)
+        # Every commit's product and category-aggregate deltas, for live UIs
+        self.change_feed = ProductChangeFeed(self.stock_tiers)
+    
+    @contextmanager
+    def _writer_lock(self):
+        """
+        Exclusive writer lock - the single writer across all threads and worker processes.
+        Every read-modify-write of products.json happens while holding it.
+        """
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_file, 'a') as lock:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+    
+    def _async_lock(self) -> asyncio.Lock:
+        """Writer lock for coroutines on the running event loop"""
+        loop = asyncio.get_running_loop()
+        lock = self._async_locks.get(loop)
+        if lock is None:
+            lock = self._async_locks[loop] = asyncio.Lock()
+        return lock
+    
+    def _write_products(self, products: List[Dict]):
+        """Atomic commit: write a temp file, fsync it, then rename it over products.json"""
+        fd, temp_path = tempfile.mkstemp(dir=self.data_dir, prefix=".products.", suffix=".tmp")
+        try:
+            # Keep the permissions of the file being replaced (mkstemp creates 0600)
+            try:
+                os.fchmod(fd, os.stat(self.products_file).st_mode & 0o777)
+            except (FileNotFoundError, AttributeError):
+                pass
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'products': products}, f, indent=2, default=json_default)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.products_file)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        
+        # Rebuild the snapshot for the new version; until then readers see it as stale
+        if os.path.exists(self.snapshot_file):
+            try:
+                write_snapshot(products, self.snapshot_file, self._file_version(self.products_file))
+            except OSError as e:
+                log.warning("⚠️ Could not refresh catalog snapshot: %s", e)
+        
+        # Persist the rename itself
+        if hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(self.data_dir, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+    
+    def _file_version(self, path: str):
+        try:
+            stat = os.stat(path)
+            return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+    
+    def _fresh_snapshot(self, version) -> Optional[CatalogSnapshot]:
+        """The mapped snapshot, if one exists and was built from this products.json version"""
+        identity = self._file_version(self.snapshot_file)
+        if identity is None or version is None:
+            return None
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.identity != identity:
+            try:
+                snapshot = self._snapshot = CatalogSnapshot(self.snapshot_file)
+            except (OSError, ValueError) as e:
+                log.warning("⚠️ Ignoring catalog snapshot: %s", e)
+                return None
+        return snapshot if snapshot.is_fresh(version) else None
+    
+    def get_version(self) -> Tuple:
+        """Version token of the stored data - changes whenever any process writes it"""
+        return (self._file_version(self.products_file), self._file_version(self.users_file))
     
     def get_users(self) -> List[Dict]:
         """Get all users from JSON file"""
@@ -30,100 +334,173 @@ class JSONStorage:
                 return user
         return None
     
-    def get_products(self) -> List[Dict]:
-        """Get all products from JSON file"""
-        try:
-            with open(self.products_file, 'r') as f:
-                data = json.load(f)
-                return data.get('products', [])
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+    def get_products(self) -> List[ProductRecord]:
+        """
+        Get all products from JSON file, as immutable ProductRecords.
+        Lock-free: commits are atomic renames, so a reader always sees a complete file.
+        The parsed list is reused while the file version is unchanged - treat it as read-only.
+        """
+        with stage("storage_read"):
+            return self._read_products()
+    
+    def _read_products(self) -> List[ProductRecord]:
+        for _ in range(3):
+            version = self._file_version(self.products_file)
+            cached_version, cached_products = self._products_snapshot
+            if version is not None and version == cached_version:
+                return cached_products
+            snapshot = self._fresh_snapshot(version)
+            if snapshot is not None:
+                products = snapshot.products()
+            else:
+                try:
+                    with open(self.products_file, 'r') as f:
+                        # Product objects become compact records as they are parsed
+                        products = json.load(f, object_hook=product_object_hook).get('products', [])
+                except (FileNotFoundError, json.JSONDecodeError):
+                    return []
+            
+            # Optimistic check: only cache if no commit landed while we were parsing
+            if self._file_version(self.products_file) == version:
+                self._products_snapshot = (version, products)
+                return products
+        return products
     
-    def get_product_by_id(self, product_id: str) -> Optional[Dict]:
-        """Get product by ID"""
+    def get_columns(self) -> ProductColumns:
+        """Columnar view of the current products - rebuilt only when the product list changes"""
+        products = self.get_products()
+        columns = self._columns
+        if columns.source is not products:
+            columns = self._columns = ProductColumns(products)
+        return columns
+    
+    def get_stock_index(self) -> StockIndex:
+        """Stock-sorted index of the current products - rebuilt only when the product list changes"""
+        columns = self.get_columns()
+        index = self._stock_index
+        if index.columns is not columns:
+            index = self._stock_index = StockIndex(columns)
+        return index
+    
+    def is_current(self) -> bool:
+        """Whether the parsed products and every view built on them match products.json (one stat, no read)"""
+        version, products = self._products_snapshot
+        return self._file_version(self.products_file) == version and self._stock_index.columns.source is products
+    
+    def refresh(self) -> ProductColumns:
+        """Re-read a changed products.json and rebuild its columnar view, stock index and group codes"""
+        columns = self.get_stock_index().columns
+        columns.codes(self.change_feed.group_by_field)
+        return columns
+    
+    def configure_stock_tiers(self, stock_thresholds: Dict):
+        self.stock_tiers = StockTiers(stock_thresholds)
+        self.stock_alerts.tiers = self.stock_tiers
+        self.change_feed.tiers = self.stock_tiers
+    
+    def get_product_by_id(self, product_id: str) -> Optional[ProductRecord]:
+        """Get product by ID - an index probe when a fresh snapshot is mapped"""
+        snapshot = self._fresh_snapshot(self._file_version(self.products_file))
+        if snapshot is not None:
+            return snapshot.get(product_id)
         products = self.get_products()
         for product in products:
             if product.get('id') == product_id:
                 return product
         return None
     
-    def add_product(self, product: Dict) -> bool:
-        """Add new product to JSON file"""
+    def _commit(self, mutations: List) -> List:
+        """
+        Apply mutations to a working copy of the catalog and make them durable with ONE write.
+        Returns one result per mutation (an Exception instance if that mutation failed).
+        """
+        with self._writer_lock():
+            catalog = _Catalog(self.get_products())
+            results = []
+            for mutation in mutations:
+                savepoint = catalog.savepoint()
+                try:
+                    results.append(mutation(catalog))
+                except Exception as e:
+                    # A failed mutation leaves nothing behind, not even the edits it made before raising
+                    catalog.rollback(savepoint)
+                    results.append(e)
+            if catalog.changed:
+                products = catalog.products()
+                self._write_products(products)
+                # Readers in this process start from the list just written instead of re-parsing it
+                self._products_snapshot = (self._file_version(self.products_file), products)
+                timestamp = datetime.now().isoformat()
+                self.stock_alerts.publish(catalog.changes, timestamp)
+                self.change_feed.publish(catalog.changes, timestamp)
+            return results
+    
+    def _commit_one(self, mutation, action: str) -> bool:
         try:
-            products = self.get_products()
-            
-            # Generate ID if not provided
-            if 'id' not in product:
-                max_id = 0
-                for p in products:
-                    if p['id'].startswith('p'):
-                        try:
-                            num = int(p['id'][1:])
-                            max_id = max(max_id, num)
-                        except:
-                            pass
-                product['id'] = f"p{max_id + 1}"
-            
-            products.append(product)
-            
-            with open(self.products_file, 'w') as f:
-                json.dump({'products': products}, f, indent=2)
-            return True
+            result = self._commit([mutation])[0]
+            if isinstance(result, Exception):
+                raise result
+            return result
         except Exception as e:
-            print(f"Error adding product: {e}")
+            log.error("Error %s product: %s", action, e)
             return False
     
+    def add_product(self, product: Dict) -> bool:
+        """Add new product to JSON file"""
+        return self._commit_one(lambda catalog: catalog.add(product), "adding")
+    
     def update_product(self, product_id: str, updates: Dict) -> bool:
         """Update existing product"""
-        try:
-            products = self.get_products()
-            
-            for i, product in enumerate(products):
-                if product.get('id') == product_id:
-                    products[i].update(updates)
-                    
-                    with open(self.products_file, 'w') as f:
-                        json.dump({'products': products}, f, indent=2)
-                    return True
-            
-            return False  # Product not found
-        except Exception as e:
-            print(f"Error updating product: {e}")
-            return False
+        return self._commit_one(lambda catalog: catalog.update(product_id, updates), "updating")
     
     def delete_product(self, product_id: str) -> bool:
         """Delete product from JSON file"""
-        try:
-            products = self.get_products()
-            original_count = len(products)
-            
-            # Filter out the product to delete
-            updated_products = [p for p in products if p.get('id') != product_id]
-            
-            if len(updated_products) < original_count:
-                with open(self.products_file, 'w') as f:
-                    json.dump({'products': updated_products}, f, indent=2)
-                return True
-            
-            return False  # Product not found
-        except Exception as e:
-            print(f"Error deleting product: {e}")
-            return False
+        return self._commit_one(lambda catalog: catalog.delete(product_id), "deleting")
+    
+    async def add_product_async(self, product: Dict) -> bool:
+        """add_product via group commit - resolves once the batch holding it is durable"""
+        return await self.group_commit.submit(lambda catalog: catalog.add(product))
+    
+    async def upsert_products_async(self, products: List[Dict], allow_update: bool = True,
+                                    atomic: bool = False) -> Optional[List[int]]:
+        """
+        Bulk add/update as ONE mutation - all rows land in the same durable write.
+        Without allow_update, rows whose id is already in the catalog at commit time are
+        skipped (atomic: nothing is written if any is). Returns the indices of the skipped
+        rows, or None if the write failed.
+        """
+        def upsert_all(catalog: _Catalog) -> List[int]:
+            skipped = [] if allow_update else [index for index, product in enumerate(products) if product.get('id') in catalog]
+            if atomic and skipped:
+                return skipped
+            skip = set(skipped)
+            for index, product in enumerate(products):
+                if index not in skip:
+                    catalog.upsert(product)
+            return skipped
+        result = await self.group_commit.submit(upsert_all)
+        return None if result is False else result
+    
+    async def update_product_async(self, product_id: str, updates: Dict) -> bool:
+        """update_product via group commit"""
+        return await self.group_commit.submit(lambda catalog: catalog.update(product_id, updates))
+    
+    async def delete_product_async(self, product_id: str) -> bool:
+        """delete_product via group commit"""
+        return await self.group_commit.submit(lambda catalog: catalog.delete(product_id))
     
     def get_stats(self) -> Dict:
-        """Get storage statistics"""
-        products = self.get_products()
+        """Get storage statistics (vectorized over the columnar product view)"""
+        columns = self.get_columns()
         users = self.get_users()
         
-        # Ensure price and stock are numbers (convert from string if needed)
-        total_value = sum(float(p.get('price', 0)) * int(p.get('stock', 0)) for p in products)
-        low_stock_items = [p for p in products if int(p.get('stock', 0)) < 20]
+        low_stock_items = self.get_stock_index().below(self.stock_tiers.low_stock)
         
         return {
-            "total_products": len(products),
+            "total_products": columns.count,
             "total_users": len(users),
-            "total_inventory_value": total_value,
+            "total_inventory_value": columns.inventory_value(),
             "low_stock_count": len(low_stock_items),
             "low_stock_items": low_stock_items,
-            "categories": list(set(p.get('category', 'Unknown') for p in products))
+            "categories": columns.codes("category")[1]
         }
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Request tracing for the AI Runtime Engine
+main.py starts a trace per request (request ID from X-Request-ID or generated);
+the trace follows the request through the engine in a context variable, and every
+timed stage (provider call, storage read/write, handler, UI generation, ...)
+records a span on it. Finished traces can be summarized as a Server-Timing header,
+and the slowest N are kept in memory for /debug/traces.
+"""
+import contextvars
+import heapq
+import itertools
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Spans kept per trace - bounds memory for requests that touch storage many times
+MAX_SPANS = 200
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("current_trace", default=None)
+
+
+class Trace:
+    """Timing record of one request: spans are (name, start offset, duration) in seconds"""
+
+    __slots__ = ("request_id", "method", "path", "role", "action", "status", "started_at",
+                 "_start", "duration", "spans", "dropped_spans")
+
+    def __init__(self, request_id: str, method: str, path: str, role: str):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.role = role
+        self.action = None
+        self.status = None
+        self.started_at = datetime.now().isoformat()
+        self._start = time.perf_counter()
+        self.duration = None
+        self.spans = []
+        self.dropped_spans = 0
+
+    def add_span(self, name: str, start: float, duration: float):
+        if len(self.spans) < MAX_SPANS:
+            self.spans.append((name, start - self._start, duration))
+        else:
+            self.dropped_spans += 1
+
+    def finish(self, status: int):
+        self.status = status
+        self.duration = time.perf_counter() - self._start
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: total time per span name, plus the whole request"""
+        totals = {}
+        for name, _, duration in self.spans:
+            totals[name] = totals.get(name, 0.0) + duration
+        entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in totals.items()]
+        total = self.duration if self.duration is not None else time.perf_counter() - self._start
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+    def to_dict(self) -> Dict:
+        return {
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "role": self.role,
+            "action": self.action,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+            "spans": [
+                {"name": name, "start_ms": round(offset * 1000, 3), "duration_ms": round(duration * 1000, 3)}
+                for name, offset, duration in sorted(self.spans, key=lambda span: span[1])
+            ],
+            "dropped_spans": self.dropped_spans
+        }
+
+
+class SlowTraceBuffer:
+    """The N slowest finished traces (a min-heap on duration)"""
+
+    def __init__(self, size: int = 50):
+        self.size = size
+        self._heap = []
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, trace: Trace):
+        if self.size <= 0:
+            return
+        entry = (trace.duration, next(self._order), trace)
+        with self._lock:
+            if len(self._heap) < self.size:
+                heapq.heappush(self._heap, entry)
+            elif entry[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+
+    def slowest(self, limit: Optional[int] = None) -> List[Trace]:
+        with self._lock:
+            traces = [trace for _, _, trace in sorted(self._heap, reverse=True)]
+        return traces[:limit] if limit else traces
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+
+
+def request_id_from(header_value: Optional[str]) -> str:
+    """Caller-supplied X-Request-ID if it is a sane token, a new ID otherwise"""
+    if header_value and _REQUEST_ID.match(header_value):
+        return header_value
+    return uuid.uuid4().hex
+
+
+def start_trace(request_id: str, method: str, path: str, role: str) -> Trace:
+    trace = Trace(request_id, method, path, role)
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_request_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.request_id if trace is not None else None
+
+
+def record_span(name: str, start: float, duration: float):
+    """Add a span to the current request's trace, if it is being traced"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_span(name, start, duration)
@@ -0,0 +1,286 @@
+"""
+Product validation compiled from POLICIES/business_rules.yaml
+The rules are turned into a check plan once when policies load. Single payloads
+take a plain Python path; bulk operations check prices and stocks as NumPy arrays.
+"""
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_REQUIRED_FIELDS = ["name", "category", "price", "stock"]
+
+ID_MESSAGE = "Product id must be a non-empty string"
+
+# Names may contain letters, digits, spaces and common punctuation when special characters are not allowed
+SPECIAL_CHARACTER = re.compile(r"[^\w\s.,&()'/+#-]")
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _to_number(value):
+    """Coerce a numeric field; None if it is not a finite number"""
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _to_whole_number(value):
+    """Integral values become int; fractional ones stay float so the stock check rejects them"""
+    number = _to_number(value)
+    return int(number) if number is not None and number.is_integer() else number
+
+
+class ProductValidator:
+    """Check plan for product payloads built from business_rules.product_management"""
+
+    def __init__(self, business_rules: Dict):
+        rules = business_rules.get("product_management", {})
+        price_rules = rules.get("price_rules", {})
+        stock_rules = rules.get("stock_thresholds", {})
+        category_rules = rules.get("category_rules", {})
+        field_rules = rules.get("validation_rules", {})
+
+        self.required_fields = list(field_rules.get("required_fields", DEFAULT_REQUIRED_FIELDS))
+        self.min_price = float(price_rules.get("min_price", 0.01))
+        self.max_price = float(price_rules.get("max_price", 1e9))
+        self.decimal_places = price_rules.get("decimal_places")
+        self.max_stock = int(stock_rules.get("max_stock", 2**31 - 1))
+        self.name_min_length = int(field_rules.get("name_min_length", 1))
+        self.name_max_length = int(field_rules.get("name_max_length", 1000))
+        self.plain_names_only = field_rules.get("special_characters_allowed", True) is False
+
+        # Allowed categories resolve to their canonical spelling
+        allowed = category_rules.get("allowed_categories") or []
+        self.case_sensitive = category_rules.get("case_sensitive", True)
+        self.allowed_categories = list(allowed)
+        self._categories = {self._category_key(category): category for category in allowed}
+
+    def _category_key(self, category: str) -> str:
+        return category if self.case_sensitive else category.casefold()
+
+    def normalize(self, data: Dict) -> Dict:
+        """Copy with numeric fields coerced and the category in its canonical spelling"""
+        product = dict(data)
+        for field, cast in (("price", _to_number), ("stock", _to_whole_number)):
+            if field in product and not _is_missing(product[field]):
+                number = cast(product[field])
+                if number is not None:
+                    product[field] = number
+        category = product.get("category")
+        if isinstance(category, str) and self._categories:
+            product["category"] = self._categories.get(self._category_key(category.strip()), category)
+        return product
+
+    def validate(self, data: Dict) -> Dict:
+        """Single-record path; on success the result carries the normalized product"""
+        product = self.normalize(data)
+
+        missing_fields = [field for field in self.required_fields if _is_missing(product.get(field))]
+        if missing_fields:
+            return {
+                "valid": False,
+                "message": f"Missing required fields: {', '.join(missing_fields)}",
+                "details": {"missing_fields": missing_fields, "required_fields": self.required_fields}
+            }
+
+        error = (self._check_id(product)
+                 or self._check_name(product.get("name"))
+                 or self._check_category(product.get("category"))
+                 or self._check_price(product.get("price"))
+                 or self._check_stock(product.get("stock")))
+        if error:
+            field, message = error
+            return {
+                "valid": False,
+                "message": message,
+                "details": {"invalid_field": field, "value": data.get(field)}
+            }
+
+        return {
+            "valid": True,
+            "message": "Product data is valid",
+            "ai_assessment": "All business rules satisfied",
+            "product": product
+        }
+
+    def validate_batch(self, rows: List[Dict]) -> Tuple[List[Dict], List[Tuple[int, str]]]:
+        """
+        Columnar path for bulk operations - every rule runs once over a whole column.
+        Returns the rows (normalized where valid, as given otherwise) and (index, message)
+        for every invalid row, with the same message the single-record path would give.
+        """
+        count = len(rows)
+        failed = np.zeros(count, dtype=bool)
+        messages = {}
+
+        def flag(mask: np.ndarray, message):
+            new = mask & ~failed
+            for index in np.flatnonzero(new).tolist():
+                messages[index] = message(index) if callable(message) else message
+            failed[new] = True
+
+        columns = {field: [row.get(field) for row in rows] for field in set(self.required_fields) | {"name", "category"}}
+        prices, price_not_number = _numeric_column([row.get("price") for row in rows])
+        stocks, stock_not_number = _numeric_column([row.get("stock") for row in rows])
+
+        # Ids: optional (one is generated), but a given id must be a non-empty string
+        flag(np.fromiter((self._check_id(row) is not None for row in rows), dtype=bool, count=count), ID_MESSAGE)
+
+        # Required fields
+        missing = {}
+        for field in self.required_fields:
+            if field == "price":
+                missing[field] = np.isnan(prices) & ~price_not_number
+            elif field == "stock":
+                missing[field] = np.isnan(stocks) & ~stock_not_number
+            else:
+                missing[field] = np.fromiter(map(_is_missing, columns[field]), dtype=bool, count=count)
+        if missing:
+            flag(np.logical_or.reduce(list(missing.values())), lambda index: "Missing required fields: " + ", ".join(
+                field for field in self.required_fields if missing[field][index]))
+
+        # Names: type, length, and one regex pass over all names joined together
+        names = columns["name"]
+        lengths = np.fromiter((len(name) if isinstance(name, str) else -1 for name in names), dtype=np.int64, count=count)
+        present = np.fromiter((name is not None for name in names), dtype=bool, count=count)
+        flag(present & (lengths < 0), "Name must be text")
+        flag(present & ((lengths < self.name_min_length) | (lengths > self.name_max_length)),
+             f"Name must be {self.name_min_length}-{self.name_max_length} characters")
+        if self.plain_names_only and count:
+            starts = np.concatenate(([0], np.cumsum(np.maximum(lengths, 0) + 1)[:-1]))
+            joined = "\n".join(name if isinstance(name, str) else "" for name in names)
+            positions = [match.start() for match in SPECIAL_CHARACTER.finditer(joined)]
+            special = np.zeros(count, dtype=bool)
+            special[np.searchsorted(starts, positions, side="right") - 1] = True
+            flag(special, "Name contains special characters")
+
+        # Categories: each distinct spelling is resolved once
+        categories = columns["category"]
+        resolved = categories
+        if self._categories:
+            canonical = {
+                value: self._categories.get(self._category_key(value.strip()))
+                for value in {category for category in categories if isinstance(category, str)}
+            }
+            resolved = [canonical.get(category) if isinstance(category, str) else None for category in categories]
+            unknown = np.fromiter(
+                (value is None and category is not None for value, category in zip(resolved, categories)),
+                dtype=bool, count=count
+            )
+            flag(unknown, f"Category must be one of: {', '.join(self.allowed_categories)}")
+
+        for mask, message in self._numeric_checks(prices, stocks, price_not_number, stock_not_number):
+            flag(mask, message)
+
+        # Normalized copies of the valid rows
+        products = list(rows)
+        price_values = prices.tolist()
+        stock_values = stocks.tolist()
+        for index in np.flatnonzero(~failed).tolist():
+            product = dict(rows[index])
+            if "price" in product and product["price"] is not None:
+                product["price"] = price_values[index]
+            if "stock" in product and product["stock"] is not None:
+                product["stock"] = int(stock_values[index])
+            if resolved[index] is not None:
+                product["category"] = resolved[index]
+            products[index] = product
+
+        return products, sorted(messages.items())
+
+    def _numeric_checks(self, prices: np.ndarray, stocks: np.ndarray,
+                        price_not_number: np.ndarray, stock_not_number: np.ndarray):
+        """(row mask, message) per numeric rule, in single-record check order"""
+        price_present = ~np.isnan(prices)
+        stock_present = ~np.isnan(stocks)
+        with np.errstate(invalid="ignore"):
+            checks = [
+                (price_not_number, "price must be a number"),
+                (price_present & ((prices < self.min_price) | (prices > self.max_price)), self._price_range_message()),
+            ]
+            if self.decimal_places is not None:
+                scaled = prices * 10 ** int(self.decimal_places)
+                checks.append((price_present & ~np.isclose(scaled, np.round(scaled)), self._decimal_message()))
+            checks += [
+                (stock_not_number | (stock_present & (stocks != np.floor(stocks))), "stock must be a whole number"),
+                (stock_present & ((stocks < 0) | (stocks > self.max_stock)), self._stock_range_message()),
+            ]
+        return checks
+
+    def _check_id(self, product: Dict) -> Optional[Tuple[str, str]]:
+        if "id" in product and (not isinstance(product["id"], str) or _is_missing(product["id"])):
+            return "id", ID_MESSAGE
+        return None
+
+    def _check_name(self, name) -> Optional[Tuple[str, str]]:
+        if name is None:
+            return None
+        if not isinstance(name, str):
+            return "name", "Name must be text"
+        if not self.name_min_length <= len(name) <= self.name_max_length:
+            return "name", f"Name must be {self.name_min_length}-{self.name_max_length} characters"
+        if self.plain_names_only and SPECIAL_CHARACTER.search(name):
+            return "name", "Name contains special characters"
+        return None
+
+    def _check_category(self, category) -> Optional[Tuple[str, str]]:
+        if category is None or not self._categories:
+            return None
+        if not isinstance(category, str) or self._category_key(category) not in self._categories:
+            return "category", f"Category must be one of: {', '.join(self.allowed_categories)}"
+        return None
+
+    def _check_price(self, price) -> Optional[Tuple[str, str]]:
+        if price is None:
+            return None
+        if isinstance(price, bool) or not isinstance(price, (int, float)) or not math.isfinite(price):
+            return "price", "price must be a number"
+        if not self.min_price <= price <= self.max_price:
+            return "price", self._price_range_message()
+        if self.decimal_places is not None and not math.isclose(price * 10 ** int(self.decimal_places),
+                                                                round(price * 10 ** int(self.decimal_places))):
+            return "price", self._decimal_message()
+        return None
+
+    def _check_stock(self, stock) -> Optional[Tuple[str, str]]:
+        if stock is None:
+            return None
+        if isinstance(stock, bool) or not isinstance(stock, int):
+            return "stock", "stock must be a whole number"
+        if not 0 <= stock <= self.max_stock:
+            return "stock", self._stock_range_message()
+        return None
+
+    def _price_range_message(self) -> str:
+        return f"Price must be between {self.min_price} and {self.max_price}"
+
+    def _stock_range_message(self) -> str:
+        return f"Stock must be between 0 and {self.max_stock}"
+
+    def _decimal_message(self) -> str:
+        return f"Price allows at most {self.decimal_places} decimal places"
+
+
+def _numeric_column(values: List) -> Tuple[np.ndarray, np.ndarray]:
+    """Float column with NaN where a value is absent or not a number, plus a mask of the not-a-number rows"""
+    try:
+        # Fast path: numbers, numeric strings and None convert in one C loop (booleans are not numbers)
+        if any(value is True or value is False for value in values):
+            raise TypeError("boolean in numeric column")
+        column = np.array(values, dtype=np.float64)
+    except (ValueError, TypeError):
+        column = np.array([None if _is_missing(value) else _to_number(value) for value in values], dtype=np.float64)
+    column[~np.isfinite(column)] = np.nan
+
+    not_number = np.zeros(len(values), dtype=bool)
+    nan_rows = np.flatnonzero(np.isnan(column))
+    not_number[nan_rows] = [not _is_missing(values[index]) for index in nan_rows.tolist()]
+    return column, not_number
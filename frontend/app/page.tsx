@@ -1,9 +1,10 @@
 'use client';
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { AIUIRenderer } from '../components/AIUIRenderer';
 import { aiUIClient, AIUIResponse } from '../lib/ai-ui-client';
 import { aiClient } from '../lib/ai-client';
+import { subscribeToChanges, applyChangeToUI } from '../lib/change-feed';
 import { ChevronDown, RefreshCw } from 'lucide-react';
 
 export default function Home() {
@@ -31,12 +32,65 @@ export default function Home() {
   }, null, 2));
   const [menuItems, setMenuItems] = useState<any[]>([]);
   const [menuLoading, setMenuLoading] = useState(false);
+  const [liveUpdates, setLiveUpdates] = useState(false);
+  const reloadView = useRef<() => void>(() => {});
+  const uiRef = useRef<AIUIResponse | null>(null);
+  uiRef.current = uiResponse;
 
   useEffect(() => {
-    loadAIUI();
-    loadMenuItems();
+    loadPage();
   }, [currentRole, activeView]);
 
+  // Live change feed: patch the rendered view on every product change instead of refetching
+  useEffect(() => {
+    return subscribeToChanges(currentRole, {
+      onChange: (change) => {
+        if (!uiRef.current) return;
+        const patched = applyChangeToUI(uiRef.current, change);
+        if (patched) {
+          uiRef.current = patched;
+          setUIResponse(patched);
+        } else {
+          reloadView.current();
+        }
+      },
+      onResync: (reason) => {
+        console.log('Change feed resync:', reason);
+        reloadView.current();
+      },
+      onStatusChange: setLiveUpdates
+    });
+  }, [currentRole]);
+
+  const getViewEndpoint = (view: string) => {
+    switch (view) {
+      case 'categories':
+        return '/api/categories';
+      case 'context':
+        return `/api/user-context/${currentRole}`;
+      default:
+        return '/api/products';
+    }
+  };
+
+  // Load the active view and the menu in ONE batched round trip (one AI intent call)
+  const loadPage = async () => {
+    setIsLoading(true);
+    setMenuLoading(true);
+    setError(null);
+    try {
+      const { ui, menuItems } = await aiUIClient.getViewWithMenu(getViewEndpoint(activeView), currentRole);
+      setUIResponse(ui);
+      setMenuItems(menuItems);
+    } catch (error) {
+      console.error('Batched page load failed, falling back to separate requests:', error);
+      await Promise.all([loadAIUI(), loadMenuItems()]);
+    } finally {
+      setIsLoading(false);
+      setMenuLoading(false);
+    }
+  };
+
   const loadMenuItems = async () => {
     setMenuLoading(true);
     try {
@@ -88,6 +142,10 @@ export default function Home() {
     }
   };
 
+  reloadView.current = () => {
+    if (activeView !== 'api') loadAIUI();
+  };
+
   const handleRoleChange = (newRole: string) => {
     setCurrentRole(newRole);
   };
@@ -98,8 +156,10 @@ export default function Home() {
     switch (action) {
       case 'delete_success':
       case 'form_success':
-        // Refresh UI after successful operations
-        loadAIUI();
+        // The change feed delivers the update - refetch only when it is not connected
+        if (!liveUpdates) {
+          loadAIUI();
+        }
         break;
       case 'form_error':
         setError(data?.error || 'An error occurred');
@@ -130,8 +190,7 @@ export default function Home() {
   };
 
   const handleRefresh = () => {
-    loadAIUI();
-    loadMenuItems();
+    loadPage();
   };
 
   return (
@@ -160,6 +219,11 @@ export default function Home() {
               <div className="bg-purple-100 text-purple-800 px-3 py-1 rounded-full text-sm font-medium">
                 OpenAI Powered
               </div>
+              {liveUpdates && (
+                <div className="bg-emerald-100 text-emerald-800 px-3 py-1 rounded-full text-sm font-medium">
+                  ● Live
+                </div>
+              )}
             </div>
           </div>
         </div>
@@ -1,6 +1,6 @@
 'use client';
 
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { Trash2, Plus, Eye } from 'lucide-react';
 
 interface Product {
@@ -32,6 +32,11 @@ export function ProductTable({
 }: ProductTableProps) {
   const [products, setProducts] = useState<Product[]>(data || []);
 
+  // Live updates arrive as new data props
+  useEffect(() => {
+    setProducts(data || []);
+  }, [data]);
+
   const handleDelete = async (productId: string) => {
     if (confirm('Are you sure you want to delete this product?')) {
       try {
@@ -68,6 +68,23 @@ export interface UserContextResponse extends AIResponse {
   ai_suggestions: string[];
 }
 
+export interface BatchSubRequest {
+  id?: string;
+  method?: string;
+  path: string;
+  data?: any;
+  headers?: Record<string, string>;
+}
+
+export interface BatchResponse extends AIResponse {
+  responses: {
+    id: string;
+    status: number;
+    body: AIResponse;
+  }[];
+  count: number;
+}
+
 export class AIRuntimeClient {
   private baseUrl: string;
 
@@ -186,6 +203,19 @@ export class AIRuntimeClient {
     });
   }
 
+  /**
+   * Send several requests in one round trip - the backend resolves all intents with a single AI call
+   */
+  async batch(userRole: string, requests: BatchSubRequest[]): Promise<BatchResponse> {
+    return this.makeRequest('/api/batch', {
+      method: 'POST',
+      headers: {
+        'X-User-Role': userRole,
+      },
+      body: JSON.stringify({ requests }),
+    });
+  }
+
   /**
    * Health check
    */
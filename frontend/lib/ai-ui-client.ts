@@ -2,8 +2,13 @@
  * AI-Driven UI Client
  * Connects to the AI Runtime Engine to get both data AND UI instructions
  * This enables truly dynamic, policy-driven interface generation
+ *
+ * The last ui_instructions of every view are kept with their ui_version; refreshes
+ * send it as X-UI-Version and the engine answers with only the changes (ui_patch).
  */
 
+import { applyPatch } from './json-patch';
+
 export interface AIUIResponse {
   data: any;
   ui_config: {
@@ -50,13 +55,49 @@ const API_BASE = 'http://localhost:8000';
 
 export class AIUIClient {
   private baseUrl: string;
+  // role + endpoint -> last ui_instructions received for that view, with their version
+  private uiBases = new Map<string, { version: string; instructions: any }>();
 
   constructor(baseUrl: string = API_BASE) {
     this.baseUrl = baseUrl;
   }
 
-  private async makeAIUIRequest(path: string, userRole: string, options: RequestInit = {}): Promise<AIUIResponse> {
+  private uiVersionHeader(userRole: string, endpoint: string): Record<string, string> {
+    const base = this.uiBases.get(`${userRole} ${endpoint}`);
+    return base ? { 'X-UI-Version': base.version } : {};
+  }
+
+  /**
+   * Rebuild ui_instructions from a ui_patch against the stored base and remember the result.
+   * Returns null when the patch does not fit what this client holds - refetch in full then.
+   */
+  private resolveUIInstructions(backendData: any, userRole: string, endpoint: string): any | null {
+    const key = `${userRole} ${endpoint}`;
+    if (backendData.ui_patch) {
+      const base = this.uiBases.get(key);
+      if (!base || base.version !== backendData.ui_base_version) {
+        this.uiBases.delete(key);
+        return null;
+      }
+      const { ui_patch, ui_base_version, ...rest } = backendData;
+      try {
+        backendData = { ...rest, ui_instructions: applyPatch(base.instructions, ui_patch) };
+      } catch (error) {
+        console.warn('ai-ui-client: UI patch did not apply, refetching in full.', error);
+        this.uiBases.delete(key);
+        return null;
+      }
+    }
+    if (backendData.ui_version && backendData.ui_instructions) {
+      // Kept apart from the response, which views (and the change feed) may modify
+      this.uiBases.set(key, { version: backendData.ui_version, instructions: structuredClone(backendData.ui_instructions) });
+    }
+    return backendData;
+  }
+
+  private async makeAIUIRequest(path: string, userRole: string, options: RequestInit = {}, useBase: boolean = true): Promise<AIUIResponse> {
     const url = `${this.baseUrl}${path}`;
+    const isRead = !options.method || options.method === 'GET';
     
     try {
       const response = await fetch(url, {
@@ -65,6 +106,7 @@ export class AIUIClient {
           'Content-Type': 'application/json',
           'X-User-Role': userRole,
           'X-UI-Request': 'true', // Signal that we want UI instructions
+          ...(isRead && useBase ? this.uiVersionHeader(userRole, path) : {}),
           ...options.headers,
         },
       });
@@ -75,8 +117,13 @@ export class AIUIClient {
         throw new Error(data.message || `HTTP ${response.status}`);
       }
 
+      const resolved = this.resolveUIInstructions(data, userRole, path);
+      if (resolved === null) {
+        return this.makeAIUIRequest(path, userRole, options, false);
+      }
+
       // Transform traditional response to AI UI response format
-      return this.transformToAIUIResponse(data, userRole, path);
+      return this.transformToAIUIResponse(resolved, userRole, path);
     } catch (error) {
       console.error(`AI UI API Error:`, error);
       throw error;
@@ -274,6 +321,47 @@ export class AIUIClient {
     return this.makeAIUIRequest(`/api/user-context/${userRole}`, userRole);
   }
 
+  /**
+   * Get AI-driven UI for a view together with the menu items in ONE batched request
+   */
+  async getViewWithMenu(endpoint: string, userRole: string, useBase: boolean = true): Promise<{ ui: AIUIResponse; menuItems: any[] }> {
+    const viewHeaders = { 'X-UI-Request': 'true', ...(useBase ? this.uiVersionHeader(userRole, endpoint) : {}) };
+    const response = await fetch(`${this.baseUrl}/api/batch`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'X-User-Role': userRole,
+      },
+      body: JSON.stringify({
+        requests: [
+          { id: 'view', method: 'GET', path: endpoint, headers: viewHeaders },
+          { id: 'menu', method: 'GET', path: '/api/menu-items' }
+        ]
+      }),
+    });
+
+    const data = await response.json();
+    if (!response.ok) {
+      throw new Error(data.message || `HTTP ${response.status}`);
+    }
+
+    const view = data.responses.find((item: any) => item.id === 'view');
+    const menu = data.responses.find((item: any) => item.id === 'menu');
+    if (!view || view.status >= 400) {
+      throw new Error(view?.body?.message || `HTTP ${view?.status}`);
+    }
+
+    const body = this.resolveUIInstructions(view.body, userRole, endpoint);
+    if (body === null) {
+      return this.getViewWithMenu(endpoint, userRole, false);
+    }
+
+    return {
+      ui: this.transformToAIUIResponse(body, userRole, endpoint),
+      menuItems: menu && menu.status < 400 ? menu.body.menu_items || [] : []
+    };
+  }
+
   /**
    * Get AI-driven UI for any endpoint
    */
@@ -0,0 +1,144 @@
+/**
+ * Live change feed
+ * Subscribes to the AI Runtime Engine's Server-Sent Events stream (/api/events)
+ * and patches an AI UI response in place, so views update after every product
+ * change without refetching (and without another AI intent call).
+ */
+
+import { AIUIResponse, UIComponent } from './ai-ui-client';
+
+const API_BASE = 'http://localhost:8000';
+
+export interface ProductChange {
+  op: 'add' | 'update' | 'delete';
+  id: string;
+  product?: any;
+}
+
+export interface CategoryDelta {
+  name: string;
+  product_count: number;
+  total_inventory_value: number;
+  low_stock_alerts?: number;
+  total_stock_units?: number;
+  price_sum?: number;
+}
+
+export interface ChangeEvent {
+  sequence: number;
+  timestamp: string;
+  changed: number;
+  products: ProductChange[] | null; // null for large commits (bulk imports) - refetch instead
+  category_deltas?: CategoryDelta[]; // only for roles allowed to see category analytics
+}
+
+export interface ChangeFeedHandlers {
+  onChange: (change: ChangeEvent) => void;
+  onResync: (reason: string) => void;
+  onStatusChange?: (connected: boolean) => void;
+}
+
+/**
+ * Open the change feed for a role. EventSource cannot send headers, so the role
+ * goes in the query string; it reconnects by itself and resumes from the last event id.
+ * Returns a function that closes the subscription.
+ */
+export function subscribeToChanges(userRole: string, handlers: ChangeFeedHandlers, baseUrl: string = API_BASE): () => void {
+  if (typeof window === 'undefined' || typeof EventSource === 'undefined') {
+    return () => {};
+  }
+
+  const source = new EventSource(`${baseUrl}/api/events?role=${encodeURIComponent(userRole)}`);
+
+  source.addEventListener('ready', () => handlers.onStatusChange?.(true));
+  source.addEventListener('change', (event) => {
+    handlers.onChange(JSON.parse((event as MessageEvent).data));
+  });
+  source.addEventListener('resync', (event) => {
+    handlers.onResync(JSON.parse((event as MessageEvent).data).reason);
+  });
+  source.onerror = () => handlers.onStatusChange?.(false);
+
+  return () => {
+    source.close();
+    handlers.onStatusChange?.(false);
+  };
+}
+
+export function applyProductChanges(products: any[], changes: ProductChange[]): any[] {
+  const updated = [...products];
+  for (const change of changes) {
+    const position = updated.findIndex((product) => product.id === change.id);
+    if (change.op === 'delete') {
+      if (position >= 0) updated.splice(position, 1);
+    } else if (position >= 0) {
+      updated[position] = change.product;
+    } else {
+      updated.push(change.product);
+    }
+  }
+  return updated;
+}
+
+export function applyCategoryDeltas(categories: any[], deltas: CategoryDelta[]): any[] {
+  const updated = categories.map((category) => ({ ...category }));
+  for (const delta of deltas) {
+    let category = updated.find((item) => item.name === delta.name);
+    if (!category) {
+      category = { name: delta.name, product_count: 0, total_inventory_value: 0 };
+      updated.push(category);
+    }
+    for (const field of ['product_count', 'total_inventory_value', 'low_stock_alerts', 'total_stock_units'] as const) {
+      if (delta[field] !== undefined && category[field] !== undefined) {
+        category[field] += delta[field];
+      }
+    }
+    category.total_inventory_value = Math.round(category.total_inventory_value * 100) / 100;
+    if (delta.price_sum !== undefined && category.average_product_price !== undefined) {
+      const previousCount = category.product_count - delta.product_count;
+      const priceSum = category.average_product_price * previousCount + delta.price_sum;
+      category.average_product_price = category.product_count > 0
+        ? Math.round((priceSum / category.product_count) * 100) / 100
+        : 0;
+    }
+  }
+  return updated.filter((category) => category.product_count > 0);
+}
+
+/**
+ * Patch a rendered AI UI response with one change event. Returns null when the
+ * event cannot be applied locally (bulk commit) and the view should be refetched.
+ */
+export function applyChangeToUI(ui: AIUIResponse, change: ChangeEvent): AIUIResponse | null {
+  const touchesProducts = ui.ui_config.components.some((component) => component.id === 'products-table');
+  if (change.products === null && touchesProducts) {
+    return null;
+  }
+
+  const patchComponent = (component: UIComponent): UIComponent => {
+    if (component.id === 'products-table' && change.products) {
+      const products = applyProductChanges(component.props.data || [], change.products);
+      return { ...component, props: { ...component.props, data: products }, data: products };
+    }
+    if (component.id === 'categories-analytics' && change.category_deltas) {
+      const categories = applyCategoryDeltas(component.props.data || [], change.category_deltas);
+      return { ...component, props: { ...component.props, data: categories }, data: categories };
+    }
+    return component;
+  };
+
+  const data = { ...ui.data };
+  if (Array.isArray(data.products) && change.products) {
+    data.products = applyProductChanges(data.products, change.products);
+  }
+  if (Array.isArray(data.categories) && change.category_deltas) {
+    data.categories = applyCategoryDeltas(data.categories, change.category_deltas);
+  }
+
+  return {
+    ...ui,
+    data,
+    ui_config: { ...ui.ui_config, components: ui.ui_config.components.map(patchComponent) },
+    metadata: { ...ui.metadata, timestamp: change.timestamp }
+  };
+}
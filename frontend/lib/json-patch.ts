@@ -0,0 +1,56 @@
+/**
+ * JSON Patch (RFC 6902)
+ * Applies the add / remove / replace operations the AI Runtime Engine sends as
+ * `ui_patch` when the client already holds an earlier version of a view's UI.
+ */
+
+export interface PatchOperation {
+  op: 'add' | 'remove' | 'replace';
+  path: string;
+  value?: any;
+}
+
+function parsePointer(path: string): string[] {
+  return path.split('/').slice(1).map(token => token.replace(/~1/g, '/').replace(/~0/g, '~'));
+}
+
+/**
+ * Apply a patch to a copy of the document (the input is left untouched).
+ */
+export function applyPatch<T = any>(document: T, patch: PatchOperation[]): T {
+  let result: any = structuredClone(document);
+
+  for (const operation of patch) {
+    if (operation.path === '') {
+      result = structuredClone(operation.value);
+      continue;
+    }
+
+    const tokens = parsePointer(operation.path);
+    const last = tokens.pop() as string;
+    let target = result;
+    for (const token of tokens) {
+      target = Array.isArray(target) ? target[Number(token)] : target?.[token];
+      if (target === undefined || target === null) {
+        throw new Error(`JSON Patch path not found: ${operation.path}`);
+      }
+    }
+
+    if (Array.isArray(target)) {
+      const index = last === '-' ? target.length : Number(last);
+      if (operation.op === 'add') {
+        target.splice(index, 0, operation.value);
+      } else if (operation.op === 'remove') {
+        target.splice(index, 1);
+      } else {
+        target[index] = operation.value;
+      }
+    } else if (operation.op === 'remove') {
+      delete target[last];
+    } else {
+      target[last] = operation.value;
+    }
+  }
+
+  return result;
+}
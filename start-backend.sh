@@ -38,9 +38,14 @@ else
     echo "✅ Dependencies already installed"
 fi
 
-# Start backend
-echo "🤖 Starting Python AI Runtime Engine..."
-python3 main.py
+# Start backend (AI_WORKERS > 1 runs the multi-worker server with shared caches)
+if [ "${AI_WORKERS:-1}" -gt 1 ]; then
+    echo "🤖 Starting Python AI Runtime Engine with $AI_WORKERS workers..."
+    gunicorn -c gunicorn.conf.py main:app
+else
+    echo "🤖 Starting Python AI Runtime Engine..."
+    python3 main.py
+fi
 BACKEND_PID=$!
 
 # Wait for backend to start